@@ -0,0 +1,49 @@
+"""
+Время "запуска": чтение JSON против открытия двоичного файла через mmap, затем filter_by_state.
+
+Запуск: python -m benchmarks.bench_binary [количество строк]
+"""
+
+import json
+import os
+import sys
+import tempfile
+
+from benchmarks.bench_engine import measure
+from benchmarks.synthetic import generate_transactions
+from src.binary_format import convert_json, open_binary
+from src.processing import filter_by_state
+from src.readers import read_transactions
+
+
+def run(size: int) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        json_path = os.path.join(directory, "operations.json")
+        binary_path = os.path.join(directory, "operations.bin")
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump(list(generate_transactions(size)), f, ensure_ascii=False)
+        convert_json(json_path, binary_path)
+
+        def from_json() -> None:
+            with open(json_path, encoding="utf-8") as f:
+                filter_by_state(json.load(f), "EXECUTED")
+
+        def from_binary() -> None:
+            with open_binary(binary_path) as table:
+                filter_by_state(table, "EXECUTED")
+
+        results = {
+            "json.load + filter": measure(from_json, 1),
+            "stream + filter": measure(lambda: filter_by_state(read_transactions(json_path)), 1),
+            "mmap + filter": measure(from_binary),
+        }
+        sizes = f"json {os.path.getsize(json_path) / 1e6:.1f} MB, binary {os.path.getsize(binary_path) / 1e6:.1f} MB"
+        print(f"rows: {size}  {sizes}")
+        baseline = results["json.load + filter"]
+        for label, seconds in results.items():
+            print(f"  {label:<19} {seconds * 1000:9.2f} ms  x{baseline / seconds:6.1f}")
+
+
+if __name__ == "__main__":
+    for size in [int(arg) for arg in sys.argv[1:]] or [1_000_000]:
+        run(size)
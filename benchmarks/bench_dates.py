@@ -0,0 +1,26 @@
+"""
+Пакетное преобразование дат get_dates против поштучных вызовов get_date.
+
+Запуск: python -m benchmarks.bench_dates [количество строк]
+"""
+
+import sys
+
+from benchmarks.bench_engine import measure
+from benchmarks.synthetic import generate_transactions
+from src.widget import get_date, get_dates
+
+
+def run(size: int) -> None:
+    dates = [transaction["date"] for transaction in generate_transactions(size)]
+    baseline = measure(lambda: [get_date(date_str) for date_str in dates])
+    batch = measure(lambda: get_dates(dates))
+    strict = measure(lambda: get_dates(dates, "%Y-%m-%d", strict=True))
+    print(f"rows: {size}")
+    for label, seconds in (("get_date loop", baseline), ("get_dates", batch), ("strict ISO", strict)):
+        print(f"  {label:<13} {seconds * 1000:9.2f} ms  x{baseline / seconds:5.1f}")
+
+
+if __name__ == "__main__":
+    for size in [int(arg) for arg in sys.argv[1:]] or [1_000_000]:
+        run(size)
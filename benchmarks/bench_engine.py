@@ -0,0 +1,58 @@
+"""
+Сравнение векторизованного движка NumPy с путями на чистом Python.
+
+Запуск: python -m benchmarks.bench_engine [количество строк ...]
+"""
+
+import sys
+import time
+from typing import Any, Callable
+
+from benchmarks.synthetic import generate_transactions
+from src import engine
+from src.processing import filter_by_state, sort_by_date
+from src.table import TransactionTable
+
+
+def measure(func: Callable[[], Any], repeat: int = 3) -> float:
+    """Возвращает лучшее время выполнения функции в секундах."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(size: int) -> None:
+    records = list(generate_transactions(size))
+    table = TransactionTable.from_records(records)
+    threshold = engine.NUMPY_THRESHOLD
+
+    results = {
+        "filter_by_state list": measure(lambda: filter_by_state(records, "EXECUTED")),
+        "sort_by_date list": measure(lambda: sort_by_date(records)),
+    }
+    engine.NUMPY_THRESHOLD = sys.maxsize
+    results["filter_by_state table python"] = measure(lambda: filter_by_state(table, "EXECUTED"))
+    results["sort_by_date table python"] = measure(lambda: sort_by_date(table))
+    engine.NUMPY_THRESHOLD = 0
+    if engine.get_numpy() is not None:
+        results["filter_by_state table numpy"] = measure(lambda: filter_by_state(table, "EXECUTED"))
+        results["sort_by_date table numpy"] = measure(lambda: sort_by_date(table))
+    engine.NUMPY_THRESHOLD = threshold
+
+    print(f"rows: {size}")
+    for operation in ("filter_by_state", "sort_by_date"):
+        baseline = results[f"{operation} list"]
+        for name, seconds in results.items():
+            if name.startswith(operation):
+                print(f"  {name:<32} {seconds * 1000:10.2f} ms  x{baseline / seconds:6.1f}")
+
+
+if __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10_000, 100_000, 1_000_000]
+    if engine.get_numpy() is None:
+        print("NumPy is not installed: only pure Python paths are measured")
+    for size in sizes:
+        run(size)
@@ -0,0 +1,39 @@
+"""
+Скорость генерации номеров карт: поштучное форматирование против пакетных режимов.
+
+Запуск: python -m benchmarks.bench_generators [количество номеров]
+"""
+
+import io
+import sys
+
+from benchmarks.bench_engine import measure
+from src.generators import card_number_batches, card_number_buffers, write_card_numbers
+
+
+def reference(start: int, end: int) -> None:
+    """Исходный алгоритм: zfill, четыре среза и f-строка на каждый номер."""
+    for num in range(start, end + 1):
+        num_str = str(num).zfill(16)
+        f"{num_str[:4]} {num_str[4:8]} {num_str[8:12]} {num_str[12:16]}"
+
+
+def run(size: int) -> None:
+    start = 4_000_000_000_000_000
+    end = start + size - 1
+    results = {
+        "per number": measure(lambda: reference(start, end), repeat=1),
+        "lists": measure(lambda: sum(len(batch) for batch in card_number_batches(start, end))),
+        "bytes blocks": measure(lambda: sum(len(block) for block in card_number_buffers(start, end))),
+        "write file": measure(lambda: write_card_numbers(start, end, io.BytesIO())),
+        "write buffer": measure(lambda: write_card_numbers(start, end, bytearray(size * 20))),
+    }
+    baseline = results["per number"]
+    print(f"numbers: {size}")
+    for label, seconds in results.items():
+        print(f"  {label:<12} {seconds * 1000:9.2f} ms  {size / seconds / 1e6:7.1f} M/s  x{baseline / seconds:6.1f}")
+
+
+if __name__ == "__main__":
+    for size in [int(arg) for arg in sys.argv[1:]] or [1_000_000, 10_000_000]:
+        run(size)
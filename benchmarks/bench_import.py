@@ -0,0 +1,78 @@
+"""
+Время импорта модулей пакета src в новом интерпретаторе и проверка, что тяжелые зависимости
+не загружаются раньше, чем понадобятся.
+
+Каждый модуль импортируется в отдельном процессе; время - от начала до конца import (запуск интерпретатора
+не входит), лучшее из нескольких запусков. Бюджеты IMPORT_BUDGET_MS проверяются в tests/test_import_time.py.
+
+Запуск: python -m benchmarks.bench_import [число запусков]
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+# Бюджет времени импорта в миллисекундах (с запасом на медленные машины CI)
+IMPORT_BUDGET_MS = {
+    "src": 5,
+    "src.masks": 40,
+    "src.widget": 40,
+    "src.luhn": 40,
+    "src.readers": 40,
+    "src.processing": 60,
+    "src.generators": 80,
+    "src.decorators": 60,
+    "src.aggregates": 60,
+    "src.binary_format": 60,
+    "src.parallel": 80,
+    "src.main": 40,
+}
+# Модули, которые не должны загружаться при импорте пакета: только при использовании соответствующих функций
+HEAVY_MODULES = ("numpy", "multiprocessing", "concurrent.futures", "asyncio", "tempfile", "inspect")
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"ms": elapsed * 1000, "loaded": [name for name in {heavy!r} if name in sys.modules]}}))
+"""
+
+
+def measure_import(module: str, runs: int = 5) -> dict:
+    """
+    Импортирует модуль в новых процессах.
+
+    :return: {"ms": лучшее время в миллисекундах, "loaded": загруженные тяжелые модули}
+    """
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    best: dict = {}
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", _PROBE.format(module=module, heavy=HEAVY_MODULES)],
+            cwd=root,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        result = json.loads(output.splitlines()[-1])
+        if not best or result["ms"] < best["ms"]:
+            best = result
+    return best
+
+
+def main(runs: int = 5) -> int:
+    failed = 0
+    for module, budget in IMPORT_BUDGET_MS.items():
+        result = measure_import(module, runs)
+        over = result["ms"] > budget or result["loaded"]
+        failed += bool(over)
+        loaded = ", ".join(result["loaded"]) or "-"
+        mark = "OVER" if over else "ok"
+        print(f"  {module:<18} {result['ms']:8.2f} ms  budget {budget:4d} ms  heavy: {loaded:<20} {mark}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(*[int(arg) for arg in sys.argv[1:]]))
@@ -0,0 +1,77 @@
+"""
+Задержка вызова функции под декоратором log: синхронная запись в файл против фоновой, выборка успешных
+вызовов, уровни error и off, а также сообщение об ошибке с большим аргументом.
+
+Запуск: python -m benchmarks.bench_log [количество вызовов]
+"""
+
+import os
+import sys
+import tempfile
+
+from benchmarks.bench_engine import measure
+from src.decorators import MAX_REPR, close_sinks, log
+
+
+def run(calls: int) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        sync_file = os.path.join(directory, "sync.log")
+        buffered_file = os.path.join(directory, "buffered.log")
+
+        @log(filename=sync_file)
+        def sync_add(x: int, y: int) -> int:
+            return x + y
+
+        @log(filename=buffered_file, buffered=True)
+        def buffered_add(x: int, y: int) -> int:
+            return x + y
+
+        @log(filename=sync_file, sample=100)
+        def sampled_add(x: int, y: int) -> int:
+            return x + y
+
+        @log(filename=sync_file, level="error")
+        def errors_add(x: int, y: int) -> int:
+            return x + y
+
+        @log(filename=sync_file, level="off")
+        def off_add(x: int, y: int) -> int:
+            return x + y
+
+        print(f"calls: {calls}")
+        baseline = measure(lambda: [sync_add(i, 1) for i in range(calls)], repeat=1)
+        cases = {
+            "sync file": baseline,
+            "buffered": measure(lambda: [buffered_add(i, 1) for i in range(calls)], repeat=1),
+            "sample=100": measure(lambda: [sampled_add(i, 1) for i in range(calls)], repeat=1),
+            "level=error": measure(lambda: [errors_add(i, 1) for i in range(calls)], repeat=1),
+            "level=off": measure(lambda: [off_add(i, 1) for i in range(calls)], repeat=1),
+        }
+        for label, seconds in cases.items():
+            print(f"  {label:<12} {seconds / calls * 1e6:8.2f} us/call  x{baseline / seconds:6.1f}")
+        close_sinks()
+
+
+def run_error(rows: int) -> None:
+    """Время записи одной ошибки, если аргумент - список из rows транзакций."""
+    transactions = [{"id": number, "state": "EXECUTED"} for number in range(rows)]
+    with tempfile.TemporaryDirectory() as directory:
+        for label, max_repr in (("full repr", None), ("capped", MAX_REPR)):
+
+            @log(filename=os.path.join(directory, "errors.log"), max_repr=max_repr)
+            def fail(items: list) -> None:
+                raise ValueError("bad input")
+
+            def call() -> None:
+                try:
+                    fail(transactions)
+                except ValueError:
+                    pass
+
+            print(f"  error with {rows} rows, {label:<9} {measure(call, repeat=1) * 1000:10.3f} ms")
+
+
+if __name__ == "__main__":
+    for calls in [int(arg) for arg in sys.argv[1:]] or [100_000]:
+        run(calls)
+    run_error(1_000_000)
@@ -0,0 +1,43 @@
+"""
+Скорость генерации и проверки номеров карт по алгоритму Луна.
+
+Запуск: python -m benchmarks.bench_luhn [количество номеров]
+"""
+
+import random
+import sys
+
+from benchmarks.bench_engine import measure
+from src.engine import get_numpy
+from src.generators import luhn_card_number_batches
+from src.luhn import DOUBLED, validate_card_numbers, validate_card_numbers_array
+
+
+def naive_is_valid(number: str) -> bool:
+    """Поштучная проверка: разбор каждой цифры."""
+    digits = [int(digit) for digit in number.replace(" ", "")]
+    total = sum(digits[-1::-2]) + sum(DOUBLED[digit] for digit in digits[-2::-2])
+    return total % 10 == 0
+
+
+def run(size: int) -> None:
+    rng = random.Random(42)
+    numbers = [str(rng.randrange(10**15, 10**16)) for _ in range(size)]
+    start = 4_000_000_000_000_000
+    results = {
+        "generate valid": measure(lambda: sum(map(len, luhn_card_number_batches(start, start + size * 10 - 1)))),
+        "naive validate": measure(lambda: [naive_is_valid(number) for number in numbers]),
+        "validate list": measure(lambda: validate_card_numbers(numbers)),
+    }
+    numpy = get_numpy()
+    if numpy is not None:
+        column = numpy.array(numbers, dtype="S")
+        results["validate numpy"] = measure(lambda: validate_card_numbers_array(column))
+    print(f"numbers: {size}")
+    for label, seconds in results.items():
+        print(f"  {label:<14} {seconds * 1000:9.2f} ms  {size / seconds / 1e6:7.2f} M/s")
+
+
+if __name__ == "__main__":
+    for size in [int(arg) for arg in sys.argv[1:]] or [1_000_000]:
+        run(size)
@@ -0,0 +1,82 @@
+"""
+Сравнение пакетной маскировки с циклом вызовов get_mask_card_number / get_mask_account, а также
+mask_account_cards с циклом mask_account_card (с обработкой исключений) на смешанной колонке from/to.
+
+Запуск: python -m benchmarks.bench_masks [количество номеров]
+"""
+
+import random
+import sys
+
+from benchmarks.bench_engine import measure
+from src.engine import get_numpy
+from src.masks import (get_mask_account, get_mask_card_number, mask_accounts, mask_accounts_array,
+                       mask_card_numbers, mask_card_numbers_array)
+from src.widget import mask_account_card, mask_account_cards
+
+
+def mixed_column(size: int, bad_share: float, seed: int = 42) -> list[str]:
+    """Строки from/to: счета, карты и доля bad_share некорректных номеров."""
+    rng = random.Random(seed)
+    labels = ["Visa Platinum", "Visa Classic", "Maestro", "MasterCard", "МИР"]
+    column = []
+    for _ in range(size):
+        if rng.random() < bad_share:
+            column.append(f"{rng.choice(labels)} {rng.randrange(10**6)}")
+        elif rng.random() < 0.5:
+            column.append(f"Счет {rng.randrange(10**19, 10**20)}")
+        else:
+            column.append(f"{rng.choice(labels)} {rng.randrange(10**15, 10**16)}")
+    return column
+
+
+def scalar_masks(values: list[str]) -> list:
+    masked = []
+    for value in values:
+        try:
+            masked.append(mask_account_card(value))
+        except ValueError:
+            masked.append(None)
+    return masked
+
+
+def run_mixed(size: int) -> None:
+    for bad_share in (0.0, 0.1, 0.5):
+        values = mixed_column(size, bad_share)
+        baseline = measure(lambda: scalar_masks(values))
+        batch = measure(lambda: mask_account_cards(values))
+        label = f"bad {bad_share:.0%}"
+        for name, seconds in (("scalar loop", baseline), ("batch", batch)):
+            rate = size / seconds / 1e6
+            speedup = baseline / seconds
+            print(f"  from/to {label:<8} {name:<12} {seconds * 1000:9.2f} ms  {rate:5.2f} M/s  x{speedup:4.1f}")
+
+
+def run(size: int) -> None:
+    rng = random.Random(42)
+    cards = [str(rng.randrange(10**15, 10**16)) for _ in range(size)]
+    accounts = [str(rng.randrange(10**19, 10**20)) for _ in range(size)]
+
+    print(f"numbers: {size}")
+    cases = [
+        ("cards", cards, get_mask_card_number, mask_card_numbers, mask_card_numbers_array),
+        ("accounts", accounts, get_mask_account, mask_accounts, mask_accounts_array),
+    ]
+    numpy = get_numpy()
+    for name, numbers, scalar, batch, vectorized in cases:
+        baseline = measure(lambda: [scalar(number) for number in numbers])
+        results = {"scalar loop": baseline, "batch": measure(lambda: batch(numbers))}
+        if numpy is not None:
+            column = numpy.array(numbers, dtype="S")
+            results["numpy column"] = measure(lambda: vectorized(column))
+        for label, seconds in results.items():
+            rate = size / seconds / 1e6
+            print(f"  {name:<9} {label:<13} {seconds * 1000:9.2f} ms  {rate:7.2f} M/s  x{baseline / seconds:6.1f}")
+
+
+if __name__ == "__main__":
+    if get_numpy() is None:
+        print("NumPy is not installed: the column path is skipped")
+    for size in [int(arg) for arg in sys.argv[1:]] or [100_000, 1_000_000]:
+        run(size)
+        run_mixed(size)
@@ -0,0 +1,33 @@
+"""
+Накладные расходы декоратора timed на один вызов.
+
+Запуск: python -m benchmarks.bench_metrics [количество вызовов]
+"""
+
+import sys
+
+from benchmarks.bench_engine import measure
+from src.decorators import timed
+from src.metrics import MetricsRegistry
+from src.widget import mask_account_card
+
+
+def noop(value: str) -> str:
+    return value
+
+
+def run(calls: int) -> None:
+    registry = MetricsRegistry()
+    print(f"calls: {calls}")
+    for func in (noop, mask_account_card):
+        instrumented = timed(registry=registry)(func)
+        argument = "Visa Platinum 7000792289606361"
+        plain = measure(lambda: [func(argument) for _ in range(calls)])
+        wrapped = measure(lambda: [instrumented(argument) for _ in range(calls)])
+        overhead = (wrapped - plain) / calls * 1e6
+        print(f"  {func.__name__:<18} {plain / calls * 1e6:6.2f} us/call  overhead {overhead:5.2f} us/call")
+
+
+if __name__ == "__main__":
+    for calls in [int(arg) for arg in sys.argv[1:]] or [200_000]:
+        run(calls)
@@ -0,0 +1,56 @@
+"""
+Масштабирование параллельной обработки (фильтр -> маскировка -> дата) от 1 до N процессов.
+
+Запуск: python -m benchmarks.bench_parallel [количество строк] [максимум процессов]
+"""
+
+import os
+import sys
+from typing import Any
+
+from benchmarks.bench_engine import measure
+from benchmarks.synthetic import generate_transactions
+from src.parallel import process_parallel
+from src.processing import filter_by_state, sort_by_date
+from src.widget import get_date, mask_account_card
+
+
+def prepare_transaction(transaction: dict[str, Any]) -> dict[str, Any]:
+    """Копия транзакции с замаскированными полями from/to и датой в формате DD.MM.YYYY."""
+    result = dict(transaction)
+    for field in ("from", "to"):
+        if result.get(field):
+            result[field] = mask_account_card(result[field])
+    if "date" in result:
+        result["date"] = get_date(result["date"])
+    return result
+
+
+def process_sequential(transactions: list[dict[str, Any]], state: str = "EXECUTED") -> list[dict[str, Any]]:
+    """Последовательная обработка словарей в текущем процессе - база для сравнения с process_parallel."""
+    return [prepare_transaction(transaction) for transaction in filter_by_state(transactions, state)]
+
+
+def run(size: int, max_workers: int) -> None:
+    records = list(generate_transactions(size))
+    print(f"rows: {size}")
+    for sort in (False, True):
+        # Последовательная обработка словарей без деления на колонки
+        sequential = measure(
+            lambda: process_sequential(sort_by_date(records) if sort else records), repeat=1
+        )
+        print(f"  {f'sort={sort} sequential':<22} {sequential * 1000:9.2f} ms")
+        workers = 1
+        while workers <= max_workers:
+            seconds = measure(lambda: process_parallel(records, sort=sort, workers=workers), repeat=1)
+            if workers == 1:
+                baseline = seconds
+            label = f"sort={sort} workers={workers}"
+            print(f"  {label:<22} {seconds * 1000:9.2f} ms  x{baseline / seconds:5.2f}")
+            workers *= 2
+
+
+if __name__ == "__main__":
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    max_workers = int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count() or 1
+    run(size, max_workers)
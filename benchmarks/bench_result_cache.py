@@ -0,0 +1,44 @@
+"""
+Повторные вызовы filter_by_state и sort_by_date: без кэша, с попаданием в память и с чтением записи с диска.
+
+Запуск: python -m benchmarks.bench_result_cache [количество строк]
+"""
+
+import sys
+import tempfile
+
+from benchmarks.bench_engine import measure
+from benchmarks.synthetic import generate_transactions
+from src.processing import filter_by_state, sort_by_date
+from src.result_cache import ResultCache, fingerprint
+from src.table import TransactionTable
+
+
+def run(size: int) -> None:
+    records = list(generate_transactions(size))
+    table = TransactionTable.from_records(records)
+    print(f"rows: {size}")
+    with tempfile.TemporaryDirectory() as directory:
+        for label, data in (("list", records), ("table", table)):
+            for name, plain in (("filter_by_state", filter_by_state), ("sort_by_date", sort_by_date)):
+                shared = ResultCache(directory=directory)
+                cached = getattr(shared, name)
+                cached(data, version="day")
+
+                def from_disk() -> None:
+                    getattr(ResultCache(directory=directory), name)(data, version="day")
+
+                baseline = measure(lambda: plain(data))
+                results = {
+                    "no cache": baseline,
+                    "memory hit": measure(lambda: cached(data, version="day")),
+                    "disk hit": measure(from_disk),
+                }
+                for case, seconds in results.items():
+                    print(f"  {label:<5} {name:<15} {case:<10} {seconds * 1000:9.2f} ms  x{baseline / seconds:6.1f}")
+            print(f"  {label:<5} content fingerprint {measure(lambda: fingerprint(data), 1):.3f} s")
+
+
+if __name__ == "__main__":
+    for size in [int(arg) for arg in sys.argv[1:]] or [1_000_000]:
+        run(size)
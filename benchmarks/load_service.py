@@ -0,0 +1,129 @@
+"""
+Нагрузочный тест сервиса src.service: число запросов в секунду и квантили задержки.
+
+Без --port сервис запускается в этом же процессе на синтетических данных. Клиенты держат соединения
+keep-alive и отправляют запросы по очереди; смесь запросов включает повторяющиеся (объединяемые
+и кэшируемые) и уникальные.
+
+Запуск:
+    python -m benchmarks.load_service --rows 100000 --clients 32 --requests 2000
+    python -m benchmarks.load_service --port 8080 --clients 64 --requests 10000
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from typing import Any, Optional
+
+from benchmarks.synthetic import generate_transactions
+from src.service import TransactionService, start
+
+
+def request_mix(count: int, seed: int = 42) -> list[tuple[str, dict[str, Any]]]:
+    """Смесь запросов: фильтры и сортировки с повторами, маскировка и даты с уникальными данными."""
+    generator = random.Random(seed)
+    requests: list[tuple[str, dict[str, Any]]] = []
+    for number in range(count):
+        kind = generator.random()
+        if kind < 0.35:
+            requests.append(("filter", {"state": generator.choice(["EXECUTED", "CANCELED"]), "limit": 20}))
+        elif kind < 0.6:
+            requests.append(("sort", {"reverse": generator.random() < 0.5, "top": 50, "limit": 20}))
+        elif kind < 0.8:
+            values = [f"Visa Platinum {generator.randrange(10**15, 10**16)}" for _ in range(50)]
+            requests.append(("mask", {"values": values}))
+        else:
+            requests.append(("dates", {"values": [f"2024-03-{day:02d}T10:00:00" for day in range(1, 29)]}))
+    return requests
+
+
+async def _client(
+    host: str, port: int, queue: "asyncio.Queue[tuple[str, dict[str, Any]]]", latencies: list[float]
+) -> int:
+    reader, writer = await asyncio.open_connection(host, port)
+    errors = 0
+    try:
+        while not queue.empty():
+            operation, params = queue.get_nowait()
+            body = json.dumps(params).encode("utf-8")
+            start_time = time.perf_counter()
+            writer.write(f"POST /{operation} HTTP/1.1\r\nContent-Length: {len(body)}\r\n\r\n".encode("ascii") + body)
+            await writer.drain()
+            status = await reader.readline()
+            length = 0
+            while (line := await reader.readline()) not in (b"\r\n", b""):
+                if line.lower().startswith(b"content-length:"):
+                    length = int(line.split(b":", 1)[1])
+            await reader.readexactly(length)
+            latencies.append(time.perf_counter() - start_time)
+            errors += not status.startswith(b"HTTP/1.1 200")
+    finally:
+        writer.close()
+    return errors
+
+
+def _quantile(values: list[float], q: float) -> float:
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+async def run_load(host: str, port: int, clients: int, requests: int) -> dict[str, float]:
+    """
+    Отправляет requests запросов через clients соединений.
+
+    :return: rps, p50/p95/p99/max в миллисекундах и число ошибок
+    """
+    queue: "asyncio.Queue[tuple[str, dict[str, Any]]]" = asyncio.Queue()
+    for item in request_mix(requests):
+        queue.put_nowait(item)
+    latencies: list[float] = []
+    start_time = time.perf_counter()
+    errors = await asyncio.gather(*[_client(host, port, queue, latencies) for _ in range(clients)])
+    elapsed = time.perf_counter() - start_time
+    latencies.sort()
+    result = {"requests": len(latencies), "rps": len(latencies) / elapsed, "errors": sum(errors)}
+    for label, q in (("p50", 0.5), ("p95", 0.95), ("p99", 0.99), ("max", 1.0)):
+        result[f"{label}_ms"] = _quantile(latencies, q) * 1000
+    return result
+
+
+async def _run_local(rows: int, clients: int, requests: int, concurrency: Optional[int]) -> dict[str, float]:
+    service = TransactionService(list(generate_transactions(rows)), max_concurrency=concurrency)
+    try:
+        server = await start(service, port=0)
+        async with server:
+            result = await run_load("127.0.0.1", server.sockets[0].getsockname()[1], clients, requests)
+        result["coalesced"] = service.coalesced
+        return result
+    finally:
+        service.close()
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, help="порт работающего сервиса; без него сервис запускается здесь")
+    parser.add_argument("--rows", type=int, default=100_000, help="строк в наборе для локального сервиса")
+    parser.add_argument("--clients", type=int, default=32, help="одновременных соединений")
+    parser.add_argument("--requests", type=int, default=2000, help="всего запросов")
+    parser.add_argument("--concurrency", type=int, help="max_concurrency локального сервиса")
+    args = parser.parse_args(argv)
+
+    if args.port is None:
+        result = asyncio.run(_run_local(args.rows, args.clients, args.requests, args.concurrency))
+    else:
+        result = asyncio.run(run_load(args.host, args.port, args.clients, args.requests))
+    print(
+        f"requests: {result['requests']:.0f}  rps: {result['rps']:.0f}  errors: {result['errors']:.0f}  "
+        f"p50 {result['p50_ms']:.2f} ms  p95 {result['p95_ms']:.2f} ms  "
+        f"p99 {result['p99_ms']:.2f} ms  max {result['max_ms']:.2f} ms"
+    )
+    if "coalesced" in result:
+        print(f"coalesced: {result['coalesced']:.0f}")
+    return 1 if result["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
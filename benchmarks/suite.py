@@ -0,0 +1,185 @@
+"""
+Набор бенчмарков публичных функций на синтетических данных реалистичного объема.
+
+Для каждой функции и размера измеряются время (лучшее из нескольких запусков), пропускная способность,
+время на одну строку и пиковый объем памяти (tracemalloc, отдельным запуском). Результаты сохраняются
+в JSON и сравниваются с сохраненной базой: при замедлении или росте памяти сверх допуска
+процесс завершается с кодом 1.
+
+Запуск:
+    python -m benchmarks.suite --sizes 10000 100000 --output benchmarks/baseline.json
+    python -m benchmarks.suite --sizes 10000 100000 --baseline benchmarks/baseline.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import deque
+from typing import Any, Callable, Optional
+
+from benchmarks.synthetic import generate_transactions
+from src.decorators import close_sinks, log
+from src.generators import Pipeline, card_number_generator, filter_by_currency, transaction_descriptions
+from src.processing import filter_by_state, sort_by_date
+from src.widget import get_date, mask_account_card
+
+Case = Callable[[list[dict[str, Any]], str], Callable[[], Any]]
+DEFAULT_SIZES = (10_000, 100_000)
+DEFAULT_TOLERANCE = 0.25
+
+
+def _consume(iterator: Any) -> None:
+    deque(iterator, maxlen=0)
+
+
+def _mask_case(records: list[dict[str, Any]], directory: str) -> Callable[[], Any]:
+    accounts = [record["to"] for record in records]
+    return lambda: [mask_account_card(account) for account in accounts]
+
+
+def _date_case(records: list[dict[str, Any]], directory: str) -> Callable[[], Any]:
+    dates = [record["date"] for record in records]
+    return lambda: [get_date(date) for date in dates]
+
+
+def _log_case(buffered: bool) -> Case:
+    def prepare(records: list[dict[str, Any]], directory: str) -> Callable[[], Any]:
+        @log(filename=os.path.join(directory, f"bench-{buffered}.log"), buffered=buffered)
+        def noop(value: int) -> int:
+            return value
+
+        def run() -> None:
+            for number in range(len(records)):
+                noop(number)
+
+        return run
+
+    return prepare
+
+
+# Имя случая -> функция подготовки (данные, временный каталог) -> измеряемая функция без аргументов
+CASES: dict[str, Case] = {
+    "filter_by_state": lambda records, _: lambda: filter_by_state(records, "EXECUTED"),
+    "sort_by_date": lambda records, _: lambda: sort_by_date(records),
+    "filter_by_currency": lambda records, _: lambda: _consume(filter_by_currency(records, "USD")),
+    "transaction_descriptions": lambda records, _: lambda: _consume(transaction_descriptions(records)),
+    "pipeline": lambda records, _: lambda: _consume(
+        Pipeline(records).filter_state().filter_currency("USD").mask().descriptions()
+    ),
+    "card_number_generator": lambda records, _: lambda: _consume(card_number_generator(1, len(records))),
+    "mask_account_card": _mask_case,
+    "get_date": _date_case,
+    "log": _log_case(buffered=False),
+    "log_buffered": _log_case(buffered=True),
+}
+
+
+def measure_case(func: Callable[[], Any], size: int, repeat: int) -> dict[str, float]:
+    """
+    Измеряет функцию, обрабатывающую size строк.
+
+    :return: seconds (лучшее время), throughput (строк в секунду), latency_us (мкс на строку), peak_bytes
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"seconds": best, "throughput": size / best, "latency_us": best / size * 1e6, "peak_bytes": peak}
+
+
+def run_suite(sizes: list[int], cases: list[str], repeat: int = 3, seed: int = 42) -> dict[str, Any]:
+    """
+    Выполняет выбранные случаи для каждого размера.
+
+    :return: Результаты: {"environment": {...}, "results": {"имя@размер": {...}}}
+    """
+    results: dict[str, dict[str, float]] = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for size in sizes:
+            records = list(generate_transactions(size, seed=seed))
+            for name in cases:
+                func = CASES[name](records, directory)
+                results[f"{name}@{size}"] = measure_case(func, size, repeat)
+                close_sinks()
+    environment = {"python": platform.python_version(), "platform": platform.platform(), "seed": seed}
+    return {"environment": environment, "results": results}
+
+
+def compare(
+    current: dict[str, Any], baseline: dict[str, Any], tolerance: float = DEFAULT_TOLERANCE
+) -> list[str]:
+    """
+    Сравнивает результаты с базой.
+
+    :param tolerance: Допустимый относительный рост времени и памяти (0.25 - на 25%)
+    :return: Описания регрессий (пустой список, если их нет)
+    """
+    regressions = []
+    for key, result in current["results"].items():
+        reference = baseline["results"].get(key)
+        if reference is None:
+            continue
+        for metric in ("seconds", "peak_bytes"):
+            if reference[metric] and result[metric] > reference[metric] * (1 + tolerance):
+                ratio = result[metric] / reference[metric]
+                regressions.append(f"{key}: {metric} {reference[metric]:.6g} -> {result[metric]:.6g} (x{ratio:.2f})")
+    return regressions
+
+
+def print_results(current: dict[str, Any], baseline: Optional[dict[str, Any]]) -> None:
+    print(f"{'case':<36} {'ms':>10} {'rows/s':>12} {'us/row':>8} {'peak MB':>9} {'vs base':>8}")
+    for key, result in current["results"].items():
+        reference = None if baseline is None else baseline["results"].get(key)
+        versus = "" if reference is None else f"x{result['seconds'] / reference['seconds']:.2f}"
+        print(
+            f"{key:<36} {result['seconds'] * 1000:10.2f} {result['throughput']:12.0f} "
+            f"{result['latency_us']:8.3f} {result['peak_bytes'] / 1e6:9.2f} {versus:>8}"
+        )
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES), help="число строк")
+    parser.add_argument("--cases", nargs="+", choices=sorted(CASES), default=list(CASES), help="случаи")
+    parser.add_argument("--repeat", type=int, default=3, help="число запусков для замера времени")
+    parser.add_argument("--output", help="файл для сохранения результатов (например, новой базы)")
+    parser.add_argument("--baseline", help="файл базы для сравнения")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="допустимый рост (0.25 = 25%%)")
+    args = parser.parse_args(argv)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+    current = run_suite(args.sizes, args.cases, args.repeat)
+    print_results(current, baseline)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(current, f, indent=2)
+
+    if baseline is None:
+        return 0
+    regressions = compare(current, baseline, args.tolerance)
+    if regressions:
+        print(f"\nREGRESSIONS (tolerance {args.tolerance:.0%}):", file=sys.stderr)
+        for regression in regressions:
+            print(f"  {regression}", file=sys.stderr)
+        return 1
+    print("\nNo regressions against the baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,46 @@
+import random
+from typing import Any, Iterator
+
+STATES = ("EXECUTED", "EXECUTED", "EXECUTED", "CANCELED", "PENDING")
+CURRENCIES = ({"name": "руб.", "code": "RUB"}, {"name": "USD", "code": "USD"}, {"name": "EUR", "code": "EUR"})
+DESCRIPTIONS = (
+    "Перевод организации",
+    "Перевод со счета на счет",
+    "Перевод с карты на карту",
+    "Открытие вклада",
+    "Перевод с карты на счет",
+)
+CARD_NAMES = ("Visa Classic", "Visa Platinum", "Visa Gold", "Maestro", "MasterCard", "МИР")
+
+
+def generate_transactions(count: int, seed: int = 42, accounts: int = 1000) -> Iterator[dict[str, Any]]:
+    """
+    Генерирует транзакции в формате выгрузки операций банка.
+
+    :param count: Количество транзакций
+    :param seed: Зерно генератора случайных чисел, одинаковое зерно дает одинаковые данные
+    :param accounts: Количество различных счетов и карт, между которыми идут переводы
+    :return: Итератор словарей транзакций
+    """
+    rng = random.Random(seed)
+    account_pool = [f"Счет {rng.randrange(10**19, 10**20)}" for _ in range(accounts)]
+    card_pool = [f"{rng.choice(CARD_NAMES)} {rng.randrange(10**15, 10**16)}" for _ in range(accounts)]
+    for _ in range(count):
+        description = rng.choice(DESCRIPTIONS)
+        transaction = {
+            "id": rng.randrange(10**8, 10**9),
+            "state": rng.choice(STATES),
+            "date": (
+                f"{rng.randint(2018, 2019)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"
+                f"T{rng.randrange(24):02d}:{rng.randrange(60):02d}:{rng.randrange(60):02d}.{rng.randrange(10**6):06d}"
+            ),
+            "operationAmount": {
+                "amount": f"{rng.randrange(100, 10**7) / 100:.2f}",
+                "currency": dict(rng.choice(CURRENCIES)),
+            },
+            "description": description,
+        }
+        if description != "Открытие вклада":
+            transaction["from"] = rng.choice(card_pool if "карты" in description else account_pool)
+        transaction["to"] = rng.choice(account_pool)
+        yield transaction
@@ -0,0 +1,60 @@
+"""
+Обработка банковских операций: фильтрация, сортировка, маскировка номеров и форматирование дат.
+
+Функции доступны прямо из пакета (from src import filter_by_state, mask_account_card), но модули
+загружаются лениво, при первом обращении к имени: import src ничего не импортирует, а тяжелые
+зависимости (NumPy, пул процессов, asyncio) загружаются, только когда используются.
+"""
+
+# Публичное имя -> модуль пакета, в котором оно определено.
+# Сам пакет ничего не импортирует (даже typing и importlib), чтобы import src был почти бесплатным
+_EXPORTS = {
+    "get_mask_card_number": "masks",
+    "get_mask_account": "masks",
+    "mask_card_numbers": "masks",
+    "mask_accounts": "masks",
+    "mask_account_card": "widget",
+    "mask_account_cards": "widget",
+    "get_date": "widget",
+    "get_dates": "widget",
+    "filter_by_state": "processing",
+    "iter_by_state": "processing",
+    "sort_by_date": "processing",
+    "external_sort_by_date": "processing",
+    "filter_by_currency": "generators",
+    "transaction_descriptions": "generators",
+    "card_number_generator": "generators",
+    "Pipeline": "generators",
+    "is_luhn_valid": "luhn",
+    "validate_card_numbers": "luhn",
+    "log": "decorators",
+    "timed": "decorators",
+    "read_transactions": "readers",
+    "Query": "query",
+    "TransactionTable": "table",
+    "DateIndex": "date_index",
+    "IndexedTransactions": "indexes",
+    "TransactionAggregates": "aggregates",
+    "process_parallel": "parallel",
+    "open_binary": "binary_format",
+    "write_binary": "binary_format",
+    "ResultCache": "result_cache",
+    "TransactionService": "service",
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name: str) -> object:
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    # С непустым fromlist __import__ возвращает сам подмодуль, а не пакет
+    value = getattr(__import__(f"{__name__}.{module}", fromlist=[name]), name)
+    # Следующие обращения находят имя в пространстве модуля, без вызова __getattr__
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
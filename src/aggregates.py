@@ -0,0 +1,236 @@
+"""
+Накопительные агрегаты по потоку транзакций.
+
+Для каждой группы (валюта, статус, день) хранятся число операций, сумма, минимум и максимум в сотых долях
+(фиксированная точка, без ошибок округления float). Каждая новая транзакция обновляет одну группу за O(1),
+а отчеты собираются из групп, не перечитывая сами транзакции. Состояние можно сохранить в JSON
+и восстановить после перезапуска.
+"""
+
+import json
+import os
+from decimal import Decimal
+from typing import Any, Iterable, Iterator, NamedTuple, Optional
+
+from src.readers import PathType
+from src.table import AMOUNT_SCALE, parse_amount
+
+Row = dict[str, Any]
+GroupKey = tuple[Optional[str], Optional[str], Optional[str]]
+# Поля группы в порядке ключа и допустимые поля для group_by
+GROUP_FIELDS = ("currency", "state", "day")
+SNAPSHOT_VERSION = 1
+# Число знаков после точки в фиксированной точке (AMOUNT_SCALE = 10 ** _SCALE_DIGITS)
+_SCALE_DIGITS = len(str(AMOUNT_SCALE)) - 1
+
+
+def to_decimal(value: int) -> Decimal:
+    """Переводит сумму в сотых долях в Decimal с двумя знаками после точки."""
+    return Decimal(value).scaleb(-_SCALE_DIGITS)
+
+
+class Summary(NamedTuple):
+    """Итоги по набору операций; суммы в Decimal, для пустого набора min и max равны None."""
+
+    count: int  # type: ignore[assignment]  # поле перекрывает метод tuple.count
+    total: Decimal
+    min: Optional[Decimal]
+    max: Optional[Decimal]
+
+
+class Totals:
+    """Изменяемые итоги одной группы в сотых долях."""
+
+    __slots__ = ("count", "total", "minimum", "maximum")
+
+    def __init__(self, count: int = 0, total: int = 0, minimum: int = 0, maximum: int = 0) -> None:
+        self.count = count
+        self.total = total
+        self.minimum = minimum
+        self.maximum = maximum
+
+    def add(self, amount: int) -> None:
+        if not self.count or amount < self.minimum:
+            self.minimum = amount
+        if not self.count or amount > self.maximum:
+            self.maximum = amount
+        self.count += 1
+        self.total += amount
+
+    def merge(self, other: "Totals") -> None:
+        if not other.count:
+            return
+        if not self.count or other.minimum < self.minimum:
+            self.minimum = other.minimum
+        if not self.count or other.maximum > self.maximum:
+            self.maximum = other.maximum
+        self.count += other.count
+        self.total += other.total
+
+    def summary(self) -> Summary:
+        if not self.count:
+            return Summary(0, to_decimal(0), None, None)
+        return Summary(self.count, to_decimal(self.total), to_decimal(self.minimum), to_decimal(self.maximum))
+
+
+def group_key(transaction: Row) -> GroupKey:
+    """Ключ группы транзакции: (код валюты, статус, день YYYY-MM-DD)."""
+    operation_amount = transaction.get("operationAmount") or {}
+    currency = (operation_amount.get("currency") or {}).get("code")
+    date = transaction.get("date")
+    return currency, transaction.get("state"), None if date is None else date[:10]
+
+
+class TransactionAggregates:
+    """
+    Итоги по группам (валюта, статус, день), обновляемые по мере добавления транзакций.
+
+    Транзакции без operationAmount.amount пропускаются и учитываются в skipped.
+    """
+
+    def __init__(self, transactions: Iterable[Row] = ()) -> None:
+        """
+        :param transactions: Начальные транзакции
+        :raises ValueError: Если сумма какой-либо транзакции не является числом с точностью до сотых
+        """
+        self.groups: dict[GroupKey, Totals] = {}
+        # Число обработанных транзакций, включая пропущенные: позиция, с которой продолжать после restore
+        self.processed = 0
+        self.skipped = 0
+        self.extend(transactions)
+
+    def add(self, transaction: Row) -> None:
+        """
+        Учитывает одну транзакцию за O(1).
+
+        :param transaction: Словарь транзакции
+        :raises ValueError: Если сумма не является числом с точностью до сотых
+        """
+        operation_amount = transaction.get("operationAmount")
+        amount = None if not operation_amount else operation_amount.get("amount")
+        if amount is None:
+            self.processed += 1
+            self.skipped += 1
+            return
+        value = parse_amount(amount)
+        key = group_key(transaction)
+        totals = self.groups.get(key)
+        if totals is None:
+            totals = self.groups[key] = Totals()
+        totals.add(value)
+        self.processed += 1
+
+    def extend(self, transactions: Iterable[Row]) -> None:
+        """Учитывает транзакции по порядку."""
+        for transaction in transactions:
+            self.add(transaction)
+
+    def _matching(
+        self,
+        currency: Optional[str],
+        state: Optional[str],
+        start: Optional[str],
+        end: Optional[str],
+    ) -> Iterator[tuple[GroupKey, Totals]]:
+        for key, totals in self.groups.items():
+            key_currency, key_state, day = key
+            if currency is not None and key_currency != currency:
+                continue
+            if state is not None and key_state != state:
+                continue
+            if (start is not None or end is not None) and day is None:
+                continue
+            if start is not None and day < start[:10]:  # type: ignore[operator]
+                continue
+            if end is not None and day >= end[:10]:  # type: ignore[operator]
+                continue
+            yield key, totals
+
+    def summary(
+        self,
+        currency: Optional[str] = None,
+        state: Optional[str] = None,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+    ) -> Summary:
+        """
+        Итоги по операциям, подходящим под все заданные условия. Время работы зависит от числа групп,
+        а не от числа транзакций.
+
+        :param currency: Код валюты
+        :param state: Статус
+        :param start: Первый день периода (YYYY-MM-DD) включительно
+        :param end: День окончания периода не включительно
+        :return: Summary(count, total, min, max)
+        """
+        result = Totals()
+        for _, totals in self._matching(currency, state, start, end):
+            result.merge(totals)
+        return result.summary()
+
+    def group_by(
+        self,
+        *fields: str,
+        currency: Optional[str] = None,
+        state: Optional[str] = None,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+    ) -> dict[tuple[Optional[str], ...], Summary]:
+        """
+        Итоги в разрезе полей, например group_by("currency") или group_by("day", currency="RUB").
+
+        :param fields: Поля группировки: currency, state и/или day
+        :return: Словарь "кортеж значений полей -> Summary", отсортированный по ключу (None в конце)
+        :raises ValueError: Если поле не поддерживается
+        """
+        for field in fields:
+            if field not in GROUP_FIELDS:
+                raise ValueError(f"Unknown group field: {field}")
+        indexes = [GROUP_FIELDS.index(field) for field in fields]
+        grouped: dict[tuple[Optional[str], ...], Totals] = {}
+        for key, totals in self._matching(currency, state, start, end):
+            group = tuple(key[index] for index in indexes)
+            grouped.setdefault(group, Totals()).merge(totals)
+        order = sorted(grouped, key=lambda group: [(value is None, value or "") for value in group])
+        return {group: grouped[group].summary() for group in order}
+
+    def snapshot(self) -> dict[str, Any]:
+        """Состояние агрегатов в виде, пригодном для JSON."""
+        return {
+            "version": SNAPSHOT_VERSION,
+            "processed": self.processed,
+            "skipped": self.skipped,
+            "groups": [
+                [*key, totals.count, totals.total, totals.minimum, totals.maximum]
+                for key, totals in self.groups.items()
+            ],
+        }
+
+    @classmethod
+    def restore(cls, snapshot: dict[str, Any]) -> "TransactionAggregates":
+        """
+        Восстанавливает агрегаты из snapshot.
+
+        :raises ValueError: Если версия снимка не поддерживается
+        """
+        if snapshot.get("version") != SNAPSHOT_VERSION:
+            raise ValueError(f"Unsupported snapshot version: {snapshot.get('version')!r}")
+        aggregates = cls()
+        aggregates.processed = snapshot["processed"]
+        aggregates.skipped = snapshot["skipped"]
+        for currency, state, day, count, total, minimum, maximum in snapshot["groups"]:
+            aggregates.groups[(currency, state, day)] = Totals(count, total, minimum, maximum)
+        return aggregates
+
+    def save(self, path: PathType) -> None:
+        """Сохраняет снимок в JSON-файл; файл заменяется целиком, поэтому сбой записи не портит прежний снимок."""
+        temporary = f"{os.fspath(path)}.tmp"
+        with open(temporary, "w", encoding="utf-8") as f:
+            json.dump(self.snapshot(), f, ensure_ascii=False)
+        os.replace(temporary, path)
+
+    @classmethod
+    def load(cls, path: PathType) -> "TransactionAggregates":
+        """Загружает агрегаты из файла, сохраненного save."""
+        with open(path, encoding="utf-8") as f:
+            return cls.restore(json.load(f))
@@ -0,0 +1,259 @@
+"""
+Двоичный формат файла транзакций с чтением через mmap.
+
+Файл хранит колонки TransactionTable как есть: числовые колонки - массивы int64, строковые - коды int32,
+а сами строки - в таблицах строк (смещения uint64 и байты UTF-8). Заголовок описывает расположение
+разделов и содержит индексы по дате (номера строк, отсортированные по дате) и по статусу (номера строк
+для каждого статуса). При открытии колонки становятся memoryview над отображенным файлом: фильтры
+и сортировки TransactionTable работают по ним без разбора JSON и без создания словарей.
+
+Структура файла:
+    MAGIC (8 байт) | длина заголовка (uint64 LE) | заголовок JSON | разделы, выровненные на 8 байт
+"""
+
+import json
+import mmap
+import os
+import sys
+from array import array
+from typing import Any, Iterable, Literal, Optional, Sequence, Union
+
+from src.date_index import DateIndex
+from src.readers import PathType
+from src.table import CATEGORY_COLUMNS, INT_COLUMNS, NULL, Categories, TransactionTable
+
+MAGIC = b"TXNBIN01"
+FORMAT_VERSION = 1
+ALIGNMENT = 8
+
+Row = dict[str, Any]
+
+
+def _pad(size: int) -> int:
+    return -size % ALIGNMENT
+
+
+def _column_bytes(column: Sequence[int], typecode: str) -> bytes:
+    if isinstance(column, (array, memoryview)):
+        return column.tobytes()
+    return array(typecode, column).tobytes()
+
+
+def _string_table(categories: Categories) -> tuple[bytes, bytes, int]:
+    """Кодирует таблицу строк: смещения uint64, байты UTF-8 и код значения None (-1, если его нет)."""
+    offsets = array("Q", [0])
+    blob = bytearray()
+    null_code = -1
+    for code, value in enumerate(categories.values):
+        if value is None:
+            null_code = code
+        else:
+            blob += value.encode("utf-8")
+        offsets.append(len(blob))
+    return offsets.tobytes(), bytes(blob), null_code
+
+
+def _date_order(dates: Sequence[int]) -> tuple["array[int]", "array[int]"]:
+    """Ключи и номера строк с датой, отсортированные по дате (при равных датах - по номеру строки)."""
+    positions = sorted((position for position, date in enumerate(dates) if date != NULL), key=dates.__getitem__)
+    return array("q", [dates[position] for position in positions]), array("q", positions)
+
+
+def _state_postings(states: Sequence[int], count: int) -> tuple["array[int]", list[list[int]]]:
+    """Номера строк, сгруппированные по коду статуса, и пары [начало, длина] для каждого кода."""
+    groups: list[list[int]] = [[] for _ in range(count)]
+    for position, code in enumerate(states):
+        groups[code].append(position)
+    postings = array("q")
+    ranges = []
+    for group in groups:
+        ranges.append([len(postings), len(group)])
+        postings.extend(group)
+    return postings, ranges
+
+
+def write_binary(transactions: Union[TransactionTable, Iterable[Row]], path: PathType) -> int:
+    """
+    Записывает транзакции в двоичный файл.
+
+    :param transactions: TransactionTable или итерируемый источник словарей транзакций
+    :param path: Путь к файлу
+    :return: Число записанных строк
+    :raises ValueError: Если дата или сумма какой-либо транзакции имеют неверный формат
+    """
+    table = transactions if isinstance(transactions, TransactionTable) else TransactionTable.from_records(transactions)
+    sections: list[tuple[str, bytes]] = []
+    for name in INT_COLUMNS:
+        sections.append((f"column.{name}", _column_bytes(table.columns[name], "q")))
+    for name in CATEGORY_COLUMNS:
+        sections.append((f"column.{name}", _column_bytes(table.columns[name], "i")))
+
+    categories: dict[str, dict[str, int]] = {}
+    for name in CATEGORY_COLUMNS:
+        offsets, blob, null_code = _string_table(table.categories[name])
+        sections.append((f"offsets.{name}", offsets))
+        sections.append((f"strings.{name}", blob))
+        categories[name] = {"count": len(table.categories[name]), "null": null_code}
+
+    date_keys, date_positions = _date_order(table.columns["date"])
+    sections.append(("index.date_keys", date_keys.tobytes()))
+    sections.append(("index.date_positions", date_positions.tobytes()))
+    state_positions, state_ranges = _state_postings(table.columns["state"], len(table.categories["state"]))
+    sections.append(("index.state_positions", state_positions.tobytes()))
+
+    # Смещения разделов считаются от начала области данных, поэтому не зависят от длины заголовка
+    layout = {}
+    offset = 0
+    for name, data in sections:
+        layout[name] = [offset, len(data)]
+        offset += len(data) + _pad(len(data))
+    header = json.dumps(
+        {
+            "version": FORMAT_VERSION,
+            "byteorder": sys.byteorder,
+            "rows": len(table),
+            "sections": layout,
+            "categories": categories,
+            "state_index": state_ranges,
+        },
+        ensure_ascii=False,
+    ).encode("utf-8")
+    header += b" " * _pad(len(MAGIC) + 8 + len(header))
+
+    with open(path, "wb") as f:
+        f.write(MAGIC)
+        f.write(len(header).to_bytes(8, "little"))
+        f.write(header)
+        for _, data in sections:
+            f.write(data)
+            f.write(b"\0" * _pad(len(data)))
+    return len(table)
+
+
+def convert_json(source: PathType, target: PathType) -> int:
+    """
+    Преобразует файл операций JSON или JSON Lines в двоичный формат.
+
+    :param source: Путь к исходному файлу
+    :param target: Путь к двоичному файлу
+    :return: Число записанных строк
+    """
+    return write_binary(TransactionTable.from_file(source), target)
+
+
+class MappedTransactionTable(TransactionTable):
+    """
+    Таблица транзакций только для чтения поверх отображенного в память двоичного файла.
+
+    Колонки - memoryview над файлом, строки таблиц строк декодируются один раз при открытии.
+    Таблицу нужно закрыть (close или with), после этого колонки недоступны.
+    """
+
+    def __init__(self, path: PathType) -> None:
+        """
+        :param path: Путь к файлу, записанному write_binary
+        :raises ValueError: Если файл не в двоичном формате транзакций или записан с другим порядком байт
+        """
+        with open(path, "rb") as f:
+            self._stat = os.fstat(f.fileno())
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._buffer = memoryview(self._mmap)
+        self._views: list[memoryview] = [self._buffer]
+        try:
+            header = self._read_header()
+            self.header = header
+            data_start = len(MAGIC) + 8 + int.from_bytes(self._buffer[len(MAGIC) : len(MAGIC) + 8], "little")
+
+            def section(name: str, typecode: Literal["q", "i", "Q", "B"]) -> memoryview:
+                offset, size = header["sections"][name]
+                view = self._buffer[data_start + offset : data_start + offset + size].cast(typecode)
+                self._views.append(view)
+                return view
+
+            columns: dict[str, Sequence[int]] = {name: section(f"column.{name}", "q") for name in INT_COLUMNS}
+            columns.update({name: section(f"column.{name}", "i") for name in CATEGORY_COLUMNS})
+            categories = {}
+            for name in CATEGORY_COLUMNS:
+                offsets = section(f"offsets.{name}", "Q")
+                blob = section(f"strings.{name}", "B")
+                null_code = header["categories"][name]["null"]
+                values = [
+                    None if code == null_code else str(blob[offsets[code] : offsets[code + 1]], "utf-8")
+                    for code in range(header["categories"][name]["count"])
+                ]
+                categories[name] = Categories(values)
+            self.date_keys = section("index.date_keys", "q")
+            self.date_positions = section("index.date_positions", "q")
+            self._state_positions = section("index.state_positions", "q")
+        except BaseException:
+            self.close()
+            raise
+        super().__init__(columns, categories)
+
+    def _read_header(self) -> dict[str, Any]:
+        buffer = self._buffer
+        if bytes(buffer[: len(MAGIC)]) != MAGIC:
+            raise ValueError("Not a transaction binary file")
+        length = int.from_bytes(buffer[len(MAGIC) : len(MAGIC) + 8], "little")
+        header: dict[str, Any] = json.loads(bytes(buffer[len(MAGIC) + 8 : len(MAGIC) + 8 + length]))
+        if header.get("version") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported format version: {header.get('version')!r}")
+        if header["byteorder"] != sys.byteorder:
+            raise ValueError(f"File byte order {header['byteorder']} does not match this machine")
+        return header
+
+    def append(self, transaction: Row) -> int:
+        raise TypeError("MappedTransactionTable is read-only")
+
+    def state_positions(self, state: Optional[str]) -> Sequence[int]:
+        """
+        Номера строк с заданным статусом по индексу из файла, без просмотра колонки.
+
+        :param state: Статус
+        :return: Номера строк по возрастанию (memoryview над файлом)
+        """
+        code = self.categories["state"].find(state)
+        if code < 0:
+            return self._state_positions[0:0]
+        start, count = self.header["state_index"][code]
+        return self._state_positions[start : start + count]
+
+    def indexed_positions(self, name: str, value: Optional[str]) -> Optional[Sequence[int]]:
+        # Индекс в файле есть только по статусу
+        return self.state_positions(value) if name == "state" else None
+
+    def version_id(self) -> str:
+        """Идентификатор версии файла (устройство, inode, размер, время изменения) на момент открытия."""
+        stat = self._stat
+        return f"{stat.st_dev}:{stat.st_ino}:{stat.st_size}:{stat.st_mtime_ns}"
+
+    def date_index(self) -> DateIndex:
+        """DateIndex по этой таблице из сохраненного в файле порядка дат, без сортировки."""
+        return DateIndex.from_sorted(self, self.date_keys, self.date_positions)
+
+    def close(self) -> None:
+        """
+        Освобождает колонки и закрывает отображение файла.
+
+        :raises BufferError: Если на колонки еще ссылаются внешние объекты (например, массивы NumPy)
+        """
+        for view in reversed(self._views):
+            view.release()
+        self._views = []
+        self._mmap.close()
+
+    def __enter__(self) -> "MappedTransactionTable":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+def open_binary(path: PathType) -> MappedTransactionTable:
+    """
+    Открывает двоичный файл транзакций через mmap.
+
+    :param path: Путь к файлу, записанному write_binary или convert_json
+    :return: Таблица только для чтения
+    """
+    return MappedTransactionTable(os.fspath(path))
@@ -0,0 +1,163 @@
+"""
+Индекс транзакций по дате.
+
+Каждая дата разбирается один раз в целое число микросекунд от эпохи; индекс хранит отсортированные ключи
+и номера строк, поэтому запросы по периоду выполняются двоичным поиском, без повторного просмотра данных.
+"""
+
+import datetime
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Any, Sequence, Union
+
+from src.table import NULL, TransactionTable, parse_date
+
+Row = dict[str, Any]
+Collection = Union[list[Row], TransactionTable]
+DateBound = Union[str, datetime.date]
+
+
+def _to_key(bound: DateBound) -> int:
+    """Преобразует границу периода (строку ISO, date или datetime) в ключ индекса."""
+    return parse_date(bound if isinstance(bound, str) else bound.isoformat())
+
+
+class DateIndex:
+    """
+    Отсортированный индекс дат над списком словарей или TransactionTable.
+
+    Транзакции без даты в индекс не попадают. Индекс обновляется по мере добавления транзакций
+    через append или update, полная перестройка не требуется.
+    """
+
+    def __init__(self, transactions: Collection) -> None:
+        """
+        :param transactions: Список словарей или TransactionTable; индекс ссылается на коллекцию, а не копирует ее
+        :raises ValueError: Если дата какой-либо транзакции имеет неверный формат
+        """
+        self._transactions = transactions
+        self._keys = array("q")
+        self._positions = array("q")
+        self._indexed = 0
+        self.update()
+
+    @classmethod
+    def from_sorted(cls, transactions: Collection, keys: Sequence[int], positions: Sequence[int]) -> "DateIndex":
+        """
+        Создает индекс из готовых ключей и номеров строк, уже отсортированных по дате (например, из файла).
+
+        :param transactions: Коллекция, на строки которой ссылается индекс
+        :param keys: Даты в микросекундах по возрастанию
+        :param positions: Номера строк в том же порядке
+        :return: Индекс без повторной сортировки
+        """
+        index = cls.__new__(cls)
+        index._transactions = transactions
+        index._keys = keys  # type: ignore[assignment]
+        index._positions = positions  # type: ignore[assignment]
+        index._indexed = len(transactions)
+        return index
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def append(self, transaction: Row) -> int:
+        """
+        Добавляет транзакцию в коллекцию и в индекс.
+
+        :param transaction: Словарь транзакции
+        :return: Номер строки в коллекции
+        """
+        self._transactions.append(transaction)
+        self.update()
+        return len(self._transactions) - 1
+
+    def update(self) -> None:
+        """
+        Индексирует строки, добавленные в коллекцию напрямую с момента последнего обновления.
+
+        Строки в хронологическом порядке добавляются в конец индекса за O(1); несколько строк сразу
+        сортируются и сливаются с индексом.
+        """
+        start, stop = self._indexed, len(self._transactions)
+        if start == stop:
+            return
+        if isinstance(self._transactions, TransactionTable):
+            column = self._transactions.columns["date"]
+            new = [(column[position], position) for position in range(start, stop) if column[position] != NULL]
+        else:
+            rows = self._transactions
+            new = [
+                (parse_date(rows[position]["date"]), position)
+                for position in range(start, stop)
+                if rows[position].get("date") is not None
+            ]
+        self._indexed = stop
+        if not new:
+            return
+
+        new.sort()
+        if not self._keys or new[0][0] >= self._keys[-1]:
+            self._keys.extend(key for key, _ in new)
+            self._positions.extend(position for _, position in new)
+        elif len(new) == 1:
+            # Запись не по порядку: вставляем после всех записей с той же датой, сохраняя порядок строк
+            key, position = new[0]
+            index = bisect_right(self._keys, key)
+            self._keys.insert(index, key)
+            self._positions.insert(index, position)
+        else:
+            # Оба списка уже отсортированы, поэтому сортировка сводится к слиянию за O(n)
+            merged = list(zip(self._keys, self._positions)) + new
+            merged.sort(key=lambda item: item[0])
+            self._keys = array("q", (key for key, _ in merged))
+            self._positions = array("q", (position for _, position in merged))
+
+    def between(self, start: DateBound, end: DateBound) -> list[Row]:
+        """
+        Возвращает транзакции с датой в полуинтервале [start, end) по возрастанию даты.
+
+        :param start: Нижняя граница включительно (строка ISO, date или datetime)
+        :param end: Верхняя граница не включительно
+        :return: Список транзакций
+        """
+        low = bisect_left(self._keys, _to_key(start))
+        high = bisect_left(self._keys, _to_key(end), low)
+        return self._rows(self._positions[low:high])
+
+    def on(self, day: DateBound) -> list[Row]:
+        """
+        Возвращает транзакции за календарный день по возрастанию времени.
+
+        :param day: День строкой YYYY-MM-DD (время отбрасывается), date или datetime
+        :return: Список транзакций
+        """
+        if isinstance(day, str):
+            day = datetime.date.fromisoformat(day[:10])
+        elif isinstance(day, datetime.datetime):
+            day = day.date()
+        return self.between(day, day + datetime.timedelta(days=1))
+
+    def latest(self, count: int) -> list[Row]:
+        """
+        Возвращает count самых поздних транзакций, начиная с новейшей.
+
+        Порядок совпадает с sort_by_date(transactions, limit=count): транзакции с одинаковой датой
+        идут в порядке коллекции.
+
+        :param count: Число транзакций
+        :return: Список транзакций
+        """
+        if count <= 0 or not self._keys:
+            return []
+        count = min(count, len(self._keys))
+        # Берем все записи с датой не раньше граничной, чтобы равные даты вернулись в порядке коллекции
+        start = bisect_left(self._keys, self._keys[-count])
+        tail = sorted(zip(self._keys[start:], self._positions[start:]), key=lambda item: item[0], reverse=True)
+        return self._rows(position for _, position in tail[:count])
+
+    def _rows(self, positions: Any) -> list[Row]:
+        transactions = self._transactions
+        if isinstance(transactions, TransactionTable):
+            return [transactions.row(position) for position in positions]
+        return [transactions[position] for position in positions]
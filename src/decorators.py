@@ -1,52 +1,518 @@
-import datetime
-from typing import Callable, Any, Optional
-from functools import wraps
+import atexit
+import queue
+import sys
+import threading
+import time
+from functools import partial, wraps
+from itertools import count
+from time import perf_counter_ns
+from typing import Any, AsyncIterator, Callable, Iterator, Optional
 
+from src import metrics
+from src.metrics import MetricsRegistry
 
-def log(filename: Optional[str] = None) -> Callable:
+# Кэш отформатированной метки времени: strftime вызывается не чаще раза в секунду
+_stamp_cache: tuple[int, str] = (-1, "")
+
+
+def _timestamp() -> str:
+    """Возвращает текущее время в формате "%Y-%m-%d %H:%M:%S"."""
+    global _stamp_cache
+    second = int(time.time())
+    cached_second, stamp = _stamp_cache
+    if second != cached_second:
+        stamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(second))
+        _stamp_cache = (second, stamp)
+    return stamp
+
+
+# Процесс завершается: приемники закрыты обработчиками atexit, новые уже не будут закрыты при выходе
+_shutting_down = False
+
+
+class BufferedLogSink:
+    """
+    Фоновая запись логов в файл.
+
+    Сообщения складываются в ограниченную очередь, а отдельный поток пишет их в файл пакетами:
+    когда накопилось batch_size сообщений или прошло flush_interval секунд.
+    Если очередь заполнена, вызывающий поток ждет (block=True) или сообщение отбрасывается (block=False).
+    Если запись в файл не удалась, приемник переходит в состояние ошибки (error): ошибка выводится в stderr,
+    а этот и все следующие сообщения отбрасываются и учитываются в dropped, чтобы вызывающие потоки не ждали
+    места в очереди, которую больше никто не освободит.
+    """
+
+    def __init__(
+        self,
+        filename: str,
+        flush_interval: float = 1.0,
+        batch_size: int = 1000,
+        max_queue: int = 10000,
+        block: bool = True,
+    ) -> None:
+        """
+        :param filename: Имя файла для записи логов
+        :param flush_interval: Максимальная задержка записи сообщения в секундах
+        :param batch_size: Максимальное число сообщений в одной записи
+        :param max_queue: Максимальное число сообщений в очереди
+        :param block: Ждать ли освобождения места в заполненной очереди (иначе сообщение отбрасывается)
+        :raises OSError: Если файл не удается открыть
+        """
+        # Файл открывается сразу, чтобы ошибка пути проявилась в вызывающем потоке
+        self._file = open(filename, "a", encoding="utf-8")
+        self.filename = filename
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.block = block
+        self.dropped = 0
+        self.error: Optional[Exception] = None
+        self._queue: queue.Queue[Optional[str]] = queue.Queue(maxsize=max_queue)
+        self._closed = False
+        # Проверка _closed и постановка в очередь атомарны относительно close: сообщение не попадает в очередь
+        # после сигнала остановки, где его уже никто не прочитает
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name=f"log-sink:{filename}", daemon=True)
+        self._thread.start()
+        atexit.register(self._close_at_exit)
+
+    def write(self, message: str, block: Optional[bool] = None) -> None:
+        """
+        Ставит сообщение в очередь на запись.
+
+        :param block: Ждать ли места в заполненной очереди; по умолчанию - значение, заданное при создании
+        :raises ValueError: Если приемник закрыт
+        """
+        with self._lock:
+            if self._closed:
+                raise ValueError("Log sink is closed")
+            if self.error is not None:
+                self.dropped += 1
+            elif self.block if block is None else block:
+                # Фоновый поток не берет _lock, поэтому ожидание места в очереди под блокировкой не мешает ему
+                self._queue.put(message)
+            else:
+                try:
+                    self._queue.put_nowait(message)
+                except queue.Full:
+                    self.dropped += 1
+
+    def flush(self) -> None:
+        """Ждет, пока все сообщения из очереди будут записаны в файл."""
+        self._queue.join()
+
+    def close(self) -> None:
+        """Записывает оставшиеся сообщения и останавливает фоновый поток."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(None)
+        self._thread.join()
+        atexit.unregister(self._close_at_exit)
+
+    def _close_at_exit(self) -> None:
+        global _shutting_down
+        _shutting_down = True
+        self.close()
+
+    def _run(self) -> None:
+        try:
+            while True:
+                batch, stop = self._collect()
+                if batch:
+                    self._write_batch(batch)
+                # task_done вызывается для каждого сообщения и после ошибки, иначе flush ждал бы вечно
+                for _ in range(len(batch) + stop):
+                    self._queue.task_done()
+                if stop:
+                    return
+        finally:
+            try:
+                self._file.close()
+            except OSError:
+                pass
+
+    def _write_batch(self, batch: list[str]) -> None:
+        if self.error is None:
+            try:
+                self._file.write("".join(batch))
+                self._file.flush()
+                return
+            except Exception as e:
+                # Исключение не должно останавливать поток: очередь перестанет разбираться, и вызывающие потоки
+                # с block=True зависнут
+                self.error = e
+                sys.stderr.write(f"Log sink {self.filename}: write failed, messages are dropped: {e!r}\n")
+        self.dropped += len(batch)
+
+    def _collect(self) -> tuple[list[str], bool]:
+        """Собирает пакет сообщений; второй элемент - получен ли сигнал остановки."""
+        batch: list[str] = []
+        message = self._queue.get()
+        deadline = time.monotonic() + self.flush_interval
+        while message is not None:
+            batch.append(message)
+            if len(batch) >= self.batch_size:
+                return batch, False
+            try:
+                message = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                return batch, False
+        return batch, True
+
+
+_sinks: dict[str, BufferedLogSink] = {}
+_sinks_lock = threading.Lock()
+
+
+def get_sink(filename: str, **options: Any) -> BufferedLogSink:
+    """
+    Возвращает общий фоновый приемник логов для файла, создавая его при первом обращении.
+
+    :param filename: Имя файла для записи логов
+    :param options: Параметры BufferedLogSink (используются только при создании)
+    :return: Приемник логов
+    """
+    with _sinks_lock:
+        sink = _sinks.get(filename)
+        if sink is None or sink._closed:
+            sink = _sinks[filename] = BufferedLogSink(filename, **options)
+        return sink
+
+
+def close_sinks() -> None:
+    """Записывает оставшиеся сообщения и закрывает все фоновые приемники логов."""
+    with _sinks_lock:
+        sinks = list(_sinks.values())
+        _sinks.clear()
+    for sink in sinks:
+        sink.close()
+
+
+# Флаги объекта кода корутинной функции и асинхронного генератора (inspect.CO_COROUTINE, CO_ASYNC_GENERATOR)
+_CO_COROUTINE = 0x80
+_CO_ASYNC_GENERATOR = 0x200
+
+
+def _has_code_flag(func: Callable[..., Any], flag: int) -> bool:
+    """
+    То же, что inspect.iscoroutinefunction / isasyncgenfunction, без импорта inspect (он тянет ast и dis
+    и заметно замедляет импорт модуля).
+    """
+    func = getattr(func, "__func__", func)
+    while isinstance(func, partial):
+        func = func.func
+    code = getattr(func, "__code__", None)
+    return code is not None and bool(code.co_flags & flag)
+
+
+# Уровни log: все сообщения, только ошибки, логирование выключено
+LOG_LEVELS = ("info", "error", "off")
+# Ограничение длины текста аргументов в сообщении об ошибке по умолчанию
+MAX_REPR = 1000
+
+# Скобки встроенных коллекций, которые _repr_pieces обходит поэлементно (пустые - через repr)
+_CONTAINERS: dict[type, tuple[str, str]] = {
+    list: ("[", "]"),
+    tuple: ("(", ")"),
+    dict: ("{", "}"),
+    set: ("{", "}"),
+    frozenset: ("frozenset({", "})"),
+}
+
+
+def _repr_pieces(value: Any, limit: int, active: set[int]) -> Iterator[str]:
+    """
+    Части repr(value) по порядку. Встроенные коллекции обходятся поэлементно, поэтому потребитель может
+    остановиться, как только текст превысил limit; строки и байты заранее обрезаются до limit символов.
+    """
+    kind = type(value)
+    if kind is str or kind is bytes:
+        yield repr(value[: limit + 1])
+        return
+    if kind not in _CONTAINERS or not value:
+        yield repr(value)
+        return
+    if id(value) in active:
+        # Ссылка коллекции на саму себя, как у встроенного repr
+        yield "{...}" if kind is dict else "[...]"
+        return
+    active.add(id(value))
+    opening, closing = _CONTAINERS[kind]
+    yield opening
+    for number, item in enumerate(value):
+        if number:
+            yield ", "
+        yield from _repr_pieces(item, limit, active)
+        if kind is dict:
+            yield ": "
+            yield from _repr_pieces(value[item], limit, active)
+    if kind is tuple and len(value) == 1:
+        yield ","
+    yield closing
+    active.discard(id(value))
+
+
+def _bounded_repr(value: Any, limit: int) -> str:
+    """repr(value), если он не длиннее limit символов, иначе его первые символы с "..." на конце."""
+    pieces = []
+    size = 0
+    for piece in _repr_pieces(value, limit, set()):
+        pieces.append(piece)
+        size += len(piece)
+        if size > limit:
+            break
+    return _truncate("".join(pieces), limit)
+
+
+def _truncate(text: str, limit: int) -> str:
+    return text if len(text) <= limit else text[: max(limit - 3, 0)] + "..."
+
+
+def format_inputs(args: tuple[Any, ...], kwargs: dict[str, Any], max_repr: Optional[int] = MAX_REPR) -> str:
+    """
+    Текст аргументов вызова для сообщения об ошибке.
+
+    Аргументы, чей repr не длиннее max_repr, записываются как есть; у длинных строится только начало
+    представления, поэтому ошибка с большим аргументом не тратит время на его полный repr.
+
+    :param max_repr: Максимальная длина представления args и kwargs (каждого); None - полный repr
+    :return: Строка вида "(1, 2), {'y': 0}"
+    """
+    if max_repr is None:
+        return f"{args}, {kwargs}"
+    return f"{_bounded_repr(args, max_repr)}, {_bounded_repr(kwargs, max_repr)}"
+
+
+def _console_writer(message: str) -> None:
+    print(message, end="")
+
+
+def _file_writer(filename: str) -> Callable[[str], None]:
+    def write(message: str) -> None:
+        with open(filename, "a", encoding="utf-8") as f:
+            f.write(message)
+
+    return write
+
+
+def _sink_writer(filename: str, nowait: bool = False, **options: Any) -> Callable[[str], None]:
+    """
+    Запись через общий фоновый приемник файла. Логирование не должно превращать успешный вызов в исключение:
+    закрытый приемник (close_sinks) заменяется новым, а после закрытия при завершении процесса сообщения
+    пишутся в файл напрямую (с nowait - отбрасываются и учитываются в dropped).
+
+    :param nowait: Не ждать места в заполненной очереди и не писать в файл напрямую, независимо от block
+        приемника (для цикла событий)
+    """
+    block = False if nowait else None
+    sink = get_sink(filename, **options)
+    direct = _file_writer(filename)
+
+    def fallback(message: str) -> None:
+        if nowait:
+            # Прямая запись в файл остановила бы цикл событий на файловом вводе-выводе
+            sink.dropped += 1
+        else:
+            direct(message)
+
+    def write(message: str) -> None:
+        nonlocal sink
+        if sink._closed:
+            if _shutting_down:
+                fallback(message)
+                return
+            sink = get_sink(filename, **options)
+        try:
+            sink.write(message, block)
+        except ValueError:
+            # Приемник закрыт другим потоком между проверкой и записью
+            fallback(message)
+
+    return write
+
+
+def log(
+    filename: Optional[str] = None,
+    buffered: bool = False,
+    flush_interval: float = 1.0,
+    batch_size: int = 1000,
+    max_queue: int = 10000,
+    block: bool = True,
+    level: str = "info",
+    sample: int = 1,
+    max_repr: Optional[int] = MAX_REPR,
+) -> Callable:
     """
     Декоратор для логирования работы функций.
 
+    Поддерживаются обычные функции, корутинные функции и асинхронные генераторы: для асинхронных
+    результат логируется после фактического завершения, а запись в файл всегда идет через фоновый поток.
+    Время и текст сообщения получаются только для сообщений, которые действительно записываются.
+
     :param filename: Имя файла для записи логов. Если не указано, логи выводятся в консоль.
+    :param buffered: Писать в файл из фонового потока пакетами, не блокируя вызывающий поток на файловом вводе-выводе
+    :param flush_interval: Для buffered - максимальная задержка записи в секундах
+    :param batch_size: Для buffered - максимальное число сообщений в одной записи
+    :param max_queue: Для buffered - размер очереди сообщений
+    :param block: Для buffered - ждать ли места в заполненной очереди (иначе сообщение отбрасывается);
+        асинхронные функции никогда не ждут
+    :param level: "info" - все сообщения, "error" - только ошибки, "off" - функция возвращается без обертки
+    :param sample: Записывать одно из sample успешных завершений (ошибки записываются всегда)
+    :param max_repr: Ограничение длины аргументов в сообщении об ошибке; None - полный repr
     :return: Декорированная функция
+    :raises ValueError: Если уровень неизвестен или sample меньше 1
     """
+    if level not in LOG_LEVELS:
+        raise ValueError(f"Unknown log level: {level}")
+    if sample < 1:
+        raise ValueError("Sample rate must be positive")
 
     def decorator(func: Callable) -> Callable:
+        if level == "off":
+            return func
+        func_name = func.__name__
+        is_async = _has_code_flag(func, _CO_COROUTINE) or _has_code_flag(func, _CO_ASYNC_GENERATOR)
+        write: Callable[[str], None]
+        if filename and (buffered or is_async):
+            # Асинхронные функции всегда пишут в файл через фоновый поток и никогда не ждут места в очереди,
+            # чтобы не блокировать цикл событий: лишние сообщения отбрасываются и учитываются в dropped
+            write = _sink_writer(
+                filename,
+                is_async,
+                flush_interval=flush_interval,
+                batch_size=batch_size,
+                max_queue=max_queue,
+                block=block,
+            )
+        elif filename:
+            write = _file_writer(filename)
+        else:
+            write = _console_writer
+
+        calls = count()
+
+        def log_ok() -> None:
+            # Счетчик вызовов next(count) атомарен в CPython, поэтому выборка корректна и при нескольких потоках
+            if level == "info" and (sample == 1 or not next(calls) % sample):
+                write(f"{_timestamp()} {func_name} ok\n")
+
+        def log_error(error: Exception, args: tuple[Any, ...], kwargs: dict[str, Any]) -> None:
+            inputs = format_inputs(args, kwargs, max_repr)
+            write(f"{_timestamp()} {func_name} error: {type(error).__name__}. Inputs: {inputs}\n")
+
+        if _has_code_flag(func, _CO_ASYNC_GENERATOR):
+
+            @wraps(func)
+            async def async_gen_wrapper(*args: Any, **kwargs: Any) -> AsyncIterator[Any]:
+                # Генератор считается завершенным, когда исчерпан; время берется в момент завершения.
+                # Значения asend и исключения athrow передаются исходному генератору
+                agen = func(*args, **kwargs)
+                try:
+                    value = None
+                    thrown: Optional[BaseException] = None
+                    while True:
+                        try:
+                            item = await (agen.asend(value) if thrown is None else agen.athrow(thrown))
+                        except StopAsyncIteration:
+                            break
+                        except Exception as e:
+                            log_error(e, args, kwargs)
+                            raise
+                        value, thrown = None, None
+                        try:
+                            value = yield item
+                        except GeneratorExit:
+                            # aclose потребителя: исходный генератор закрывается в finally
+                            raise
+                        except BaseException as e:
+                            thrown = e
+                    log_ok()
+                finally:
+                    await agen.aclose()
+
+            return async_gen_wrapper
+
+        if _has_code_flag(func, _CO_COROUTINE):
+
+            @wraps(func)
+            async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                # Логируем после завершения корутины, а не после создания объекта корутины
+                try:
+                    result = await func(*args, **kwargs)
+                except Exception as e:
+                    log_error(e, args, kwargs)
+                    raise
+                log_ok()
+                return result
+
+            return async_wrapper
+
         @wraps(func)
         def wrapper(*args: Any, **kwargs: Any) -> Any:
-            # Получаем текущее время
-            current_time = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            func_name = func.__name__
-
             try:
                 # Выполняем функцию
                 result = func(*args, **kwargs)
+            except Exception as e:
+                # Формируем сообщение об ошибке и пробрасываем исключение дальше
+                log_error(e, args, kwargs)
+                raise
 
-                # Формируем сообщение об успехе
-                log_message = f"{current_time} {func_name} ok\n"
+            # Формируем сообщение об успехе (с учетом уровня и выборки)
+            log_ok()
+            return result
 
-                # Логируем в файл или консоль
-                if filename:
-                    with open(filename, "a", encoding="utf-8") as f:
-                        f.write(log_message)
-                else:
-                    print(log_message, end="")
+        return wrapper
 
-                return result
+    return decorator
 
-            except Exception as e:
-                # Формируем сообщение об ошибке
-                error_message = f"{current_time} {func_name} error: {type(e).__name__}. Inputs: {args}, {kwargs}\n"
 
-                # Логируем в файл или консоль
-                if filename:
-                    with open(filename, "a", encoding="utf-8") as f:
-                        f.write(error_message)
-                else:
-                    print(error_message, end="")
+def timed(
+    name: Optional[str] = None, registry: Optional[MetricsRegistry] = None
+) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """
+    Декоратор, записывающий число вызовов, ошибки и длительность функции в реестр метрик.
+
+    Время измеряется монотонными часами perf_counter_ns; для корутинных функций - до завершения await.
 
-                # Пробрасываем исключение дальше
+    :param name: Имя функции в реестре (по умолчанию "модуль.имя")
+    :param registry: Реестр метрик (по умолчанию src.metrics.registry)
+    :return: Декорированная функция
+    :raises TypeError: Если декорируется асинхронный генератор
+    """
+
+    def decorator(func: Callable[..., Any]) -> Callable[..., Any]:
+        if _has_code_flag(func, _CO_ASYNC_GENERATOR):
+            # Вызов асинхронного генератора только создает объект: измерялось бы создание, а не работа
+            raise TypeError(f"timed does not support async generator functions: {func.__qualname__}")
+        stats = (registry or metrics.registry).stats(name or f"{func.__module__}.{func.__qualname__}")
+        record = stats.record
+
+        if _has_code_flag(func, _CO_COROUTINE):
+
+            @wraps(func)
+            async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                start = perf_counter_ns()
+                try:
+                    result = await func(*args, **kwargs)
+                except Exception:
+                    record(perf_counter_ns() - start, True)
+                    raise
+                record(perf_counter_ns() - start)
+                return result
+
+            return async_wrapper
+
+        @wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            start = perf_counter_ns()
+            try:
+                result = func(*args, **kwargs)
+            except Exception:
+                record(perf_counter_ns() - start, True)
                 raise
+            record(perf_counter_ns() - start)
+            return result
 
         return wrapper
 
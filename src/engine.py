@@ -0,0 +1,186 @@
+"""
+Векторизованный движок фильтрации и сортировки на NumPy.
+
+NumPy - необязательная зависимость: модуль импортирует ее только при первом обращении,
+а запросы src.query (и функции src.processing поверх них) переключаются на этот движок автоматически,
+если NumPy установлен и в таблице не меньше NUMPY_THRESHOLD строк.
+"""
+
+from array import array
+from types import ModuleType
+from typing import Any, Optional, Sequence
+
+from src.table import INT_COLUMNS, NULL, TransactionTable
+
+# Начиная с этого числа строк векторизованный путь быстрее чистого Python
+NUMPY_THRESHOLD = 10_000
+
+_numpy: Optional[ModuleType] = None
+_numpy_checked = False
+
+
+def get_numpy() -> Optional[ModuleType]:
+    """Возвращает модуль numpy или None, если он не установлен. Импорт выполняется один раз."""
+    global _numpy, _numpy_checked
+    if not _numpy_checked:
+        try:
+            import numpy
+        except ImportError:
+            _numpy = None
+        else:
+            _numpy = numpy
+        _numpy_checked = True
+    return _numpy
+
+
+def require_numpy() -> ModuleType:
+    """
+    Возвращает модуль numpy.
+
+    :raises ImportError: Если NumPy не установлен
+    """
+    numpy = get_numpy()
+    if numpy is None:
+        raise ImportError("NumPy is required for the vectorized engine: pip install numpy")
+    return numpy
+
+
+def use_numpy(size: int) -> bool:
+    """Проверяет, стоит ли обрабатывать данные такого размера векторизованным движком."""
+    return size >= NUMPY_THRESHOLD and get_numpy() is not None
+
+
+def column_array(table: TransactionTable, name: str) -> Any:
+    """
+    Возвращает колонку таблицы как массив NumPy без копирования данных.
+
+    :param table: Таблица транзакций
+    :param name: Имя колонки
+    :return: numpy.ndarray с типом int64 для числовых колонок и int32 для кодов категорий
+    """
+    numpy = require_numpy()
+    dtype = numpy.int64 if name in INT_COLUMNS else numpy.intc
+    return numpy.frombuffer(table.columns[name], dtype=dtype)
+
+
+def positions_matching(
+    table: TransactionTable,
+    equals: Sequence[tuple[str, int]] = (),
+    ranges: Sequence[tuple[str, Optional[int], Optional[int]]] = (),
+    positions: Any = None,
+) -> Any:
+    """
+    Находит строки, удовлетворяющие всем условиям, одной булевой маской.
+
+    :param table: Таблица транзакций
+    :param equals: Пары (категориальная колонка, код значения)
+    :param ranges: Тройки (числовая колонка, нижняя граница включительно, верхняя граница не включительно);
+        None означает отсутствие границы, строки с NULL не подходят
+    :param positions: Номера строк-кандидатов по возрастанию (например, из индекса); по умолчанию все строки
+    :return: Массив номеров строк по возрастанию
+    """
+    numpy = require_numpy()
+    if positions is not None:
+        positions = numpy.asarray(positions, dtype=numpy.intp)
+
+    def values(name: str) -> Any:
+        column = column_array(table, name)
+        return column if positions is None else column[positions]
+
+    mask = numpy.ones(len(table) if positions is None else len(positions), dtype=bool)
+    for name, code in equals:
+        mask &= values(name) == code
+    for name, low, high in ranges:
+        column = values(name)
+        mask &= column != NULL
+        if low is not None:
+            mask &= column >= low
+        if high is not None:
+            mask &= column < high
+    matched = numpy.flatnonzero(mask)
+    return matched if positions is None else positions[matched]
+
+
+def column_order(table: TransactionTable, name: str, reverse: bool = True, positions: Any = None) -> Any:
+    """
+    Возвращает порядок строк по числовой колонке, устойчивый для одинаковых значений.
+
+    Как и sorted(..., reverse=True), при сортировке по убыванию строки с одинаковым значением
+    сохраняют исходный порядок. Колонка дат сортируется как datetime64.
+
+    :param table: Таблица транзакций
+    :param name: Имя числовой колонки
+    :param reverse: Порядок сортировки (True - по убыванию, False - по возрастанию)
+    :param positions: Номера строк, которые нужно упорядочить; по умолчанию все строки
+    :return: Массив номеров строк
+    :raises KeyError: Если у какой-либо из упорядочиваемых строк нет значения
+    """
+    numpy = require_numpy()
+    keys = column_array(table, name)
+    if positions is not None:
+        keys = keys[positions]
+    if (keys == NULL).any():
+        raise KeyError(name)
+    if name == "date":
+        keys = keys.view("datetime64[us]")
+    if not reverse:
+        order = numpy.argsort(keys, kind="stable")
+    else:
+        # Устойчивая сортировка перевернутой колонки, перевернутая обратно, дает убывание с исходным порядком равных
+        order = len(keys) - 1 - numpy.argsort(keys[::-1], kind="stable")[::-1]
+    return order if positions is None else numpy.asarray(positions)[order]
+
+
+def top_positions(
+    table: TransactionTable, name: str, count: int, reverse: bool = True, positions: Any = None
+) -> Any:
+    """
+    Возвращает первые count строк порядка column_order без полной сортировки.
+
+    Граничное значение находится частичной сортировкой за O(n), полностью сортируются только
+    отобранные строки. Среди строк с граничным значением берутся первые по исходному порядку,
+    поэтому результат совпадает с column_order(...)[:count].
+
+    :param table: Таблица транзакций
+    :param name: Имя числовой колонки
+    :param count: Сколько строк вернуть
+    :param reverse: Порядок сортировки (True - по убыванию, False - по возрастанию)
+    :param positions: Номера строк-кандидатов; по умолчанию все строки
+    :return: Массив номеров строк
+    :raises KeyError: Если у какой-либо из кандидатов нет значения
+    """
+    numpy = require_numpy()
+    candidates = numpy.arange(len(table)) if positions is None else numpy.asarray(positions, dtype=numpy.int64)
+    keys = column_array(table, name)[candidates]
+    if (keys == NULL).any():
+        raise KeyError(name)
+    if count <= 0:
+        return candidates[:0]
+    if count < len(keys):
+        if reverse:
+            boundary = numpy.partition(keys, len(keys) - count)[len(keys) - count]
+            strict = keys > boundary
+        else:
+            boundary = numpy.partition(keys, count - 1)[count - 1]
+            strict = keys < boundary
+        ties = numpy.flatnonzero(keys == boundary)[: count - int(strict.sum())]
+        selected = numpy.sort(numpy.concatenate([numpy.flatnonzero(strict), ties]))
+        candidates = candidates[selected]
+    return column_order(table, name, reverse, candidates)
+
+
+def take(table: TransactionTable, positions: Any) -> TransactionTable:
+    """
+    Векторизованный аналог TransactionTable.take.
+
+    :param table: Таблица транзакций
+    :param positions: Массив номеров строк
+    :return: Новая таблица с теми же таблицами строк
+    """
+    columns: dict[str, Sequence[int]] = {}
+    for name in table.columns:
+        typecode = "q" if name in INT_COLUMNS else "i"
+        column = array(typecode)
+        column.frombytes(column_array(table, name)[positions].tobytes())
+        columns[name] = column
+    return TransactionTable(columns, table.categories)
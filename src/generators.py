@@ -1,32 +1,151 @@
-from typing import Any, Dict, Iterator, List
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional
 
+from src.luhn import DOUBLED , luhn_sum
+from src.query import FIELDS , Query
+from src.readers import PathType , read_transactions
+from src.table import TransactionTable
+from src.widget import mask_account_card
 
-def filter_by_currency(transactions: List[Dict[str , Any]] , currency_code: str) -> Iterator[Dict[str , Any]]:
+
+def filter_by_currency(transactions: Iterable[Dict[str , Any]] , currency_code: str) -> Iterator[Dict[str , Any]]:
     """
     Фильтрует транзакции по валюте операции.
 
-    :param transactions: Список словарей с транзакциями
+    :param transactions: Итерируемый источник словарей с транзакциями (список или потоковый reader)
     :param currency_code: Код валюты для фильтрации
     :return: Итератор транзакций в указанной валюте
     """
-    for transaction in transactions :
-        operation_amount = transaction.get("operationAmount", {})
-        currency = operation_amount.get("currency", {})
-        if currency.get("code") == currency_code:
-            yield transaction
+    yield from Query(transactions).where(currency=currency_code)
 
 
-def transaction_descriptions(transactions: List[Dict[str , Any]]) -> Iterator[str]:
+def transaction_descriptions(transactions: Iterable[Dict[str , Any]]) -> Iterator[str]:
     """
     Извлекает описания транзакций.
 
-    :param transactions: Список словарей с транзакциями
+    :param transactions: Итерируемый источник словарей с транзакциями (список или потоковый reader)
     :return: Итератор описаний транзакций
     """
+    if isinstance(transactions , TransactionTable) :
+        for description in transactions.values("description") :
+            yield description or ""
+        return
+
     for transaction in transactions:
         yield transaction.get("description" , "")
 
 
+def _mask_item(item: Any) -> Any :
+    """Маскирует строку счета/карты или поля from/to в копии словаря транзакции."""
+    if isinstance(item , str) :
+        return mask_account_card(item)
+    masked = dict(item)
+    for field in ("from" , "to") :
+        if masked.get(field) :
+            masked[field] = mask_account_card(masked[field])
+    return masked
+
+
+def _batched(items: Iterable[Any] , size: int) -> Iterator[list[Any]] :
+    iterator = iter(items)
+    while batch := list(islice(iterator , size)) :
+        yield batch
+
+
+class Pipeline :
+    """
+    Ленивая цепочка обработки транзакций.
+
+    Методы добавляют этапы и возвращают этот же объект; данные читаются только при переборе результата,
+    по одному элементу, без промежуточных списков. После take(n) чтение источника прекращается,
+    как только получено n элементов.
+
+    Пример: Pipeline.from_file("operations.json").filter_state().filter_currency("USD").descriptions().take(20)
+    """
+
+    def __init__(self , source: Iterable[Any]) -> None :
+        """
+        :param source: Итерируемый источник: список, потоковый reader, TransactionTable или другой генератор
+        """
+        self._source = source
+        self._stages: list[Callable[[Iterator[Any]] , Iterator[Any]]] = []
+
+    @classmethod
+    def from_file(cls , path: PathType) -> "Pipeline" :
+        """Создает цепочку над файлом JSON или JSON Lines, который читается потоково."""
+        return cls(read_transactions(path))
+
+    def _then(self , stage: Callable[[Iterator[Any]] , Iterator[Any]]) -> "Pipeline" :
+        self._stages.append(stage)
+        return self
+
+    def filter_state(self , state: Optional[str] = "EXECUTED") -> "Pipeline" :
+        """Оставляет транзакции с заданным статусом."""
+        test = FIELDS["state"][1](state)
+        return self._then(lambda items : filter(test , items))
+
+    def filter_currency(self , currency_code: Optional[str]) -> "Pipeline" :
+        """Оставляет транзакции в заданной валюте."""
+        test = FIELDS["currency"][1](currency_code)
+        return self._then(lambda items : filter(test , items))
+
+    def filter(self , predicate: Callable[[Any] , bool]) -> "Pipeline" :
+        """Оставляет элементы, для которых predicate истинен."""
+        return self._then(lambda items : filter(predicate , items))
+
+    def descriptions(self) -> "Pipeline" :
+        """Заменяет транзакции их описаниями, как transaction_descriptions."""
+        return self._then(transaction_descriptions)
+
+    def mask(self) -> "Pipeline" :
+        """Маскирует номера: строки целиком, у словарей - поля from и to (в копиях словарей)."""
+        return self._then(lambda items : map(_mask_item , items))
+
+    def map(self , func: Callable[[Any] , Any]) -> "Pipeline" :
+        """Применяет функцию к каждому элементу."""
+        return self._then(lambda items : map(func , items))
+
+    def batch(self , size: int) -> "Pipeline" :
+        """
+        Группирует элементы в списки по size штук (последний может быть короче).
+
+        :raises ValueError: Если size меньше 1
+        """
+        if size < 1 :
+            raise ValueError("Batch size must be positive")
+        return self._then(lambda items : _batched(items , size))
+
+    def take(self , count: int) -> "Pipeline" :
+        """
+        Ограничивает результат первыми count элементами; источник дальше не читается.
+
+        :raises ValueError: Если count отрицательный
+        """
+        if count < 0 :
+            raise ValueError("Count must be non-negative")
+        return self._then(lambda items : islice(items , count))
+
+    def __iter__(self) -> Iterator[Any] :
+        items: Iterator[Any] = iter(self._source)
+        for stage in self._stages :
+            items = iter(stage(items))
+        return items
+
+    def to_list(self) -> list[Any] :
+        """Выполняет цепочку и возвращает список результатов."""
+        return list(self)
+
+
+# Номера карт - 16 цифр, запись "XXXX XXXX XXXX XXXX" занимает 19 байт
+CARD_NUMBER_LIMIT = 10**16
+CARD_RECORD_SIZE = 19
+# Последние четыре цифры перебираются по готовой таблице, первые 12 (префикс) меняются раз в BLOCK номеров
+BLOCK = 10_000
+_PAIRS = [f"{number:02d}" for number in range(100)]
+_SUFFIXES = [high + low for high in _PAIRS for low in _PAIRS]
+_PREFIX_OFFSETS = (0 , 1 , 2 , 3 , 5 , 6 , 7 , 8 , 10 , 11 , 12 , 13)
+
+
 def card_number_generator(start: int , end: int) -> Iterator[str]:
     """
     Генерирует номера банковских карт в заданном диапазоне.
@@ -39,8 +158,236 @@ def card_number_generator(start: int , end: int) -> Iterator[str]:
     if start > end:
         raise ValueError("Начальное значение не может быть больше конечного")
 
+    if 0 <= start and end < CARD_NUMBER_LIMIT:
+        for batch in card_number_batches(start , end):
+            yield from batch
+        return
+
     for num in range(start , end + 1):
         # Форматируем число в 16-значную строку с ведущими нулями
         num_str = str(num).zfill(16)
         # Разбиваем на группы по 4 цифры
         yield f"{num_str[:4]} {num_str[4 :8]} {num_str[8 :12]} {num_str[12 :16]}"
+
+
+def _check_range(start: int , end: int) -> None:
+    if start > end:
+        raise ValueError("Начальное значение не может быть больше конечного")
+    if start < 0 or end >= CARD_NUMBER_LIMIT:
+        raise ValueError("Номер карты должен быть от 0 до 9999 9999 9999 9999")
+
+
+def _segments(start: int , end: int , block: int = BLOCK) -> Iterator[tuple[int , int , int]]:
+    """Делит диапазон [start, end] на отрезки с общим префиксом: (префикс, первый суффикс, суффикс за последним)."""
+    for prefix in range(start // block , end // block + 1):
+        low = start - prefix * block if prefix == start // block else 0
+        high = end - prefix * block + 1 if prefix == end // block else block
+        yield prefix , low , high
+
+
+def _format_prefix(prefix: int) -> str:
+    digits = f"{prefix:012d}"
+    return f"{digits[:4]} {digits[4 :8]} {digits[8 :]} "
+
+
+def _rebatch(segments: Iterable[list[str]] , batch_size: int) -> Iterator[list[str]]:
+    """
+    Перекладывает номера из сегментов в списки по batch_size штук.
+
+    Готовые списки вырезаются со смещения, а остаток сдвигается один раз на сегмент, поэтому каждый номер
+    копируется постоянное число раз при любом batch_size.
+    """
+    batch: list[str] = []
+    for segment in segments:
+        batch += segment
+        offset = 0
+        while len(batch) - offset >= batch_size:
+            yield batch[offset : offset + batch_size]
+            offset += batch_size
+        del batch[:offset]
+    if batch:
+        yield batch
+
+
+def card_number_batches(start: int , end: int , batch_size: int = BLOCK) -> Iterator[list[str]]:
+    """
+    Генерирует номера карт списками по batch_size штук.
+
+    Префикс из первых 12 цифр форматируется один раз на 10 000 номеров, последние четыре цифры берутся
+    из готовой таблицы, поэтому каждый номер - одна конкатенация строк.
+
+    :param start: Начальный номер карты
+    :param end: Конечный номер карты включительно
+    :param batch_size: Размер списка (последний может быть короче)
+    :return: Итератор списков номеров в формате "XXXX XXXX XXXX XXXX"
+    :raises ValueError: Если start > end, номер вне диапазона 16-значных номеров или batch_size меньше 1
+    """
+    _check_range(start , end)
+    if batch_size < 1:
+        raise ValueError("batch_size must be positive")
+
+    def segments() -> Iterator[list[str]]:
+        for prefix , low , high in _segments(start , end):
+            prefix_str = _format_prefix(prefix)
+            yield [prefix_str + suffix for suffix in _SUFFIXES[low :high]]
+
+    yield from _rebatch(segments() , batch_size)
+
+
+def _record_views(start: int , end: int , separator: bytes) -> Iterator[memoryview]:
+    """
+    Отдает номера диапазона участками общего буфера записей фиксированной длины.
+
+    Буфер на 10 000 записей заполняется суффиксами и разделителями один раз; при переходе к следующему
+    префиксу переписываются только изменившиеся цифры - обычно одна-две позиции во всех записях сразу.
+    Участок действителен до следующей итерации.
+    """
+    size = CARD_RECORD_SIZE + len(separator)
+    buffer = bytearray(b"".join(b"0000 0000 0000 " + suffix.encode() + separator for suffix in _SUFFIXES))
+    current = b"000000000000"
+    view = memoryview(buffer)
+    for prefix , low , high in _segments(start , end):
+        digits = b"%012d" % prefix
+        for index , offset in enumerate(_PREFIX_OFFSETS):
+            if digits[index] != current[index]:
+                buffer[offset::size] = digits[index : index + 1] * BLOCK
+        current = digits
+        yield view[low * size : high * size]
+
+
+def card_number_buffers(start: int , end: int , separator: bytes = b"") -> Iterator[bytes]:
+    """
+    Генерирует номера карт блоками байтов: записи по 19 байт ("XXXX XXXX XXXX XXXX") и разделитель.
+
+    Блок без разделителя можно превратить в массив NumPy без копирования: numpy.frombuffer(block, dtype="S19").
+
+    :param start: Начальный номер карты
+    :param end: Конечный номер карты включительно
+    :param separator: Байты после каждой записи, например b"\\n"
+    :return: Итератор блоков до 10 000 номеров
+    :raises ValueError: Если start > end или номер вне диапазона 16-значных номеров
+    """
+    _check_range(start , end)
+    for view in _record_views(start , end , separator):
+        yield view.tobytes()
+
+
+def write_card_numbers(start: int , end: int , target: Any , separator: bytes = b"\n") -> int:
+    """
+    Записывает номера карт в бинарный файл или в буфер без создания строки на каждый номер.
+
+    :param start: Начальный номер карты
+    :param end: Конечный номер карты включительно
+    :param target: Файл, открытый в режиме "wb"/"ab" (любой объект с методом write), либо изменяемый буфер
+        (bytearray, memoryview, массив NumPy uint8) - тогда запись идет с начала буфера
+    :param separator: Байты после каждой записи
+    :return: Число записанных байт
+    :raises ValueError: Если start > end, номер вне диапазона или буфер слишком мал
+    """
+    _check_range(start , end)
+    total = (end - start + 1) * (CARD_RECORD_SIZE + len(separator))
+    if hasattr(target , "write"):
+        for view in _record_views(start , end , separator):
+            target.write(view)
+        return total
+
+    output = memoryview(target).cast("B")
+    if len(output) < total:
+        raise ValueError(f"Buffer too small: {total} bytes required")
+    offset = 0
+    for view in _record_views(start , end , separator):
+        output[offset : offset + len(view)] = view
+        offset += len(view)
+    return total
+
+
+def _luhn_tail(residue: int , tail: int) -> str:
+    """Последние три цифры номера без контрольной и контрольная цифра при сумме Луна префикса residue."""
+    a , b , c = tail // 100 , tail // 10 % 10 , tail % 10
+    return f"{tail:03d}{-(residue + DOUBLED[a] + b + DOUBLED[c]) % 10}"
+
+
+# Для каждого остатка суммы 12-значного префикса - 1000 готовых окончаний корректных номеров;
+# списки строятся при первом обращении, чтобы не замедлять импорт модуля
+_LUHN_TAILS: list[Optional[list[str]]] = [None] * 10
+
+
+def _luhn_tails(residue: int) -> list[str]:
+    tails = _LUHN_TAILS[residue]
+    if tails is None:
+        tails = _LUHN_TAILS[residue] = [_luhn_tail(residue , tail) for tail in range(1000)]
+    return tails
+
+
+def _bin_ranges(start: int , end: int , bins: Optional[Iterable[str]]) -> list[tuple[int , int]]:
+    """Пересекает [start, end] с диапазонами номеров, начинающихся с BIN-префиксов, и объединяет их."""
+    if bins is None:
+        return [(start , end)]
+    ranges = []
+    for prefix in bins:
+        if not (prefix.isascii() and prefix.isdigit()) or len(prefix) > 16:
+            raise ValueError(f"Invalid BIN prefix: {prefix!r}")
+        scale = 10 ** (16 - len(prefix))
+        low , high = max(start , int(prefix) * scale) , min(end , (int(prefix) + 1) * scale - 1)
+        if low <= high:
+            ranges.append((low , high))
+    ranges.sort()
+    merged: list[tuple[int , int]] = []
+    for low , high in ranges:
+        if merged and low <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0] , max(merged[-1][1] , high))
+        else:
+            merged.append((low , high))
+    return merged
+
+
+def _luhn_segments(start: int , end: int) -> Iterator[list[str]]:
+    """Корректные по Луну номера из [start, end] списками с общим 12-значным префиксом."""
+    first , last = start // 10 , end // 10
+    for prefix , low , high in _segments(first , last , 1000):
+        prefix_str = _format_prefix(prefix)
+        tails = _luhn_tails(luhn_sum(f"{prefix:012d}") % 10)[low :high]
+        # Номер с крайним телом может выйти за границу диапазона из-за контрольной цифры
+        if prefix * 1000 + low == first and int(tails[0][-1]) < start % 10:
+            tails = tails[1:]
+        if prefix * 1000 + high - 1 == last and tails and int(tails[-1][-1]) > end % 10:
+            tails = tails[:-1]
+        yield [prefix_str + tail for tail in tails]
+
+
+def luhn_card_number_batches(
+    start: int = 0 , end: int = CARD_NUMBER_LIMIT - 1 , bins: Optional[Iterable[str]] = None ,
+    batch_size: int = BLOCK
+) -> Iterator[list[str]]:
+    """
+    Генерирует только корректные по алгоритму Луна номера карт, списками по batch_size штук.
+
+    Среди каждых десяти подряд идущих номеров корректен ровно один. Сумма Луна первых 12 цифр считается
+    один раз на тысячу номеров, а окончание с контрольной цифрой берется из таблицы по остатку этой суммы.
+
+    :param start: Начальный номер карты
+    :param end: Конечный номер карты включительно
+    :param bins: BIN-префиксы (например, ["4", "51", "2200"]); если заданы, генерируются только номера с ними
+    :param batch_size: Размер списка (последний может быть короче)
+    :return: Итератор списков номеров в формате "XXXX XXXX XXXX XXXX" по возрастанию
+    :raises ValueError: Если диапазон некорректен, BIN не из цифр или длиннее 16 знаков, batch_size меньше 1
+    """
+    _check_range(start , end)
+    if batch_size < 1:
+        raise ValueError("batch_size must be positive")
+    segments = (segment for low , high in _bin_ranges(start , end , bins) for segment in _luhn_segments(low , high))
+    yield from _rebatch(segments , batch_size)
+
+
+def luhn_card_number_generator(start: int , end: int , bins: Optional[Iterable[str]] = None) -> Iterator[str]:
+    """
+    Генерирует корректные по алгоритму Луна номера карт в диапазоне [start, end].
+
+    :param start: Начальный номер карты
+    :param end: Конечный номер карты включительно
+    :param bins: BIN-префиксы, которыми должны начинаться номера
+    :return: Итератор номеров в формате "XXXX XXXX XXXX XXXX"
+    :raises ValueError: Если диапазон или BIN-префикс некорректен
+    """
+    for batch in luhn_card_number_batches(start , end , bins):
+        yield from batch
@@ -0,0 +1,195 @@
+"""
+Инвертированные индексы по статусу, валюте и номеру счета/карты.
+
+IndexedTransactions хранит транзакции вместе с индексами "значение -> номера строк"; индексы
+обновляются при каждой вставке и удалении, поэтому повторяющиеся запросы не просматривают данные заново.
+"""
+
+from array import array
+from bisect import bisect_left
+from typing import Any, Callable, Hashable, Iterable, Iterator, Optional, cast
+
+Row = dict[str, Any]
+
+
+def state_keys(transaction: Row) -> tuple[Hashable, ...]:
+    """Значение для индекса по статусу."""
+    return (transaction.get("state"),)
+
+
+def currency_keys(transaction: Row) -> tuple[Hashable, ...]:
+    """Значение для индекса по коду валюты operationAmount.currency.code."""
+    operation_amount = transaction.get("operationAmount")
+    currency = None if operation_amount is None else operation_amount.get("currency")
+    return (None if currency is None else currency.get("code"),)
+
+
+def account_number(account: Optional[str]) -> Optional[str]:
+    """
+    Извлекает номер счета или карты из строки вида "Счет 73654108430135874305" или "Visa Platinum 7000792289606361".
+
+    :param account: Значение поля from или to
+    :return: Номер (последнее слово строки) или None для пустого значения
+    """
+    if not account:
+        return None
+    return account.rsplit(maxsplit=1)[-1]
+
+
+def account_keys(transaction: Row) -> tuple[Hashable, ...]:
+    """Номера счетов и карт из полей from и to (без повторов)."""
+    numbers = {account_number(transaction.get("from")), account_number(transaction.get("to"))}
+    numbers.discard(None)
+    return tuple(numbers)
+
+
+# Имя индекса -> функция, возвращающая значения строки для индекса
+INDEX_KEYS: dict[str, Callable[[Row], tuple[Hashable, ...]]] = {
+    "state": state_keys,
+    "currency": currency_keys,
+    "account": account_keys,
+}
+
+
+class HashIndex:
+    """Инвертированный индекс: значение -> номера строк в массиве int64 по возрастанию."""
+
+    def __init__(self, keys: Callable[[Row], tuple[Hashable, ...]]) -> None:
+        """
+        :param keys: Функция, возвращающая значения строки для индекса
+        """
+        self.keys = keys
+        self._postings: dict[Hashable, "array[int]"] = {}
+
+    def add(self, position: int, transaction: Row) -> None:
+        """Добавляет строку в индекс. Номера строк должны добавляться по возрастанию."""
+        for value in self.keys(transaction):
+            postings = self._postings.get(value)
+            if postings is None:
+                postings = self._postings[value] = array("q")
+            postings.append(position)
+
+    def remove(self, position: int, transaction: Row) -> None:
+        """
+        Удаляет строку из индекса. Номер ищется двоичным поиском по отсортированному массиву,
+        а не линейным просмотром, как в array.remove.
+
+        :raises ValueError: Если строки нет в индексе
+        """
+        for value in self.keys(transaction):
+            postings = self._postings[value]
+            index = bisect_left(postings, position)
+            if index == len(postings) or postings[index] != position:
+                raise ValueError(f"Position {position} is not in the index")
+            del postings[index]
+            if not postings:
+                del self._postings[value]
+
+    def lookup(self, value: Hashable) -> "array[int]":
+        """Возвращает номера строк с заданным значением (пустой массив, если таких нет). Массив не копируется."""
+        return self._postings.get(value, array("q"))
+
+    def __len__(self) -> int:
+        return len(self._postings)
+
+
+class IndexedTransactions:
+    """
+    Коллекция транзакций с инвертированными индексами.
+
+    Номер строки, возвращенный insert, не меняется при удалении других строк: удаленные строки
+    помечаются пустыми до вызова compact.
+    """
+
+    def __init__(self, transactions: Iterable[Row] = (), fields: Iterable[str] = tuple(INDEX_KEYS)) -> None:
+        """
+        :param transactions: Начальные транзакции
+        :param fields: Имена индексов: state, currency и/или account
+        :raises ValueError: Если имя индекса не поддерживается
+        """
+        self._rows: list[Optional[Row]] = []
+        self._live = 0
+        self.indexes: dict[str, HashIndex] = {}
+        for field in fields:
+            if field not in INDEX_KEYS:
+                raise ValueError(f"Unknown index field: {field}")
+            self.indexes[field] = HashIndex(INDEX_KEYS[field])
+        for transaction in transactions:
+            self.insert(transaction)
+
+    def insert(self, transaction: Row) -> int:
+        """
+        Добавляет транзакцию и обновляет индексы.
+
+        :param transaction: Словарь транзакции
+        :return: Номер строки
+        """
+        position = len(self._rows)
+        self._rows.append(transaction)
+        self._live += 1
+        for index in self.indexes.values():
+            index.add(position, transaction)
+        return position
+
+    def delete(self, position: int) -> Row:
+        """
+        Удаляет транзакцию и обновляет индексы.
+
+        :param position: Номер строки
+        :return: Удаленная транзакция
+        :raises KeyError: Если строки нет или она уже удалена
+        """
+        transaction = self._rows[position] if 0 <= position < len(self._rows) else None
+        if transaction is None:
+            raise KeyError(position)
+        for index in self.indexes.values():
+            index.remove(position, transaction)
+        self._rows[position] = None
+        self._live -= 1
+        return transaction
+
+    def compact(self) -> None:
+        """Убирает удаленные строки и перестраивает индексы; номера строк при этом меняются."""
+        rows = [row for row in self._rows if row is not None]
+        self._rows = []
+        self._live = 0
+        for field, index in self.indexes.items():
+            self.indexes[field] = HashIndex(index.keys)
+        for row in rows:
+            self.insert(row)
+
+    def has_index(self, field: str) -> bool:
+        return field in self.indexes
+
+    def positions(self, field: str, value: Hashable) -> "array[int]":
+        """
+        Возвращает номера строк с заданным значением индекса за O(1).
+
+        :param field: Имя индекса
+        :param value: Значение (статус, код валюты или номер счета/карты)
+        :return: Массив номеров строк по возрастанию
+        :raises KeyError: Если такого индекса нет
+        """
+        return self.indexes[field].lookup(value)
+
+    def lookup(self, field: str, value: Hashable) -> list[Row]:
+        """Возвращает транзакции с заданным значением индекса в порядке вставки."""
+        rows = self._rows
+        # В индексах только неудаленные строки, поэтому None среди результатов не бывает
+        return cast(list[Row], [rows[position] for position in self.positions(field, value)])
+
+    def live_positions(self) -> Iterator[int]:
+        """Номера неудаленных строк по возрастанию."""
+        return (position for position, row in enumerate(self._rows) if row is not None)
+
+    def __getitem__(self, position: int) -> Row:
+        transaction = self._rows[position]
+        if transaction is None:
+            raise KeyError(position)
+        return transaction
+
+    def __len__(self) -> int:
+        return self._live
+
+    def __iter__(self) -> Iterator[Row]:
+        return (row for row in self._rows if row is not None)
@@ -0,0 +1,146 @@
+"""
+Контрольная сумма Луна для номеров карт.
+
+Сумма считается по группам из четырех цифр через готовую таблицу на 10 000 групп; для колонки номеров
+есть векторизованная проверка на NumPy.
+"""
+
+from typing import Any, Iterable
+
+# Цифра после удвоения (с вычитанием 9 для двузначного результата)
+DOUBLED = (0, 2, 4, 6, 8, 1, 3, 5, 7, 9)
+# Допустимая длина номера карты
+MIN_CARD_LENGTH = 12
+MAX_CARD_LENGTH = 19
+
+
+# Вклад пары цифр, если первая удваивается; вклад группы из четырех цифр - сумма вкладов двух пар
+_PAIR_SUMS = {f"{a}{b}": DOUBLED[a] + b for a in range(10) for b in range(10)}
+# Таблица на 10 000 групп заполняется при первом использовании, чтобы не замедлять импорт модуля
+_GROUP_SUMS: dict[str, int] = {}
+
+
+def _group_sums() -> dict[str, int]:
+    if not _GROUP_SUMS:
+        pairs = _PAIR_SUMS.items()
+        _GROUP_SUMS.update({high + low: high_sum + low_sum for high, high_sum in pairs for low, low_sum in pairs})
+    return _GROUP_SUMS
+
+
+def luhn_sum(digits: str) -> int:
+    """
+    Взвешенная сумма Луна: удваивается каждая вторая цифра, считая справа от последней (не удваиваемой).
+
+    :param digits: Строка из ASCII-цифр
+    :return: Сумма; номер корректен, если она делится на 10
+    :raises KeyError: Если в строке есть не только ASCII-цифры
+    """
+    # Ведущие нули не меняют сумму, а при длине, кратной 4, все группы имеют одинаковые позиции удвоения
+    digits = "000"[: -len(digits) % 4] + digits
+    sums = _GROUP_SUMS or _group_sums()
+    return sum(sums[digits[index : index + 4]] for index in range(0, len(digits), 4))
+
+
+def check_digit(payload: str) -> int:
+    """
+    Вычисляет контрольную цифру, которую нужно дописать к номеру.
+
+    :param payload: Номер без контрольной цифры (ASCII-цифры)
+    :return: Контрольная цифра от 0 до 9
+    :raises ValueError: Если payload содержит не только цифры
+    """
+    if not (payload.isascii() and payload.isdigit()):
+        raise ValueError("Payload must contain only digits")
+    return -luhn_sum(payload + "0") % 10
+
+
+def is_luhn_valid(number: str) -> bool:
+    """
+    Проверяет контрольную сумму Луна. Пробелы между группами цифр допускаются.
+
+    :param number: Номер строкой
+    :return: True, если номер из цифр и сумма Луна делится на 10
+    """
+    digits = number.replace(" ", "")
+    if len(digits) < 2 or not (digits.isascii() and digits.isdigit()):
+        return False
+    return luhn_sum(digits) % 10 == 0
+
+
+def validate_card_numbers(card_numbers: Iterable[Any]) -> list[bool]:
+    """
+    Проверяет набор номеров карт: 12-19 цифр (пробелы допускаются) и корректная сумма Луна.
+
+    :param card_numbers: Номера строками; значения других типов считаются некорректными
+    :return: Признак корректности для каждого номера
+    """
+    sums = _GROUP_SUMS or _group_sums()
+    result = []
+    for card_number in card_numbers:
+        digits = card_number.replace(" ", "") if isinstance(card_number, str) else ""
+        if MIN_CARD_LENGTH <= len(digits) <= MAX_CARD_LENGTH and digits.isascii() and digits.isdigit():
+            # Дополнение нулями до 20 цифр дает ровно пять групп с одинаковыми позициями удвоения
+            d = digits.zfill(20)
+            total = sums[d[:4]] + sums[d[4:8]] + sums[d[8:12]] + sums[d[12:16]] + sums[d[16:]]
+            result.append(total % 10 == 0)
+        else:
+            result.append(False)
+    return result
+
+
+def _word_sums_16(numpy: Any, matrix: Any) -> Any:
+    """
+    Суммы Луна для матрицы 16-значных номеров из ASCII-цифр, по два 64-битных слова на номер.
+
+    В словах удваиваются четные байты (столбцы 0, 2, 4, 6): 2d - 9, если d >= 5, где признак d >= 5 -
+    бит 3 байта d + 3. Байты слова после этого не больше 18, и их сумма получается умножением на 0x0101...01.
+    """
+    u64 = numpy.uint64
+    words = numpy.ascontiguousarray(matrix).view("<u8") - u64(0x3030303030303030)
+    even = words & u64(0x00FF00FF00FF00FF)
+    at_least_five = ((even + u64(0x0003000300030003)) >> u64(3)) & u64(0x0001000100010001)
+    values = words - even + even * u64(2) - at_least_five * u64(9)
+    sums = (values * u64(0x0101010101010101)) >> u64(56)
+    return sums.sum(axis=1)
+
+
+def validate_card_numbers_array(card_numbers: Any) -> Any:
+    """
+    Векторизованная проверка колонки номеров карт (требуется NumPy), результат совпадает с validate_card_numbers.
+
+    Номера разбираются в матрицу байтов; для строк четной и нечетной длины удваиваются цифры в четных
+    и нечетных столбцах соответственно, поэтому сумма сводится к четырем суммам по столбцам через таблицы.
+
+    :param card_numbers: Массив или последовательность строк (str или bytes)
+    :return: Булев массив NumPy
+    :raises ImportError: Если NumPy не установлен
+    :raises TypeError: Если колонка не строковая
+    """
+    from src.engine import require_numpy
+    from src.masks import _all_digits, _digit_matrix
+
+    numpy = require_numpy()
+    matrix = _digit_matrix(card_numbers)
+    count, width = matrix.shape
+    if width == 16 and matrix[:, 15].all():
+        # Все номера ровно из 16 символов: проверка и сумма по 64-битным словам
+        return _all_digits(numpy, matrix, 16) & (_word_sums_16(numpy, matrix) % 10 == 0)
+
+    codes = matrix - numpy.uint8(ord("0"))
+    # Таблицы по значению байта минус '0': байты-нули дополнения и прочие символы дают 0
+    plain_table = numpy.zeros(256, dtype=numpy.uint8)
+    plain_table[:10] = numpy.arange(10)
+    doubled_table = numpy.zeros(256, dtype=numpy.uint8)
+    doubled_table[:10] = DOUBLED
+    plain = plain_table[codes]
+    doubled = doubled_table[codes]
+
+    lengths = numpy.count_nonzero(matrix, axis=1)
+    digits = numpy.count_nonzero(codes < 10, axis=1)
+    even = lengths % 2 == 0
+    total = numpy.where(
+        even,
+        doubled[:, 0::2].sum(axis=1, dtype=numpy.int32) + plain[:, 1::2].sum(axis=1, dtype=numpy.int32),
+        plain[:, 0::2].sum(axis=1, dtype=numpy.int32) + doubled[:, 1::2].sum(axis=1, dtype=numpy.int32),
+    )
+    return (digits == lengths) & (lengths >= MIN_CARD_LENGTH) & (lengths <= MAX_CARD_LENGTH) & (total % 10 == 0)
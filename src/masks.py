@@ -1,3 +1,6 @@
+from typing import Any, Iterable, NamedTuple, Optional
+
+
 def get_mask_card_number(card_number: str) -> str:
     """Маскирует номер карты в формате XXXX XX** **** XXXX"""
     cleaned = card_number.replace(" ", "")
@@ -14,3 +17,183 @@ def get_mask_account(account_number: str) -> str:
         raise ValueError("Invalid account number format")
 
     return f"**{cleaned[-4:]}"
+
+
+class BatchResult(NamedTuple):
+    """Результат пакетной маскировки: маски по порядку входа и номера некорректных элементов."""
+
+    masked: list[Optional[str]]
+    invalid: list[int]
+
+
+def mask_card_numbers(card_numbers: Iterable[str]) -> BatchResult:
+    """
+    Маскирует набор номеров карт за один вызов.
+
+    Проверка и маскировка выполняются в одном цикле без вызова get_mask_card_number на каждый элемент.
+    Некорректный номер не прерывает обработку: на его месте стоит None, а его номер попадает в invalid.
+
+    :param card_numbers: Итерируемый источник номеров карт
+    :return: BatchResult с масками в формате XXXX XX** **** XXXX
+    """
+    masked: list[Optional[str]] = []
+    invalid: list[int] = []
+    for index, card_number in enumerate(card_numbers):
+        cleaned = card_number.replace(" ", "") if isinstance(card_number, str) else ""
+        if len(cleaned) == 16 and cleaned.isdigit():
+            masked.append(f"{cleaned[:4]} {cleaned[4:6]}** **** {cleaned[-4:]}")
+        else:
+            masked.append(None)
+            invalid.append(index)
+    return BatchResult(masked, invalid)
+
+
+def mask_accounts(account_numbers: Iterable[str]) -> BatchResult:
+    """
+    Маскирует набор номеров счетов за один вызов.
+
+    :param account_numbers: Итерируемый источник номеров счетов
+    :return: BatchResult с масками в формате **XXXX; на месте некорректных номеров - None
+    """
+    masked: list[Optional[str]] = []
+    invalid: list[int] = []
+    for index, account_number in enumerate(account_numbers):
+        cleaned = account_number.replace(" ", "") if isinstance(account_number, str) else ""
+        if len(cleaned) >= 4 and cleaned.isdigit():
+            masked.append(f"**{cleaned[-4:]}")
+        else:
+            masked.append(None)
+            invalid.append(index)
+    return BatchResult(masked, invalid)
+
+
+def _digit_matrix(numbers: Any) -> Any:
+    """Приводит колонку номеров к матрице байтов (по строке на номер) без пробелов, дополненной нулями."""
+    from src.engine import require_numpy
+
+    numpy = require_numpy()
+    column = numpy.asarray(numbers)
+    if column.size == 0:
+        return numpy.zeros((0, 1), dtype=numpy.uint8)
+    strings = getattr(numpy, "strings", numpy.char)
+    if column.dtype.kind == "U":
+        column = strings.encode(column, "utf-8")
+    elif column.dtype.kind != "S":
+        raise TypeError("Expected an array of str or bytes")
+
+    def as_matrix(values: Any) -> Any:
+        # Строки фиксированной ширины - это непрерывный буфер байтов, дополненный нулями
+        values = numpy.ascontiguousarray(values)
+        return values.view(numpy.uint8).reshape(len(values), values.dtype.itemsize)
+
+    matrix = as_matrix(column)
+    if (matrix == ord(" ")).any():
+        matrix = as_matrix(strings.replace(column, b" ", b""))
+    return matrix
+
+
+def _strided(numpy: Any, buffer: Any, dtype: str, offset: int, stride: int, count: int) -> Any:
+    """Представление буфера как колонки чисел с шагом stride байт (выравнивание не требуется)."""
+    return numpy.ndarray((count,), dtype=dtype, buffer=buffer, offset=offset, strides=(stride,))
+
+
+def _all_digits(numpy: Any, matrix: Any, columns: int) -> Any:
+    """
+    Проверяет, что первые columns байт каждой строки матрицы - ASCII-цифры.
+
+    Строка читается 64-битными словами (последнее слово может перекрываться с предыдущим), и в каждом
+    слове проверяются сразу 8 байт: байт b - цифра, если (b ^ 0x30) + 0x76 не выставляет старший бит.
+    """
+    count, width = matrix.shape
+    if columns < 8:
+        return ((matrix[:, :columns] - numpy.uint8(ord("0"))) < 10).all(axis=1)
+    u64 = numpy.uint64
+    valid = numpy.ones(count, dtype=bool)
+    for offset in sorted({*range(0, columns - 7, 8), columns - 8}):
+        shifted = _strided(numpy, matrix, "<u8", offset, width, count) ^ u64(0x3030303030303030)
+        valid &= (((shifted + u64(0x7676767676767676)) | shifted) & u64(0x8080808080808080)) == 0
+    return valid
+
+
+def mask_card_numbers_array(card_numbers: Any) -> tuple[Any, Any]:
+    """
+    Векторизованная маскировка колонки номеров карт (требуется NumPy).
+
+    Каждый 16-значный номер читается как два 64-битных слова: цифры проверяются побитовыми операциями
+    сразу по 8 байт, а маска собирается записью слов в выходной буфер. Учитываются только ASCII-цифры.
+
+    :param card_numbers: Массив или последовательность номеров (str или bytes)
+    :return: Кортеж (массив масок с типом S19, массив номеров некорректных элементов);
+        на месте некорректных номеров - пустая строка байтов
+    :raises ImportError: Если NumPy не установлен
+    """
+    from src.engine import require_numpy
+
+    numpy = require_numpy()
+    matrix = _digit_matrix(card_numbers)
+    count, width = matrix.shape
+    if count == 0 or width < 16:
+        return numpy.zeros(count, dtype="S19"), numpy.arange(count)
+
+    u64 = numpy.uint64
+    valid = _all_digits(numpy, matrix, 16)
+    if width > 16:
+        valid &= ~matrix[:, 16:].any(axis=1)
+
+    # Маска "DDDD DD** **** DDDD": байты 0-7 из первого слова, 8-14 постоянные, 15-18 из второго слова
+    buffer = numpy.zeros(count * 19, dtype=numpy.uint8)
+    low = _strided(numpy, matrix, "<u8", 0, width, count)
+    high = _strided(numpy, matrix, "<u8", 8, width, count)
+    _strided(numpy, buffer, "<u8", 0, 19, count)[:] = (
+        (low & u64(0xFFFFFFFF))
+        | u64(ord(" ") << 32)
+        | (((low >> u64(32)) & u64(0xFFFF)) << u64(40))
+        | u64(ord("*") << 56)
+    )
+    _strided(numpy, buffer, "<u8", 8, 19, count)[:] = int.from_bytes(b"* **** \0", "little")
+    _strided(numpy, buffer, "<u4", 15, 19, count)[:] = high >> u64(32)
+
+    masked = buffer.view("S19")
+    invalid = numpy.flatnonzero(~valid)
+    masked[invalid] = b""
+    return masked, invalid
+
+
+def mask_accounts_array(account_numbers: Any) -> tuple[Any, Any]:
+    """
+    Векторизованная маскировка колонки номеров счетов (требуется NumPy).
+
+    :param account_numbers: Массив или последовательность номеров (str или bytes)
+    :return: Кортеж (массив масок с типом S6, массив номеров некорректных элементов);
+        на месте некорректных номеров - пустая строка байтов
+    :raises ImportError: Если NumPy не установлен
+    """
+    from src.engine import require_numpy
+
+    numpy = require_numpy()
+    matrix = _digit_matrix(account_numbers)
+    count, width = matrix.shape
+    if count == 0:
+        return numpy.zeros(0, dtype="S6"), numpy.arange(0)
+    lengths = getattr(numpy, "strings", numpy.char).str_len(matrix.view(f"S{width}").ravel())
+    # Номера на всю ширину колонки проверяются словами, более короткие (дополненные нулями) - побайтно
+    # Номер короче 4 цифр некорректен: у него нет последних 4 цифр для маски
+    valid = (lengths == width) & (lengths >= 4) & _all_digits(numpy, matrix, width)
+    short = numpy.flatnonzero((lengths < width) & (lengths >= 4))
+    if short.size:
+        digits = (matrix[short] - numpy.uint8(ord("0"))) < 10
+        valid[short] = digits.sum(axis=1, dtype=numpy.uint16) == lengths[short]
+
+    buffer = numpy.zeros(count * 6, dtype=numpy.uint8)
+    _strided(numpy, buffer, "<u2", 0, 6, count)[:] = int.from_bytes(b"**", "little")
+    last_digits = _strided(numpy, buffer, "<u4", 2, 6, count)
+    # Обычно все номера одной длины, поэтому последние 4 цифры копируются одной операцией на каждую длину
+    for length in numpy.flatnonzero(numpy.bincount(lengths[valid], minlength=1)):
+        source = _strided(numpy, matrix, "<u4", int(length) - 4, width, count)
+        rows = valid & (lengths == length)
+        last_digits[rows] = source[rows]
+
+    masked = buffer.view("S6")
+    invalid = numpy.flatnonzero(~valid)
+    masked[invalid] = b""
+    return masked, invalid
@@ -0,0 +1,164 @@
+"""
+Реестр метрик задержки функций в памяти процесса.
+
+Для каждой функции хранятся число вызовов, число ошибок, суммарное, минимальное и максимальное время
+и гистограмма длительностей с логарифмическими корзинами, по которой оцениваются p50/p95/p99.
+Запись одного вызова - O(1): номер корзины вычисляется битовыми операциями над числом наносекунд.
+"""
+
+import math
+import threading
+from typing import NamedTuple
+
+# Каждая степень двойки делится на 2**SUB_BITS корзин: относительная погрешность квантилей не больше 1/16
+SUB_BITS = 3
+SUB_BUCKETS = 1 << SUB_BITS
+BUCKETS = 64 * SUB_BUCKETS
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+def bucket_index(duration_ns: int) -> int:
+    """Номер корзины гистограммы для длительности в наносекундах."""
+    if duration_ns < SUB_BUCKETS:
+        return max(duration_ns, 0)
+    shift = duration_ns.bit_length() - 1 - SUB_BITS
+    return ((shift + 1) << SUB_BITS) + ((duration_ns >> shift) & (SUB_BUCKETS - 1))
+
+
+def bucket_bounds(index: int) -> tuple[int, int]:
+    """Границы корзины [нижняя, верхняя) в наносекундах."""
+    if index < SUB_BUCKETS:
+        return index, index + 1
+    shift = (index >> SUB_BITS) - 1
+    low = (SUB_BUCKETS + (index & (SUB_BUCKETS - 1))) << shift
+    return low, low + (1 << shift)
+
+
+class MetricSnapshot(NamedTuple):
+    """Снимок метрик функции; длительности в секундах."""
+
+    count: int  # type: ignore[assignment]  # поле перекрывает метод tuple.count
+    errors: int
+    total: float
+    min: float
+    max: float
+    p50: float
+    p95: float
+    p99: float
+
+
+class FunctionStats:
+    """Счетчики и гистограмма длительностей одной функции."""
+
+    __slots__ = ("count", "errors", "total_ns", "min_ns", "max_ns", "buckets", "_lock")
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        self.count = 0
+        self.errors = 0
+        self.total_ns = 0
+        self.min_ns = 0
+        self.max_ns = 0
+        self.buckets = [0] * BUCKETS
+
+    def record(self, duration_ns: int, error: bool = False) -> None:
+        """
+        Учитывает один вызов.
+
+        :param duration_ns: Длительность вызова в наносекундах
+        :param error: Завершился ли вызов исключением
+        """
+        index = bucket_index(duration_ns)
+        with self._lock:
+            if not self.count or duration_ns < self.min_ns:
+                self.min_ns = duration_ns
+            if duration_ns > self.max_ns:
+                self.max_ns = duration_ns
+            self.count += 1
+            self.errors += error
+            self.total_ns += duration_ns
+            self.buckets[index] += 1
+
+    def quantile(self, q: float) -> int:
+        """
+        Оценивает квантиль длительности по гистограмме.
+
+        :param q: Уровень квантиля от 0 до 1
+        :return: Середина корзины, в которую попадает квантиль, в наносекундах (0, если вызовов не было)
+        """
+        if not self.count:
+            return 0
+        rank = max(1, math.ceil(q * self.count))
+        seen = 0
+        for index, hits in enumerate(self.buckets):
+            seen += hits
+            if seen >= rank:
+                low, high = bucket_bounds(index)
+                return min(max((low + high - 1) // 2, self.min_ns), self.max_ns)
+        return self.max_ns
+
+    def snapshot(self) -> MetricSnapshot:
+        with self._lock:
+            p50, p95, p99 = (self.quantile(q) / 1e9 for q in QUANTILES)
+            return MetricSnapshot(
+                self.count, self.errors, self.total_ns / 1e9, self.min_ns / 1e9, self.max_ns / 1e9, p50, p95, p99
+            )
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class MetricsRegistry:
+    """Реестр метрик: имя функции -> FunctionStats."""
+
+    def __init__(self) -> None:
+        self._stats: dict[str, FunctionStats] = {}
+        self._lock = threading.Lock()
+
+    def stats(self, name: str) -> FunctionStats:
+        """Возвращает счетчики функции, создавая их при первом обращении."""
+        stats = self._stats.get(name)
+        if stats is None:
+            with self._lock:
+                stats = self._stats.setdefault(name, FunctionStats())
+        return stats
+
+    def snapshot(self) -> dict[str, MetricSnapshot]:
+        """Возвращает снимок метрик всех функций, отсортированный по имени."""
+        with self._lock:
+            items = sorted(self._stats.items())
+        return {name: stats.snapshot() for name, stats in items}
+
+    def reset(self) -> None:
+        """Обнуляет метрики, сохраняя зарегистрированные функции."""
+        with self._lock:
+            items = list(self._stats.values())
+        for stats in items:
+            with stats._lock:
+                stats.reset()
+
+    def to_prometheus(self, metric: str = "function_duration_seconds") -> str:
+        """
+        Возвращает метрики в текстовом формате Prometheus (summary с квантилями и счетчик ошибок).
+
+        :param metric: Имя метрики длительности
+        :return: Текст для отдачи по HTTP
+        """
+        lines = [f"# HELP {metric} Function call duration in seconds.", f"# TYPE {metric} summary"]
+        errors = [f"# HELP {metric}_errors_total Function calls that raised.", f"# TYPE {metric}_errors_total counter"]
+        for name, snapshot in self.snapshot().items():
+            label = f'function="{_escape_label(name)}"'
+            for q, value in zip(QUANTILES, (snapshot.p50, snapshot.p95, snapshot.p99)):
+                lines.append(f'{metric}{{{label},quantile="{q}"}} {value!r}')
+            lines.append(f"{metric}_sum{{{label}}} {snapshot.total!r}")
+            lines.append(f"{metric}_count{{{label}}} {snapshot.count}")
+            errors.append(f"{metric}_errors_total{{{label}}} {snapshot.errors}")
+        return "\n".join(lines + errors) + "\n"
+
+
+# Реестр по умолчанию, в который пишет декоратор timed
+registry = MetricsRegistry()
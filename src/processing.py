@@ -1,23 +1,112 @@
-from typing import Any
+import heapq
+from itertools import islice
+from typing import IO, Any, Iterable, Iterator, Optional, Union
 
+from src.query import Query
+from src.table import TransactionTable
 
-def filter_by_state(data: list[dict[str, Any]], state_value: str = "EXECUTED") -> list[dict[str, Any]]:
+
+def filter_by_state(
+    data: Union[Iterable[dict[str, Any]], TransactionTable], state_value: str = "EXECUTED"
+) -> Union[list[dict[str, Any]], TransactionTable]:
     """
     Фильтрует список словарей по значению ключа 'state'
 
-    :param data: Список словарей для обработки
+    :param data: Список словарей или любой итерируемый источник (например, потоковый reader)
+    :param state_value: Значение для фильтрации (по умолчанию 'EXECUTED')
+    :return: Отфильтрованный список словарей; для TransactionTable - таблица из подходящих строк
+    """
+    query = Query(data).where(state=state_value)
+    return query.to_table() if isinstance(data, TransactionTable) else query.to_list()
+
+
+def iter_by_state(data: Iterable[dict[str, Any]], state_value: str = "EXECUTED") -> Iterator[dict[str, Any]]:
+    """
+    Ленивый вариант filter_by_state: отдает подходящие словари по одному, не накапливая список
+
+    :param data: Итерируемый источник словарей (например, потоковый reader)
     :param state_value: Значение для фильтрации (по умолчанию 'EXECUTED')
-    :return: Отфильтрованный список словарей
+    :return: Итератор отфильтрованных словарей
     """
-    return [item for item in data if item.get("state") == state_value]
+    yield from Query(data).where(state=state_value)
 
 
-def sort_by_date(data: list[dict[str, Any]], reverse: bool = True) -> list[dict[str, Any]]:
+def sort_by_date(
+    data: Union[Iterable[dict[str, Any]], TransactionTable], reverse: bool = True, limit: Optional[int] = None
+) -> Union[list[dict[str, Any]], TransactionTable]:
     """
     Сортирует список словарей по ключу 'date'
 
-    :param data: Список словарей для сортировки
+    :param data: Список словарей или любой итерируемый источник для сортировки
     :param reverse: Порядок сортировки (True - по убыванию, False - по возрастанию)
-    :return: Отсортированный список словарей
+    :param limit: Сколько первых записей вернуть; с ограничением используется куча из limit элементов
+        (O(n log k) по времени и O(k) по памяти), источник может быть потоковым
+    :return: Отсортированный список словарей; для TransactionTable - таблица в новом порядке
+    :raises KeyError: Если у какой-либо записи нет даты
     """
-    return sorted(data, key=lambda x: x["date"], reverse=reverse)
+    query = Query(data).order_by("date", reverse)
+    if limit is not None:
+        query.limit(limit)
+    return query.to_table() if isinstance(data, TransactionTable) else query.to_list()
+
+
+def _read_run(file: IO[bytes]) -> Iterator[dict[str, Any]]:
+    """Читает записи порции, сохраненные подряд через pickle.dump, до конца файла."""
+    import pickle
+
+    while True:
+        try:
+            yield pickle.load(file)
+        except EOFError:
+            return
+
+
+def external_sort_by_date(
+    data: Iterable[dict[str, Any]], reverse: bool = True, run_size: int = 100_000, temp_dir: Optional[str] = None
+) -> Iterator[dict[str, Any]]:
+    """
+    Сортирует по ключу 'date' данные, которые не помещаются в память
+
+    Источник читается порциями по run_size записей; каждая порция сортируется и сбрасывается во временный
+    файл, после чего файлы сливаются k-путевым слиянием. Одновременно в памяти находится одна порция
+    (при чтении) или по одной записи из каждого файла (при слиянии). Порядок совпадает с sort_by_date.
+    Порции сохраняются через pickle, поэтому записи возвращаются без изменений, как при сортировке в памяти
+    (кортежи, datetime, Decimal и нестроковые ключи словарей сохраняются).
+
+    :param data: Итерируемый источник словарей (например, потоковый reader)
+    :param reverse: Порядок сортировки (True - по убыванию, False - по возрастанию)
+    :param run_size: Число записей в одной сортируемой в памяти порции
+    :param temp_dir: Каталог для временных файлов; по умолчанию системный
+    :return: Итератор отсортированных словарей
+    :raises KeyError: Если у какой-либо записи нет даты
+    :raises ValueError: Если run_size меньше 1
+    """
+    if run_size < 1:
+        raise ValueError("run_size must be positive")
+    # tempfile (вместе с shutil и random) и pickle нужны только здесь, поэтому не замедляют импорт модуля
+    import pickle
+    import tempfile
+
+    iterator = iter(data)
+    runs: list[IO[bytes]] = []
+    try:
+        while True:
+            run = sorted(islice(iterator, run_size), key=lambda x: x["date"], reverse=reverse)
+            if not run:
+                break
+            if not runs and len(run) < run_size:
+                # Все данные поместились в одну порцию - временные файлы не нужны
+                yield from run
+                return
+            file: IO[bytes] = tempfile.TemporaryFile("w+b", dir=temp_dir)
+            runs.append(file)
+            for item in run:
+                pickle.dump(item, file, pickle.HIGHEST_PROTOCOL)
+            file.seek(0)
+            del run
+
+        streams = [_read_run(file) for file in runs]
+        yield from heapq.merge(*streams, key=lambda x: x["date"], reverse=reverse)
+    finally:
+        for file in runs:
+            file.close()
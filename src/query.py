@@ -0,0 +1,379 @@
+"""
+Построитель запросов к транзакциям.
+
+Query собирает условия фильтрации, сортировку и ограничение числа строк, а затем выполняет их
+за один проход по источнику: условия объединяются в один предикат, более избирательные проверяются первыми.
+"""
+
+import datetime
+import heapq
+from bisect import bisect_left
+from itertools import islice
+from typing import Any, Callable, Iterable, Iterator, NamedTuple, Optional, Sequence, Union
+
+from src import engine
+from src.indexes import IndexedTransactions
+from src.table import NULL, TransactionTable, parse_date
+
+# Сколько строк просматривается для оценки избирательности условий
+SAMPLE_SIZE = 256
+
+# Поля, по которым можно упорядочить результат
+ORDER_FIELDS = ("date", "id")
+
+Row = dict[str, Any]
+Source = Union[Iterable[Row], TransactionTable, IndexedTransactions]
+DateBound = Union[str, datetime.date, None]
+
+
+def _state_equals(value: Optional[str]) -> Callable[[Row], bool]:
+    return lambda row: row.get("state") == value
+
+
+def _currency_equals(value: Optional[str]) -> Callable[[Row], bool]:
+    def test(row: Row) -> bool:
+        # Не создаем пустые словари-заглушки для транзакций без суммы или валюты
+        operation_amount = row.get("operationAmount")
+        if operation_amount is None:
+            return value is None
+        currency = operation_amount.get("currency")
+        return (None if currency is None else currency.get("code")) == value
+
+    return test
+
+
+def _description_equals(value: Optional[str]) -> Callable[[Row], bool]:
+    return lambda row: row.get("description") == value
+
+
+# Поле запроса -> (колонка TransactionTable, построитель проверки для словаря)
+FIELDS: dict[str, tuple[str, Callable[[Optional[str]], Callable[[Row], bool]]]] = {
+    "state": ("state", _state_equals),
+    "currency": ("currency_code", _currency_equals),
+    "description": ("description", _description_equals),
+}
+
+
+class Condition(NamedTuple):
+    """Условие запроса: равенство категориального поля или диапазон дат [low, high)."""
+
+    field: str
+    column: str
+    test: Callable[[Row], bool]
+    value: Optional[str] = None
+    low: Optional[str] = None
+    high: Optional[str] = None
+
+    @property
+    def is_range(self) -> bool:
+        return self.field == "date"
+
+
+def _fuse(tests: Sequence[Callable[[Any], bool]]) -> Optional[Callable[[Any], bool]]:
+    """Объединяет проверки в один предикат с ранним выходом; None означает отсутствие условий."""
+    if not tests:
+        return None
+    if len(tests) == 1:
+        return tests[0]
+    if len(tests) == 2:
+        first, second = tests
+        return lambda item: first(item) and second(item)
+
+    def match(item: Any) -> bool:
+        for test in tests:
+            if not test(item):
+                return False
+        return True
+
+    return match
+
+
+def _iso(bound: DateBound) -> Optional[str]:
+    """Приводит границу диапазона дат к строке ISO."""
+    if bound is None or isinstance(bound, str):
+        return bound
+    return bound.isoformat()
+
+
+# Во сколько раз список номеров должен быть длиннее кандидатов, чтобы двоичный поиск был быстрее пересечения множеств
+BISECT_RATIO = 16
+
+
+def _intersect(candidates: Sequence[int], postings: Sequence[int]) -> list[int]:
+    """
+    Пересечение возрастающих списков номеров строк. Если postings намного длиннее, каждый из k кандидатов ищется
+    в нем двоичным поиском, начиная с места предыдущего, - O(k log n) без просмотра всего списка; списки близкой
+    длины пересекаются как множества.
+    """
+    if len(candidates) * BISECT_RATIO >= len(postings):
+        return sorted(set(candidates).intersection(postings))
+    result = []
+    low = 0
+    size = len(postings)
+    for position in candidates:
+        low = bisect_left(postings, position, low)
+        if low == size:
+            break
+        if postings[low] == position:
+            result.append(position)
+    return result
+
+
+class Query:
+    """
+    Запрос к коллекции транзакций.
+
+    Пример:
+        Query(transactions).where(state="EXECUTED", currency="USD").date_between("2019-01-01", "2020-01-01")
+            .order_by("date").limit(10).to_list()
+
+    Источником может быть список словарей, любой итерируемый источник, TransactionTable
+    или IndexedTransactions (условия на проиндексированные поля отвечаются индексом без просмотра строк).
+    Для итерируемых источников без сортировки результат отдается лениво.
+    """
+
+    def __init__(self, source: Source) -> None:
+        """
+        :param source: Список словарей, итерируемый источник, TransactionTable или IndexedTransactions
+        """
+        self._source = source
+        self._conditions: list[Condition] = []
+        self._order: Optional[str] = None
+        self._reverse = True
+        self._limit: Optional[int] = None
+
+    def where(self, **conditions: Optional[str]) -> "Query":
+        """
+        Добавляет условия равенства полей.
+
+        :param conditions: state, currency (код валюты) и/или description
+        :return: Этот же запрос
+        :raises ValueError: Если поле не поддерживается
+        """
+        for field, value in conditions.items():
+            if field not in FIELDS:
+                raise ValueError(f"Unknown query field: {field}")
+            column, make_test = FIELDS[field]
+            self._conditions.append(Condition(field, column, make_test(value), value=value))
+        return self
+
+    def date_between(self, start: DateBound = None, end: DateBound = None) -> "Query":
+        """
+        Оставляет транзакции с датой в полуинтервале [start, end).
+
+        :param start: Нижняя граница включительно (строка ISO или date/datetime); None - без границы
+        :param end: Верхняя граница не включительно; None - без границы
+        :return: Этот же запрос
+        """
+        low, high = _iso(start), _iso(end)
+
+        def test(row: Row) -> bool:
+            date = row.get("date")
+            return date is not None and (low is None or date >= low) and (high is None or date < high)
+
+        self._conditions.append(Condition("date", "date", test, low=low, high=high))
+        return self
+
+    def order_by(self, field: str = "date", reverse: bool = True) -> "Query":
+        """
+        Задает сортировку результата. Сортировка устойчива, как у sorted.
+
+        :param field: Поле сортировки: date или id
+        :param reverse: Порядок сортировки (True - по убыванию, False - по возрастанию)
+        :return: Этот же запрос
+        :raises ValueError: Если поле не поддерживается
+        """
+        if field not in ORDER_FIELDS:
+            raise ValueError(f"Unknown order field: {field}")
+        self._order = field
+        self._reverse = reverse
+        return self
+
+    def limit(self, count: int) -> "Query":
+        """
+        Ограничивает число строк результата.
+
+        :param count: Максимальное число строк
+        :return: Этот же запрос
+        :raises ValueError: Если count отрицательный
+        """
+        if count < 0:
+            raise ValueError("Limit must be non-negative")
+        self._limit = count
+        return self
+
+    def __iter__(self) -> Iterator[Row]:
+        if isinstance(self._source, TransactionTable):
+            table = self._source
+            return (table.row(position) for position in self.positions())
+        return self._iter_rows()
+
+    def to_list(self) -> list[Row]:
+        """Выполняет запрос и возвращает список словарей."""
+        return list(self)
+
+    def to_table(self) -> TransactionTable:
+        """Выполняет запрос и возвращает результат как TransactionTable."""
+        if not isinstance(self._source, TransactionTable):
+            return TransactionTable.from_records(self)
+        table = self._source
+        positions = self.positions()
+        if engine.use_numpy(len(table)):
+            return engine.take(table, positions)
+        return table.take(positions)
+
+    def positions(self) -> Sequence[int]:
+        """
+        Выполняет запрос и возвращает номера подходящих строк источника в порядке результата.
+
+        :return: Последовательность номеров строк
+        :raises TypeError: Если источник не поддерживает доступ по индексу
+        """
+        source = self._source
+        if isinstance(source, TransactionTable):
+            return self._table_positions(source)
+        if isinstance(source, IndexedTransactions):
+            candidates, conditions = self._index_candidates(source)
+        elif isinstance(source, Sequence):
+            candidates, conditions = range(len(source)), self._ordered_conditions()
+        else:
+            raise TypeError("positions() requires a list, a TransactionTable or an IndexedTransactions source")
+        rows = source
+        match = _fuse([condition.test for condition in conditions])
+        positions: Sequence[int] = candidates if isinstance(candidates, Sequence) else list(candidates)
+        if match is not None:
+            positions = [position for position in positions if match(rows[position])]
+        if self._order is None:
+            return positions if self._limit is None else positions[: self._limit]
+        order = self._order
+        return _sort(positions, lambda position: rows[position][order], self._reverse, self._limit)
+
+    def _ordered_conditions(self) -> list[Condition]:
+        """Упорядочивает условия так, чтобы первыми проверялись самые избирательные."""
+        conditions = list(self._conditions)
+        if len(conditions) < 2:
+            return conditions
+        source = self._source
+        if isinstance(source, (Sequence, TransactionTable)) and len(source) > 0:
+            # Оцениваем долю подходящих строк по равномерной выборке
+            step = max(1, len(source) // SAMPLE_SIZE)
+            sample = [source[position] for position in range(0, len(source), step)[:SAMPLE_SIZE]]
+            rates = {id(condition): sum(map(condition.test, sample)) for condition in conditions}
+            conditions.sort(key=lambda condition: rates[id(condition)])
+        else:
+            # Для потока выборку сделать нельзя: сравнения на равенство обычно избирательнее диапазонов
+            conditions.sort(key=lambda condition: condition.is_range)
+        return conditions
+
+    def _index_candidates(self, source: IndexedTransactions) -> tuple[Iterable[int], list[Condition]]:
+        """
+        Отбирает строки-кандидаты по индексам и возвращает их вместе с условиями, которые осталось проверить.
+
+        Списки номеров строк пересекаются начиная с самого короткого, так что избирательность известна точно;
+        пересечение ищется двоичным поиском и не просматривает длинные списки целиком.
+        """
+        conditions = self._ordered_conditions()
+        indexed = [condition for condition in conditions if source.has_index(condition.field)]
+        if not indexed:
+            return source.live_positions(), conditions
+        postings = sorted((source.positions(condition.field, condition.value) for condition in indexed), key=len)
+        candidates: Sequence[int] = postings[0]
+        for other in postings[1:]:
+            candidates = _intersect(candidates, other)
+        return candidates, [condition for condition in conditions if condition not in indexed]
+
+    def _iter_rows(self) -> Iterator[Row]:
+        source: Iterable[Row] = self._source
+        if isinstance(self._source, IndexedTransactions):
+            indexed = self._source
+            candidates, conditions = self._index_candidates(indexed)
+            source = (indexed[position] for position in candidates)
+        else:
+            conditions = self._ordered_conditions()
+        match = _fuse([condition.test for condition in conditions])
+        rows: Iterable[Row] = source if match is None else filter(match, source)
+        if self._order is not None:
+            order = self._order
+            yield from _sort(rows, lambda row: row[order], self._reverse, self._limit)
+        elif self._limit is not None:
+            yield from islice(rows, self._limit)
+        else:
+            yield from rows
+
+    def _table_positions(self, table: TransactionTable) -> Sequence[int]:
+        equals: list[tuple[str, int]] = []
+        ranges: list[tuple[str, Optional[int], Optional[int]]] = []
+        tests: list[Callable[[int], bool]] = []
+        # Строки первого условия на равенство по колонке с индексом берутся из индекса, без просмотра колонки
+        indexed: Optional[Sequence[int]] = None
+        for condition in self._ordered_conditions():
+            if indexed is None and not condition.is_range:
+                indexed = table.indexed_positions(condition.column, condition.value)
+                if indexed is not None:
+                    continue
+            column = table.columns[condition.column]
+            if condition.is_range:
+                low = None if condition.low is None else parse_date(condition.low)
+                high = None if condition.high is None else parse_date(condition.high)
+                ranges.append((condition.column, low, high))
+                tests.append(_range_test(column, low, high))
+            else:
+                code = table.categories[condition.column].find(condition.value)
+                if code < 0:
+                    return []
+                equals.append((condition.column, code))
+                tests.append(_code_test(column, code))
+
+        if engine.use_numpy(len(table)):
+            positions = None
+            if equals or ranges or indexed is not None:
+                positions = engine.positions_matching(table, equals, ranges, indexed)
+            if self._order is not None and self._limit is not None:
+                top: Sequence[int] = engine.top_positions(table, self._order, self._limit, self._reverse, positions)
+                return top
+            if self._order is not None:
+                positions = engine.column_order(table, self._order, self._reverse, positions)
+            elif positions is None:
+                positions = range(len(table))
+            return positions if self._limit is None else positions[: self._limit]
+
+        match = _fuse(tests)
+        scope: Sequence[int] = range(len(table)) if indexed is None else indexed
+        candidates: Iterable[int] = scope if match is None else filter(match, scope)
+        if self._order is None:
+            return list(candidates if self._limit is None else islice(candidates, self._limit))
+        keys = table.columns[self._order]
+
+        def key(position: int) -> int:
+            value = keys[position]
+            if value == NULL:
+                raise KeyError(self._order)
+            return value
+
+        return _sort(candidates, key, self._reverse, self._limit)
+
+
+def _sort(items: Iterable[Any], key: Callable[[Any], Any], reverse: bool, limit: Optional[int]) -> list[Any]:
+    """
+    Устойчиво сортирует элементы; при заданном limit оставляет только первые limit элементов.
+
+    С ограничением используется куча из limit элементов: O(n log k) по времени и O(k) по памяти,
+    результат совпадает с sorted(...)[:limit].
+    """
+    if limit is None:
+        return sorted(items, key=key, reverse=reverse)
+    if reverse:
+        return heapq.nlargest(limit, items, key=key)
+    return heapq.nsmallest(limit, items, key=key)
+
+
+def _code_test(column: Sequence[int], code: int) -> Callable[[int], bool]:
+    return lambda position: column[position] == code
+
+
+def _range_test(column: Sequence[int], low: Optional[int], high: Optional[int]) -> Callable[[int], bool]:
+    def test(position: int) -> bool:
+        value = column[position]
+        return value != NULL and (low is None or value >= low) and (high is None or value < high)
+
+    return test
@@ -0,0 +1,143 @@
+import json
+import os
+import re
+from typing import Any, Iterator, TextIO, Union
+
+PathType = Union[str, "os.PathLike[str]"]
+
+# Размер порции, читаемой из файла за один раз
+CHUNK_SIZE = 64 * 1024
+
+# Расширения файлов в формате JSON Lines
+JSON_LINES_SUFFIXES = (".jsonl", ".ndjson")
+
+_WHITESPACE = re.compile(r"\s*")
+# Символы, которыми может продолжаться число JSON
+_NUMBER_TAIL = re.compile(r"[0-9.eE+-]*")
+_decoder = json.JSONDecoder()
+
+
+def read_json_array(path: PathType, encoding: str = "utf-8", chunk_size: int = CHUNK_SIZE) -> Iterator[dict[str, Any]]:
+    """
+    Потоково читает транзакции из файла с JSON-массивом.
+
+    В памяти одновременно находится не больше одной порции файла и одного элемента массива,
+    поэтому размер файла на пиковое потребление памяти не влияет.
+
+    :param path: Путь к файлу вида [{...}, {...}, ...]
+    :param encoding: Кодировка файла
+    :param chunk_size: Размер порции чтения в символах
+    :return: Итератор транзакций в порядке следования в файле
+    :raises ValueError: Если содержимое файла не является JSON-массивом
+    """
+    with open(path, "r", encoding=encoding) as file:
+        yield from _iter_array(file, chunk_size)
+
+
+def read_json_lines(path: PathType, encoding: str = "utf-8") -> Iterator[dict[str, Any]]:
+    """
+    Потоково читает транзакции из файла в формате JSON Lines (один объект на строку).
+
+    :param path: Путь к файлу
+    :param encoding: Кодировка файла
+    :return: Итератор транзакций; пустые строки пропускаются
+    :raises ValueError: Если строка файла не является корректным JSON
+    """
+    with open(path, "r", encoding=encoding) as file:
+        for line_number, line in enumerate(file, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"Invalid JSON on line {line_number}: {e.msg}") from e
+
+
+def read_transactions(path: PathType, encoding: str = "utf-8") -> Iterator[dict[str, Any]]:
+    """
+    Потоково читает транзакции из файла, выбирая формат по расширению.
+
+    Файлы .jsonl и .ndjson читаются построчно, все остальные - как JSON-массив.
+
+    :param path: Путь к файлу с транзакциями
+    :param encoding: Кодировка файла
+    :return: Итератор транзакций
+    """
+    if os.fspath(path).lower().endswith(JSON_LINES_SUFFIXES):
+        return read_json_lines(path, encoding)
+    return read_json_array(path, encoding)
+
+
+def _iter_array(file: TextIO, chunk_size: int) -> Iterator[Any]:
+    """Разбирает JSON-массив из текстового потока по одному элементу."""
+    buffer = ""
+    pos = 0
+    eof = False
+
+    def fill() -> bool:
+        # Дочитываем следующую порцию, отбрасывая уже разобранную часть буфера
+        nonlocal buffer, pos, eof
+        if eof:
+            return False
+        chunk = file.read(chunk_size)
+        if not chunk:
+            eof = True
+            return False
+        buffer = buffer[pos:] + chunk
+        pos = 0
+        return True
+
+    def next_char() -> str:
+        # Пропускаем пробельные символы и возвращаем следующий значимый символ
+        nonlocal pos
+        while True:
+            pos = _WHITESPACE.match(buffer, pos).end()  # type: ignore[union-attr]
+            if pos < len(buffer):
+                return buffer[pos]
+            if not fill():
+                return ""
+
+    def finish() -> None:
+        # После закрывающей скобки допустимы только пробельные символы
+        nonlocal pos
+        pos += 1
+        if next_char():
+            raise ValueError("Extra data after JSON array")
+
+    if next_char() != "[":
+        raise ValueError("Expected JSON array")
+    pos += 1
+
+    if next_char() == "]":
+        finish()
+        return
+
+    while True:
+        if not next_char():
+            raise ValueError("Unexpected end of JSON array")
+        while True:
+            try:
+                item, end = _decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError as e:
+                # Элемент оборвался на границе порции - дочитываем и пробуем снова
+                if fill():
+                    continue
+                raise ValueError(f"Invalid JSON array element: {e.msg}") from e
+            # Число могло быть обрезано на границе порции, в том числе после ".", "e" или "E+" ("1." разбирается
+            # как 1): если до конца буфера идут только символы числа, дочитываем и разбираем заново
+            if type(item) in (int, float):
+                tail = _NUMBER_TAIL.match(buffer, end).end()  # type: ignore[union-attr]
+                if tail == len(buffer) and fill():
+                    continue
+            break
+        pos = end
+        yield item
+
+        separator = next_char()
+        if separator == "]":
+            finish()
+            return
+        if separator != ",":
+            raise ValueError("Expected ',' or ']' in JSON array")
+        pos += 1
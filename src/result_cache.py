@@ -0,0 +1,337 @@
+"""
+Кэш результатов filter_by_state и sort_by_date для неизменяемых наборов данных.
+
+Ключ записи - отпечаток набора данных и параметры вызова. Отпечаток - явная версия (например, дата
+ежедневного снимка), идентификатор файла для таблиц из двоичного файла (version_id) или хэш колонок
+TransactionTable. Для списков версия обязательна: хэш списка словарей дороже самих filter и sort.
+Результат хранится компактно - массивом номеров строк (uint32 или int64), а не копией строк; при попадании
+строки собираются из исходного набора. Записи вытесняются по LRU при превышении лимита памяти; при заданном
+каталоге они сохраняются и на диск, откуда их читают другие процессы.
+"""
+
+import hashlib
+import os
+import pickle
+import struct
+import threading
+import time
+import weakref
+from array import array
+from collections import OrderedDict
+from typing import Any, Callable, NamedTuple, Optional, Sequence, Union
+
+from src import engine
+from src.query import Query
+from src.readers import PathType
+from src.table import CATEGORY_COLUMNS, INT_COLUMNS, TransactionTable
+
+Row = dict[str, Any]
+Data = Union[Sequence[Row], TransactionTable]
+
+# Заголовок файла записи: метка формата, код типа массива, время вычисления результата в секундах
+_DISK_HEADER = struct.Struct("<8s1sxxxxxxxd")
+_DISK_MAGIC = b"RESIDX01"
+_DISK_SUFFIX = ".idx"
+# Отпечатки таблиц в памяти: таблицы только дополняются, поэтому отпечаток верен, пока не изменилась длина
+_table_fingerprints: "weakref.WeakKeyDictionary[TransactionTable, tuple[int, str]]" = weakref.WeakKeyDictionary()
+
+
+class CacheStats(NamedTuple):
+    """Статистика кэша; saved_seconds - суммарное время вычислений, сэкономленное попаданиями."""
+
+    hits: int
+    disk_hits: int
+    misses: int
+    evictions: int
+    entries: int
+    bytes: int
+    saved_seconds: float
+
+    @property
+    def hit_rate(self) -> float:
+        """Доля обращений, обслуженных из памяти или с диска."""
+        total = self.hits + self.disk_hits + self.misses
+        return (self.hits + self.disk_hits) / total if total else 0.0
+
+
+class _Entry(NamedTuple):
+    positions: "array[int]"
+    seconds: float
+
+
+def _table_fingerprint(table: TransactionTable) -> str:
+    cached = _table_fingerprints.get(table)
+    if cached is not None and cached[0] == len(table):
+        return cached[1]
+    hasher = hashlib.blake2b(digest_size=16)
+    for name, column in table.columns.items():
+        hasher.update(name.encode("utf-8"))
+        typecode = "q" if name in INT_COLUMNS else "i"
+        hasher.update(column if isinstance(column, (array, memoryview)) else array(typecode, column))
+    for name in CATEGORY_COLUMNS:
+        hasher.update(pickle.dumps(list(table.categories[name].values), protocol=pickle.HIGHEST_PROTOCOL))
+    fingerprint = hasher.hexdigest()
+    _table_fingerprints[table] = (len(table), fingerprint)
+    return fingerprint
+
+
+def fingerprint(data: Data, version: Optional[str] = None) -> str:
+    """
+    Отпечаток набора данных.
+
+    :param data: Список словарей или TransactionTable
+    :param version: Явная версия набора (например, "2024-05-01"); если задана, данные не читаются
+    :return: Строка из шестнадцатеричных цифр
+    :raises TypeError: Если источник не список и не таблица (поток нельзя ни хэшировать, ни перечитать)
+    """
+    if version is not None:
+        source = f"version:{version}"
+    elif callable(getattr(data, "version_id", None)):
+        # Таблица из файла: идентификатор файла без чтения данных
+        source = f"file:{data.version_id()}"  # type: ignore[union-attr]
+    elif isinstance(data, TransactionTable):
+        return _table_fingerprint(data)
+    elif isinstance(data, Sequence):
+        # Хэш содержимого: полный проход сериализации pickle. ResultCache для списков его не вызывает
+        return hashlib.blake2b(pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL), digest_size=16).hexdigest()
+    else:
+        raise TypeError("Result cache requires a list or a TransactionTable source")
+    return hashlib.blake2b(source.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _data_key(data: Data, version: Optional[str]) -> str:
+    """Отпечаток набора для ключей кэша: список без версии отклоняется, чтобы попадание не стоило дороже вычисления."""
+    if version is None and not isinstance(data, TransactionTable):
+        raise TypeError("Result cache requires version= for list sources")
+    return fingerprint(data, version)
+
+
+def _index_array(positions: Any, rows: int) -> "array[int]":
+    """Номера строк в компактном массиве: uint32, если их хватает, иначе int64."""
+    typecode = "I" if rows < 2**32 else "q"
+    if hasattr(positions, "dtype"):
+        result = array(typecode)
+        result.frombytes(positions.astype("=u4" if typecode == "I" else "=i8").tobytes())
+        return result
+    return array(typecode, positions)
+
+
+def _materialize(data: Data, positions: "array[int]") -> Union[list[Row], TransactionTable]:
+    """Строки по номерам в виде того же типа, что возвращают функции processing."""
+    if isinstance(data, TransactionTable):
+        if engine.use_numpy(len(data)):
+            return engine.take(data, engine.require_numpy().frombuffer(positions, dtype=positions.typecode))
+        return data.take(positions)
+    return list(map(data.__getitem__, positions))
+
+
+class ResultCache:
+    """
+    Кэш номеров строк результатов filter_by_state и sort_by_date.
+
+    Безопасен для использования из нескольких потоков. Несколько процессов делят записи через общий каталог:
+    файлы записываются целиком через временный файл и переименование.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = 64 * 1024 * 1024,
+        directory: Optional[PathType] = None,
+        max_disk_bytes: Optional[int] = None,
+    ) -> None:
+        """
+        :param max_bytes: Лимит объема массивов в памяти
+        :param directory: Каталог для записей на диске; если не задан, кэш только в памяти
+        :param max_disk_bytes: Лимит объема файлов в каталоге; None - без ограничения
+        """
+        self.max_bytes = max_bytes
+        self.directory = None if directory is None else os.fspath(directory)
+        self.max_disk_bytes = max_disk_bytes
+        if self.directory is not None:
+            os.makedirs(self.directory, exist_ok=True)
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._hits = self._disk_hits = self._misses = self._evictions = 0
+        self._saved = 0.0
+
+    def filter_by_state(
+        self, data: Data, state_value: str = "EXECUTED", version: Optional[str] = None
+    ) -> Union[list[Row], TransactionTable]:
+        """
+        То же, что processing.filter_by_state, с кэшированием.
+
+        :param version: Версия набора данных; для списков обязательна
+        :raises TypeError: Если источник не список и не таблица или список передан без version
+        """
+        positions = self.positions(
+            data, ("filter_by_state", state_value), lambda: Query(data).where(state=state_value), version
+        )
+        return _materialize(data, positions)
+
+    def sort_by_date(
+        self, data: Data, reverse: bool = True, limit: Optional[int] = None, version: Optional[str] = None
+    ) -> Union[list[Row], TransactionTable]:
+        """
+        То же, что processing.sort_by_date, с кэшированием.
+
+        :param version: Версия набора данных; для списков обязательна
+        :raises KeyError: Если у какой-либо записи нет даты
+        :raises TypeError: Если источник не список и не таблица или список передан без version
+        """
+
+        def query() -> Query:
+            query = Query(data).order_by("date", reverse)
+            return query if limit is None else query.limit(limit)
+
+        positions = self.positions(data, ("sort_by_date", reverse, limit), query, version)
+        return _materialize(data, positions)
+
+    def positions(
+        self, data: Data, params: tuple[Any, ...], build: Callable[[], Query], version: Optional[str] = None
+    ) -> "array[int]":
+        """
+        Номера строк результата запроса из кэша; при промахе запрос выполняется и результат сохраняется.
+
+        :param data: Набор данных
+        :param params: Имя операции и ее параметры (значения с устойчивым repr)
+        :param build: Функция, создающая запрос к data
+        :param version: Версия набора данных; для списков обязательна
+        :return: Массив номеров строк
+        :raises TypeError: Если список передан без version
+        """
+        # Время попадания считается вместе с отпечатком: экономия - это вычисление минус весь путь попадания
+        start = time.perf_counter()
+        data_key = _data_key(data, version)
+        key = f"{data_key}-{hashlib.blake2b(repr(params).encode('utf-8'), digest_size=8).hexdigest()}"
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                self._saved += max(entry.seconds - (time.perf_counter() - start), 0.0)
+                return entry.positions
+        entry = self._read(key)
+        if entry is not None:
+            with self._lock:
+                self._disk_hits += 1
+                self._saved += max(entry.seconds - (time.perf_counter() - start), 0.0)
+                self._store(key, entry)
+            return entry.positions
+
+        computed = time.perf_counter()
+        positions = _index_array(build().positions(), len(data))
+        entry = _Entry(positions, time.perf_counter() - computed)
+        with self._lock:
+            self._misses += 1
+            self._store(key, entry)
+        self._write(key, entry)
+        return positions
+
+    def _store(self, key: str, entry: _Entry) -> None:
+        size = entry.positions.itemsize * len(entry.positions)
+        if size > self.max_bytes:
+            return
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._bytes -= previous.positions.itemsize * len(previous.positions)
+        self._entries[key] = entry
+        self._bytes += size
+        while self._bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= evicted.positions.itemsize * len(evicted.positions)
+            self._evictions += 1
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + _DISK_SUFFIX)  # type: ignore[arg-type]
+
+    def _read(self, key: str) -> Optional[_Entry]:
+        if self.directory is None:
+            return None
+        try:
+            with open(self._path(key), "rb") as f:
+                magic, typecode, seconds = _DISK_HEADER.unpack(f.read(_DISK_HEADER.size))
+                if magic != _DISK_MAGIC:
+                    return None
+                positions = array(typecode.decode("ascii"))
+                positions.frombytes(f.read())
+        except (OSError, struct.error, ValueError):
+            return None
+        return _Entry(positions, seconds)
+
+    def _write(self, key: str, entry: _Entry) -> None:
+        if self.directory is None:
+            return
+        path = self._path(key)
+        temporary = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temporary, "wb") as f:
+            f.write(_DISK_HEADER.pack(_DISK_MAGIC, entry.positions.typecode.encode("ascii"), entry.seconds))
+            f.write(entry.positions.tobytes())
+        os.replace(temporary, path)
+        if self.max_disk_bytes is not None:
+            self._trim_disk()
+
+    def _disk_files(self) -> list["os.DirEntry[str]"]:
+        with os.scandir(self.directory) as entries:
+            return [entry for entry in entries if entry.name.endswith(_DISK_SUFFIX)]
+
+    def _trim_disk(self) -> None:
+        """Удаляет самые старые файлы, пока их объем превышает max_disk_bytes."""
+        files = []
+        for entry in self._disk_files():
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            files.append((stat.st_mtime_ns, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.max_disk_bytes:  # type: ignore[operator]
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def invalidate(self, data: Optional[Data] = None, version: Optional[str] = None) -> int:
+        """
+        Удаляет записи набора данных из памяти и с диска.
+
+        :param data: Набор данных; если не задан вместе с version, кэш очищается полностью
+        :param version: Версия набора данных; для списков обязательна
+        :return: Число удаленных записей в памяти
+        :raises TypeError: Если список передан без version
+        """
+        if data is None and version is None:
+            prefix = ""
+        elif data is None:
+            prefix = fingerprint([], version) + "-"
+        else:
+            prefix = _data_key(data, version) + "-"
+        with self._lock:
+            keys = [key for key in self._entries if key.startswith(prefix)]
+            for key in keys:
+                removed = self._entries.pop(key)
+                self._bytes -= removed.positions.itemsize * len(removed.positions)
+        if self.directory is not None:
+            for file in self._disk_files():
+                if file.name.startswith(prefix):
+                    try:
+                        os.remove(file.path)
+                    except FileNotFoundError:
+                        pass
+        return len(keys)
+
+    def stats(self) -> CacheStats:
+        """Счетчики попаданий и промахов, объем и сэкономленное время."""
+        with self._lock:
+            return CacheStats(
+                self._hits,
+                self._disk_hits,
+                self._misses,
+                self._evictions,
+                len(self._entries),
+                self._bytes,
+                self._saved,
+            )
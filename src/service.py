@@ -0,0 +1,351 @@
+"""
+Асинхронный HTTP-сервис над загруженным в память набором транзакций.
+
+Операции (POST, тело и ответ - JSON):
+    /filter  {"state": "EXECUTED", "offset": 0, "limit": 100}            -> {"count": n, "items": [...]}
+    /sort    {"reverse": true, "top": null, "offset": 0, "limit": 100}   -> {"count": n, "items": [...]}
+    /mask    {"values": ["Visa Platinum 7000792289606361", ...]}          -> {"masked": [...], "status": [...],
+                                                                              "invalid": [...]}
+    /dates   {"values": ["2024-03-11T02:26:18.671407", ...], "format": "%d.%m.%Y", "strict": false}
+                                                                          -> {"dates": [...], "invalid": [...]}
+    GET /health                                                           -> {"status": "ok", "rows": n, ...}
+
+status в /mask - коды MASK_* из src.widget (0 - маска получена).
+
+Вычисления выполняются в пуле потоков, чтобы не останавливать цикл событий. Обработчики - код на чистом Python,
+поэтому из-за GIL потоки дают конкурентность (цикл событий принимает и обслуживает соединения во время
+вычислений), но не параллельность: в один момент выполняется одно вычисление. Пул процессов не используется,
+потому что набор пришлось бы копировать в каждый процесс; для параллельной обработки запускается несколько
+процессов сервиса (например, на разных Unix-сокетах за балансировщиком).
+
+Одновременные одинаковые запросы объединяются: вычисление выполняется один раз отдельной задачей, и все
+ожидающие получают один результат; отмена одного из запросов (например, клиент отключился) не отменяет
+вычисление для остальных. Для /filter и /sort запросы разных страниц (offset, limit) одного результата тоже
+объединяются: общим является вычисление полного результата, страница вырезается для каждого запроса. Число
+одновременных вычислений ограничено семафором, остальные запросы ждут в очереди.
+
+Запуск:
+    python -m src.service data/operations.json --port 8080
+    python -m src.service data/operations.json --unix /tmp/operations.sock
+"""
+
+import argparse
+import asyncio
+import json
+import os
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Optional, TypeVar
+
+from src.readers import PathType, read_transactions
+from src.result_cache import ResultCache, fingerprint
+from src.widget import get_dates, mask_account_cards
+
+Row = dict[str, Any]
+Handler = Callable[[dict[str, Any]], Any]
+ItemsHandler = Callable[[dict[str, Any]], list[Row]]
+T = TypeVar("T")
+
+# Ограничения запроса: размер тела и число элементов в ответе по умолчанию
+MAX_BODY = 16 * 1024 * 1024
+DEFAULT_LIMIT = 100
+# Параметры страницы: не входят в ключ объединения запросов /filter и /sort
+_PAGE_PARAMS = ("offset", "limit")
+_REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    500: "Internal Server Error",
+}
+
+
+class RequestError(Exception):
+    """Ошибка запроса, которая возвращается клиенту с HTTP-статусом."""
+
+    def __init__(self, status: int, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+def _page(items: list[Row], params: dict[str, Any]) -> dict[str, Any]:
+    offset = int(params.get("offset", 0))
+    limit = int(params.get("limit", DEFAULT_LIMIT))
+    if offset < 0 or limit < 0:
+        raise ValueError("offset and limit must be non-negative")
+    return {"count": len(items), "items": items[offset : offset + limit]}
+
+
+def _encode(result: Any) -> bytes:
+    return json.dumps(result, ensure_ascii=False).encode("utf-8")
+
+
+def _values(params: dict[str, Any]) -> list[Any]:
+    values = params.get("values")
+    if not isinstance(values, list):
+        raise ValueError("values must be a list")
+    return values
+
+
+class TransactionService:
+    """
+    Операции над набором транзакций, загруженным один раз при старте.
+
+    Результаты filter и sort кэшируются (ResultCache) по версии набора, поэтому повторные запросы
+    не пересчитываются, а только собирают ответ.
+    """
+
+    def __init__(
+        self,
+        transactions: list[Row],
+        executor: Optional[Executor] = None,
+        max_concurrency: Optional[int] = None,
+        cache: Optional[ResultCache] = None,
+    ) -> None:
+        """
+        :param transactions: Список транзакций; сервис не изменяет его
+        :param executor: Пул для вычислений; по умолчанию ThreadPoolExecutor
+        :param max_concurrency: Число одновременных вычислений; по умолчанию число процессоров
+        :param cache: Кэш результатов; по умолчанию кэш в памяти
+        """
+        self.transactions = transactions
+        self.max_concurrency = max_concurrency or os.cpu_count() or 1
+        self.executor = executor or ThreadPoolExecutor(self.max_concurrency, thread_name_prefix="service")
+        self.cache = cache or ResultCache()
+        # Набор не меняется, пока сервис работает: хэш содержимого считается один раз при старте
+        self.version = fingerprint(transactions)
+        self.operations: dict[str, Handler] = {
+            "filter": self.filter,
+            "sort": self.sort,
+            "mask": self.mask,
+            "dates": self.dates,
+        }
+        # Операции со страницами: полный результат без учета offset и limit
+        self.paged: dict[str, ItemsHandler] = {"filter": self.filter_items, "sort": self.sort_items}
+        self.requests = 0
+        self.coalesced = 0
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._pending: dict[str, "asyncio.Task[Any]"] = {}
+
+    @classmethod
+    def from_file(cls, path: PathType, **options: Any) -> "TransactionService":
+        """Загружает набор из файла JSON или JSON Lines."""
+        return cls(list(read_transactions(path)), **options)
+
+    def filter_items(self, params: dict[str, Any]) -> list[Row]:
+        items = self.cache.filter_by_state(self.transactions, params.get("state", "EXECUTED"), self.version)
+        return items  # type: ignore[return-value]
+
+    def sort_items(self, params: dict[str, Any]) -> list[Row]:
+        top = params.get("top")
+        reverse = bool(params.get("reverse", True))
+        items = self.cache.sort_by_date(self.transactions, reverse, None if top is None else int(top), self.version)
+        return items  # type: ignore[return-value]
+
+    def filter(self, params: dict[str, Any]) -> dict[str, Any]:
+        return _page(self.filter_items(params), params)
+
+    def sort(self, params: dict[str, Any]) -> dict[str, Any]:
+        return _page(self.sort_items(params), params)
+
+    def mask(self, params: dict[str, Any]) -> dict[str, Any]:
+        batch = mask_account_cards(_values(params))
+        return {"masked": batch.masked, "status": batch.status, "invalid": batch.invalid}
+
+    def dates(self, params: dict[str, Any]) -> dict[str, Any]:
+        batch = get_dates(_values(params), params.get("format", "%d.%m.%Y"), bool(params.get("strict", False)))
+        return {"dates": batch.dates, "invalid": batch.invalid}
+
+    async def call(self, operation: str, params: dict[str, Any]) -> bytes:
+        """
+        Выполняет операцию и возвращает тело ответа JSON. Одновременные запросы с одинаковыми операцией
+        и параметрами (для /filter и /sort - без учета offset и limit) объединяются в одно вычисление.
+
+        :raises RequestError: Если операция неизвестна или параметры неверны
+        """
+        handler = self.operations.get(operation)
+        if handler is None:
+            raise RequestError(404, f"Unknown operation: {operation}")
+        self.requests += 1
+        items = self.paged.get(operation)
+        if items is None:
+            body: bytes = await self._coalesce(operation, params, lambda: _encode(handler(params)))
+            return body
+        query = {name: value for name, value in params.items() if name not in _PAGE_PARAMS}
+        result: list[Row] = await self._coalesce(operation, query, lambda: items(query))
+        # Страница сериализуется отдельно для каждого запроса, тоже вне цикла событий: limit может быть большим
+        return await self._compute(lambda: _encode(_page(result, params)))
+
+    async def _coalesce(self, operation: str, params: dict[str, Any], func: Callable[[], Any]) -> Any:
+        """Выполняет func через _compute один раз для всех одновременных запросов с тем же ключом."""
+        key = f"{operation} {json.dumps(params, sort_keys=True, ensure_ascii=False)}"
+        pending = self._pending.get(key)
+        if pending is None:
+            # Вычисление - отдельная задача, а не часть первого запроса: его отмена не затрагивает остальных
+            pending = self._pending[key] = asyncio.ensure_future(self._compute(func))
+
+            def finish(task: "asyncio.Task[Any]") -> None:
+                del self._pending[key]
+                if not task.cancelled():
+                    # Отмечаем исключение полученным, даже если все ожидавшие запросы отменены
+                    task.exception()
+
+            pending.add_done_callback(finish)
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(pending)
+
+    async def _compute(self, func: Callable[[], T]) -> T:
+        """Выполняет func в пуле с ограничением числа одновременных вычислений; ошибки параметров - 400."""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        def run() -> T:
+            try:
+                return func()
+            except (ValueError, TypeError, KeyError) as e:
+                raise RequestError(400, f"{type(e).__name__}: {e}") from e
+
+        async with self._semaphore:
+            return await asyncio.get_running_loop().run_in_executor(self.executor, run)
+
+    def health(self) -> bytes:
+        status = {"status": "ok", "rows": len(self.transactions), "requests": self.requests}
+        status.update(coalesced=self.coalesced, cache=self.cache.stats()._asdict())
+        return json.dumps(status).encode("utf-8")
+
+    def close(self) -> None:
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _response(status: int, body: bytes, keep_alive: bool) -> bytes:
+    head = (
+        f"HTTP/1.1 {status} {_REASONS.get(status, 'Error')}\r\n"
+        f"Content-Type: application/json; charset=utf-8\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+    )
+    return head.encode("ascii") + body
+
+
+def _error_body(message: str) -> bytes:
+    return json.dumps({"error": message}, ensure_ascii=False).encode("utf-8")
+
+
+async def _read_request(reader: asyncio.StreamReader) -> Optional[tuple[str, str, dict[str, str], bytes]]:
+    """Читает один запрос HTTP/1.1: метод, путь, заголовки (имена в нижнем регистре) и тело."""
+    line = await reader.readline()
+    if not line:
+        return None
+    try:
+        method, path, _ = line.decode("latin-1").split(" ", 2)
+    except ValueError:
+        raise RequestError(400, "Malformed request line")
+    headers = {}
+    while True:
+        header = await reader.readline()
+        if header in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = header.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    try:
+        length = int(headers.get("content-length", 0) or 0)
+    except ValueError:
+        raise RequestError(400, "Invalid Content-Length")
+    if length < 0:
+        raise RequestError(400, "Invalid Content-Length")
+    if length > MAX_BODY:
+        raise RequestError(413, "Request body too large")
+    body = await reader.readexactly(length) if length else b""
+    return method, path.split("?", 1)[0], headers, body
+
+
+def connection_handler(
+    service: TransactionService,
+) -> Callable[[asyncio.StreamReader, asyncio.StreamWriter], Awaitable[None]]:
+    """Обработчик соединений для asyncio.start_server: запросы одного соединения обрабатываются по очереди."""
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                keep_alive = False
+                try:
+                    request = await _read_request(reader)
+                    if request is None:
+                        break
+                    method, path, headers, body = request
+                    keep_alive = headers.get("connection", "").lower() != "close"
+                    if path == "/health" and method == "GET":
+                        status, payload = 200, service.health()
+                    elif method != "POST":
+                        raise RequestError(405, "Use POST")
+                    else:
+                        try:
+                            params = json.loads(body) if body else {}
+                        except ValueError:
+                            raise RequestError(400, "Body must be JSON")
+                        if not isinstance(params, dict):
+                            raise RequestError(400, "Body must be a JSON object")
+                        status, payload = 200, await service.call(path.strip("/"), params)
+                except RequestError as e:
+                    status, payload = e.status, _error_body(str(e))
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    raise
+                except Exception as e:
+                    # Ошибка обработчика не должна оставлять клиента без ответа
+                    status, payload = 500, _error_body(f"Internal error: {type(e).__name__}")
+                writer.write(_response(status, payload, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    return handle
+
+
+async def start(
+    service: TransactionService, host: str = "127.0.0.1", port: int = 8080, unix: Optional[str] = None
+) -> asyncio.AbstractServer:
+    """
+    Запускает сервер на TCP-порту или Unix-сокете.
+
+    :param port: Порт; 0 - свободный порт, выбранный системой
+    :param unix: Путь к Unix-сокету вместо host и port
+    :return: Запущенный сервер
+    """
+    handle = connection_handler(service)
+    if unix is not None:
+        return await asyncio.start_unix_server(handle, unix)
+    return await asyncio.start_server(handle, host, port)
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("data", help="файл операций JSON или JSON Lines")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--unix", help="путь к Unix-сокету вместо TCP")
+    parser.add_argument("--concurrency", type=int, help="число одновременных вычислений")
+    args = parser.parse_args(argv)
+
+    service = TransactionService.from_file(args.data, max_concurrency=args.concurrency)
+
+    async def run() -> None:
+        server = await start(service, args.host, args.port, args.unix)
+        print(f"serving {len(service.transactions)} transactions on {args.unix or f'{args.host}:{args.port}'}")
+        async with server:
+            await server.serve_forever()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,296 @@
+import datetime
+from array import array
+from decimal import Decimal, InvalidOperation
+from typing import Any, Iterable, Iterator, Optional, Sequence
+
+from src.readers import PathType, read_transactions
+
+# Значение-заглушка для отсутствующих целочисленных полей (минимальное int64)
+NULL = -(2**63)
+
+# Суммы хранятся в фиксированной точке: целое число сотых долей
+AMOUNT_SCALE = 100
+
+EPOCH = datetime.datetime(1970, 1, 1)
+_MICROSECOND = datetime.timedelta(microseconds=1)
+
+# Целочисленные колонки (int64) и категориальные колонки (коды int32 в таблице строк)
+INT_COLUMNS = ("id", "date", "amount")
+CATEGORY_COLUMNS = ("state", "currency_code", "currency_name", "description", "from", "to")
+
+
+def parse_date(date_str: str) -> int:
+    """
+    Преобразует дату из формата ISO в число микросекунд от начала эпохи.
+
+    :param date_str: Дата вида 2019-07-03T18:35:29.512364
+    :return: Целое число, сравнение которого совпадает с хронологическим порядком
+    :raises ValueError: Если строка не является датой в формате ISO
+    """
+    moment = datetime.datetime.fromisoformat(date_str)
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    return (moment - EPOCH) // _MICROSECOND
+
+
+def format_date(micros: int) -> str:
+    """Преобразует микросекунды от начала эпохи обратно в строку ISO."""
+    return (EPOCH + datetime.timedelta(microseconds=micros)).isoformat(timespec="microseconds")
+
+
+def parse_amount(amount: Any) -> int:
+    """
+    Преобразует сумму операции в фиксированную точку (сотые доли).
+
+    :param amount: Сумма строкой или числом, например "9824.07"
+    :return: Сумма в сотых долях
+    :raises ValueError: Если сумма не является числом или содержит больше двух знаков после точки
+    """
+    try:
+        scaled = Decimal(str(amount)) * AMOUNT_SCALE
+    except InvalidOperation:
+        raise ValueError(f"Invalid amount: {amount!r}") from None
+    if not scaled.is_finite() or scaled != scaled.to_integral_value():
+        raise ValueError(f"Invalid amount: {amount!r}")
+    return int(scaled)
+
+
+def format_amount(value: int) -> str:
+    """Преобразует сумму в сотых долях в строку с двумя знаками после точки."""
+    sign = "-" if value < 0 else ""
+    whole, fraction = divmod(abs(value), AMOUNT_SCALE)
+    return f"{sign}{whole}.{fraction:02d}"
+
+
+class Categories:
+    """Таблица интернированных строк: каждое уникальное значение хранится один раз и кодируется числом."""
+
+    def __init__(self, values: Iterable[Optional[str]] = ()) -> None:
+        self.values: list[Optional[str]] = []
+        self._codes: dict[Optional[str], int] = {}
+        for value in values:
+            self.encode(value)
+
+    def encode(self, value: Optional[str]) -> int:
+        """Возвращает код значения, добавляя его в таблицу при первой встрече."""
+        code = self._codes.get(value)
+        if code is None:
+            code = len(self.values)
+            self._codes[value] = code
+            self.values.append(value)
+        return code
+
+    def find(self, value: Optional[str]) -> int:
+        """Возвращает код значения или -1, если такого значения в таблице нет."""
+        return self._codes.get(value, -1)
+
+    def __getitem__(self, code: int) -> Optional[str]:
+        return self.values[code]
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+
+class TransactionTable:
+    """
+    Колоночное хранилище транзакций.
+
+    Вместо списка вложенных словарей каждое поле хранится отдельной колонкой:
+    id, дата (микросекунды от эпохи) и сумма (сотые доли) - в массивах int64,
+    строковые поля - кодами int32 в таблицах интернированных строк.
+    Отсутствующие числовые поля хранятся как NULL, отсутствующие строковые - как None.
+    """
+
+    def __init__(
+        self,
+        columns: Optional[dict[str, Sequence[int]]] = None,
+        categories: Optional[dict[str, Categories]] = None,
+    ) -> None:
+        """
+        :param columns: Готовые колонки (для внутреннего использования); по умолчанию пустая таблица
+        :param categories: Таблицы строк для категориальных колонок
+        """
+        if columns is None:
+            columns = {name: array("q") for name in INT_COLUMNS}
+            columns.update({name: array("i") for name in CATEGORY_COLUMNS})
+        self.columns: dict[str, Sequence[int]] = columns
+        self.categories: dict[str, Categories] = categories or {name: Categories() for name in CATEGORY_COLUMNS}
+
+    @classmethod
+    def from_records(cls, transactions: Iterable[dict[str, Any]]) -> "TransactionTable":
+        """
+        Строит таблицу из словарей транзакций.
+
+        :param transactions: Итерируемый источник словарей в формате операций банка
+        :return: Новая таблица
+        """
+        table = cls()
+        table.extend(transactions)
+        return table
+
+    @classmethod
+    def from_file(cls, path: PathType) -> "TransactionTable":
+        """Строит таблицу из файла JSON или JSON Lines, читая его потоково."""
+        return cls.from_records(read_transactions(path))
+
+    def append(self, transaction: dict[str, Any]) -> int:
+        """
+        Добавляет транзакцию в конец таблицы.
+
+        Поля, не входящие в схему операции, не сохраняются.
+
+        :param transaction: Словарь транзакции
+        :return: Номер добавленной строки
+        :raises ValueError: Если дата или сумма имеют неверный формат
+        """
+        operation_amount = transaction.get("operationAmount") or {}
+        currency = operation_amount.get("currency") or {}
+
+        transaction_id = transaction.get("id")
+        date = transaction.get("date")
+        amount = operation_amount.get("amount")
+        ints = (
+            NULL if transaction_id is None else int(transaction_id),
+            NULL if date is None else parse_date(date),
+            NULL if amount is None else parse_amount(amount),
+        )
+        strings = (
+            transaction.get("state"),
+            currency.get("code"),
+            currency.get("name"),
+            transaction.get("description"),
+            transaction.get("from"),
+            transaction.get("to"),
+        )
+
+        columns = self.columns
+        for name, value in zip(INT_COLUMNS, ints):
+            columns[name].append(value)  # type: ignore[attr-defined]
+        for name, string in zip(CATEGORY_COLUMNS, strings):
+            columns[name].append(self.categories[name].encode(string))  # type: ignore[attr-defined]
+        return len(self) - 1
+
+    def extend(self, transactions: Iterable[dict[str, Any]]) -> None:
+        """Добавляет транзакции в конец таблицы."""
+        for transaction in transactions:
+            self.append(transaction)
+
+    def __len__(self) -> int:
+        return len(self.columns["id"])
+
+    def __iter__(self) -> Iterator[dict[str, Any]]:
+        for position in range(len(self)):
+            yield self.row(position)
+
+    def __getitem__(self, position: int) -> dict[str, Any]:
+        if position < 0:
+            position += len(self)
+        if not 0 <= position < len(self):
+            raise IndexError("TransactionTable index out of range")
+        return self.row(position)
+
+    def row(self, position: int) -> dict[str, Any]:
+        """
+        Восстанавливает словарь транзакции в исходном формате.
+
+        :param position: Номер строки
+        :return: Словарь с ключами id, state, date, operationAmount, description, from, to
+        """
+        columns = self.columns
+        values = {name: self.categories[name][columns[name][position]] for name in CATEGORY_COLUMNS}
+        result: dict[str, Any] = {}
+
+        transaction_id = columns["id"][position]
+        if transaction_id != NULL:
+            result["id"] = transaction_id
+        if values["state"] is not None:
+            result["state"] = values["state"]
+        date = columns["date"][position]
+        if date != NULL:
+            result["date"] = format_date(date)
+
+        operation_amount: dict[str, Any] = {}
+        amount = columns["amount"][position]
+        if amount != NULL:
+            operation_amount["amount"] = format_amount(amount)
+        currency = {
+            key: values[name] for key, name in (("name", "currency_name"), ("code", "currency_code"))
+            if values[name] is not None
+        }
+        if currency:
+            operation_amount["currency"] = currency
+        if operation_amount:
+            result["operationAmount"] = operation_amount
+
+        for name in ("description", "from", "to"):
+            if values[name] is not None:
+                result[name] = values[name]
+        return result
+
+    def values(self, name: str) -> Iterator[Any]:
+        """
+        Отдает значения колонки: строки для категориальных колонок, числа для остальных.
+
+        :param name: Имя колонки из INT_COLUMNS или CATEGORY_COLUMNS
+        :return: Итератор значений в порядке строк
+        """
+        column = self.columns[name]
+        if name in self.categories:
+            lookup = self.categories[name].values
+            return (lookup[code] for code in column)
+        return iter(column)
+
+    def indexed_positions(self, name: str, value: Optional[str]) -> Optional[Sequence[int]]:
+        """
+        Номера строк с заданным значением категориальной колонки из готового индекса, без просмотра колонки.
+
+        У таблицы в памяти индексов нет; таблицы с сохраненными индексами (MappedTransactionTable)
+        переопределяют метод, и Query использует его для условий на равенство.
+
+        :param name: Имя категориальной колонки
+        :param value: Искомое значение
+        :return: Номера строк по возрастанию или None, если индекса по колонке нет
+        """
+        return None
+
+    def positions_where(self, name: str, value: Optional[str]) -> list[int]:
+        """
+        Находит строки, у которых категориальная колонка равна значению.
+
+        Сравниваются целочисленные коды, а не строки, поэтому значение ищется в таблице строк один раз.
+        Если по колонке есть индекс (indexed_positions), колонка не просматривается.
+
+        :param name: Имя категориальной колонки
+        :param value: Искомое значение
+        :return: Список номеров строк по возрастанию
+        """
+        indexed = self.indexed_positions(name, value)
+        if indexed is not None:
+            return list(indexed)
+        code = self.categories[name].find(value)
+        if code < 0:
+            return []
+        return [position for position, item in enumerate(self.columns[name]) if item == code]
+
+    def take(self, positions: Iterable[int]) -> "TransactionTable":
+        """
+        Создает таблицу из выбранных строк в указанном порядке.
+
+        Таблицы строк разделяются с исходной таблицей, копируются только коды.
+
+        :param positions: Номера строк
+        :return: Новая таблица
+        """
+        positions = list(positions)
+        columns: dict[str, Sequence[int]] = {}
+        for name, column in self.columns.items():
+            typecode = "q" if name in INT_COLUMNS else "i"
+            columns[name] = array(typecode, [column[position] for position in positions])
+        return TransactionTable(columns, self.categories)
+
+    def nbytes(self) -> int:
+        """Приблизительный объем памяти колонок и таблиц строк в байтах."""
+        total = sum(len(column) * (8 if name in INT_COLUMNS else 4) for name, column in self.columns.items())
+        for categories in self.categories.values():
+            total += sum(len(value.encode("utf-8")) + 49 for value in categories.values if value is not None)
+        return total
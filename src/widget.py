@@ -1,7 +1,219 @@
+import threading
+from collections import OrderedDict
+from typing import Iterable, NamedTuple, Optional
+
 from src.masks import get_mask_account, get_mask_card_number
 
 
+class CacheStats(NamedTuple) :
+    """Счетчики кэша масок."""
+
+    hits: int
+    misses: int
+    evictions: int
+    size: int
+    maxsize: int
+
+
+class MaskCache :
+    """
+    Кэш результатов маскировки с вытеснением давно не использованных записей (LRU).
+
+    Ключом служит вся входная строка целиком, поэтому маска всегда вычислена из той же самой строки.
+    Ошибки маскировки не кэшируются. Безопасен для использования из нескольких потоков.
+    """
+
+    def __init__(self, maxsize: int = 4096) -> None :
+        """
+        :param maxsize: Максимальное число хранимых масок
+        :raises ValueError: Если maxsize меньше 1
+        """
+        if maxsize < 1 :
+            raise ValueError("maxsize must be positive")
+        self.maxsize = maxsize
+        self._data: OrderedDict[str, str] = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get(self, input_str: str) -> str :
+        """Возвращает маску строки из кэша или вычисляет и запоминает ее."""
+        with self._lock :
+            masked = self._data.get(input_str)
+            if masked is not None :
+                self._data.move_to_end(input_str)
+                self._hits += 1
+                return masked
+
+        masked = _mask_account_card(input_str)
+
+        with self._lock :
+            self._misses += 1
+            self._data[input_str] = masked
+            self._data.move_to_end(input_str)
+            while len(self._data) > self.maxsize :
+                self._data.popitem(last=False)
+                self._evictions += 1
+        return masked
+
+    def stats(self) -> CacheStats :
+        """Возвращает текущие значения счетчиков."""
+        with self._lock :
+            return CacheStats(self._hits, self._misses, self._evictions, len(self._data), self.maxsize)
+
+    def clear(self) -> None :
+        """Очищает кэш и сбрасывает счетчики."""
+        with self._lock :
+            self._data.clear()
+            self._hits = self._misses = self._evictions = 0
+
+
+_mask_cache: Optional[MaskCache] = None
+
+
+def enable_mask_cache(maxsize: int = 4096) -> MaskCache :
+    """
+    Включает кэширование для mask_account_card.
+
+    :param maxsize: Максимальное число хранимых масок
+    :return: Кэш, через который можно читать счетчики
+    """
+    global _mask_cache
+    _mask_cache = MaskCache(maxsize)
+    return _mask_cache
+
+
+def disable_mask_cache() -> None :
+    """Выключает кэширование для mask_account_card."""
+    global _mask_cache
+    _mask_cache = None
+
+
 def mask_account_card(input_str: str) -> str :
+    """Маскирует номер карты или счета в строке вида "Visa Platinum 7000792289606361"."""
+    cache = _mask_cache
+    # Подклассы str могут переопределять сравнение, поэтому кэшируются только обычные строки
+    if cache is not None and type(input_str) is str :
+        return cache.get(input_str)
+    return _mask_account_card(input_str)
+
+
+# Коды результата маскировки в mask_account_cards
+MASK_OK = 0
+# Меньше двух слов: строка возвращается без изменений, как в mask_account_card
+MASK_NO_NUMBER = 1
+MASK_INVALID_ACCOUNT = 2
+MASK_INVALID_CARD = 3
+MASK_NOT_STRING = 4
+
+# Названия счетов; все остальные названия считаются картами
+ACCOUNT_LABELS = frozenset({"Счет"})
+_ACCOUNT = 1
+_CARD = 2
+# Название как в строке -> (название через одиночные пробелы, вид номера); заполняется по мере встречи,
+# но не больше _MAX_LABELS записей, чтобы мусорные названия не раздували таблицу
+_label_kinds: dict[str , tuple[str , int]] = {}
+_MAX_LABELS = 10_000
+
+
+class MaskBatch(NamedTuple) :
+    """Результат пакетной маскировки: маски (None для ошибок) и коды MASK_* для каждой строки."""
+
+    masked: list[Optional[str]]
+    status: list[int]
+
+    @property
+    def invalid(self) -> list[int] :
+        """Позиции строк с ошибкой (коды MASK_INVALID_ACCOUNT, MASK_INVALID_CARD, MASK_NOT_STRING)."""
+        return [index for index , code in enumerate(self.status) if code > MASK_NO_NUMBER]
+
+
+def _label_kind(label: str) -> tuple[str , int] :
+    known = _label_kinds.get(label)
+    if known is None :
+        name = " ".join(label.split())
+        known = (name , _ACCOUNT if name in ACCOUNT_LABELS else _CARD)
+        # Пустое название (строка без номера) не запоминается: быстрый путь mask_account_cards его не проверяет
+        if name and len(_label_kinds) < _MAX_LABELS :
+            _label_kinds[label] = known
+    return known
+
+
+def _mask_one(value: str) -> tuple[Optional[str] , int] :
+    """
+    Маскирует строку без исключений: название и номер разделяются по последнему пробелу, вид номера
+    берется из таблицы названий, а номер проверяется по длине и цифрам.
+    """
+    label , _ , number = value.rpartition(" ")
+    if not number.isdigit() :
+        # Номер с другими пробельными символами, пробел в конце или строка без пробелов: разбор как в split()
+        words = value.split()
+        if len(words) < 2 :
+            return value , MASK_NO_NUMBER
+        label , number = " ".join(words[:-1]) , words[-1]
+    name , kind = _label_kind(label)
+    if not name :
+        return value , MASK_NO_NUMBER
+    if kind == _ACCOUNT :
+        if len(number) >= 4 and number.isdigit() :
+            return f"{name} **{number[-4 :]}" , MASK_OK
+        return None , MASK_INVALID_ACCOUNT
+    if len(number) == 16 and number.isdigit() :
+        return f"{name} {number[:4]} {number[4 :6]}** **** {number[-4 :]}" , MASK_OK
+    return None , MASK_INVALID_CARD
+
+
+def mask_account_cards(values: Iterable[str]) -> MaskBatch :
+    """
+    Маскирует колонку строк вида "Visa Platinum 7000792289606361" / "Счет 73654108430135874305" за один проход.
+
+    Маски совпадают с mask_account_card, но вместо исключения для каждой строки возвращается код: MASK_OK,
+    MASK_NO_NUMBER (строка без номера, возвращается как есть), MASK_INVALID_ACCOUNT, MASK_INVALID_CARD
+    или MASK_NOT_STRING. Некорректные строки обрабатываются так же быстро, как корректные.
+
+    :param values: Итерируемый источник строк (например, поля from или to)
+    :return: MaskBatch(masked, status)
+    """
+    masked: list[Optional[str]] = []
+    status: list[int] = []
+    add_masked = masked.append
+    add_status = status.append
+    kinds = _label_kinds
+    # Тот же разбор, что в _mask_one, развернутый в цикл: основное время уходит на вызовы функций
+    for value in values :
+        if not isinstance(value , str) :
+            add_masked(None)
+            add_status(MASK_NOT_STRING)
+            continue
+        label , _ , number = value.rpartition(" ")
+        known = kinds.get(label)
+        if known is None or not number.isdigit() :
+            result , code = _mask_one(value)
+            add_masked(result)
+            add_status(code)
+        elif known[1] == _ACCOUNT :
+            if len(number) >= 4 :
+                add_masked(f"{known[0]} **{number[-4 :]}")
+                add_status(MASK_OK)
+            else :
+                add_masked(None)
+                add_status(MASK_INVALID_ACCOUNT)
+        elif len(number) == 16 :
+            add_masked(f"{known[0]} {number[:4]} {number[4 :6]}** **** {number[-4 :]}")
+            add_status(MASK_OK)
+        else :
+            add_masked(None)
+            add_status(MASK_INVALID_CARD)
+    return MaskBatch(masked , status)
+
+
+def _mask_account_card(input_str: str) -> str :
+    if type(input_str) is str :
+        result , code = _mask_one(input_str)
+        if result is not None :
+            return result
+    # Ошибки разбираются исходным путем, чтобы исключения остались прежними
     words = input_str.split()
     # Если в строке меньше двух частей, возвращаем исходную строку
     if len(words) < 2 :
@@ -28,3 +240,90 @@ def get_date(date_str: str) -> str :
         return f"{day}.{month}.{year}"
     except (IndexError , ValueError) :
         return date_str
+
+
+class DateBatch(NamedTuple) :
+    """Результат пакетного преобразования дат."""
+
+    dates: list[Optional[str]]
+    invalid: list[int]
+
+
+# Допустимые сочетания "MM-DD" (29 февраля дополнительно проверяется на високосный год)
+_MONTH_DAYS = frozenset(
+    f"{month:02d}-{day:02d}"
+    for month , days in enumerate((31 , 29 , 31 , 30 , 31 , 30 , 31 , 31 , 30 , 31 , 30 , 31) , start=1)
+    for day in range(1 , days + 1)
+)
+# Поддерживаемые директивы формата вывода и соответствующие поля шаблона
+_DATE_DIRECTIVES = {"%d" : "{day}" , "%m" : "{month}" , "%Y" : "{year}" , "%y" : "{short_year}" , "%%" : "%"}
+
+
+def _date_template(output_format: str) -> str :
+    """
+    Переводит формат в стиле strftime в шаблон str.format.
+
+    :raises ValueError: Если в формате есть директивы кроме %d, %m, %Y, %y и %%
+    """
+    parts = []
+    index = 0
+    while index < len(output_format) :
+        char = output_format[index]
+        if char == "%" :
+            directive = output_format[index : index + 2]
+            if directive not in _DATE_DIRECTIVES :
+                raise ValueError(f"Unsupported date format directive: {directive!r}")
+            parts.append(_DATE_DIRECTIVES[directive])
+            index += 2
+        else :
+            parts.append(char.replace("{" , "{{").replace("}" , "}}"))
+            index += 1
+    return "".join(parts)
+
+
+def _is_iso_date(head: str) -> bool :
+    """Проверяет, что строка - дата вида YYYY-MM-DD."""
+    if len(head) != 10 or head[4] != "-" or not (head[:4].isascii() and head[:4].isdigit()) :
+        return False
+    month_day = head[5 :]
+    if month_day not in _MONTH_DAYS :
+        return False
+    if month_day == "02-29" :
+        year = int(head[:4])
+        return year % 4 == 0 and (year % 100 != 0 or year % 400 == 0)
+    return True
+
+
+def get_dates(date_strs: Iterable[str] , output_format: str = "%d.%m.%Y" , strict: bool = False) -> DateBatch :
+    """
+    Преобразует колонку дат ISO ("YYYY-MM-DD" или "YYYY-MM-DDT...") за один вызов.
+
+    Корректные даты разбираются срезами по фиксированным позициям, а результат для одного дня вычисляется
+    один раз. Строки, не прошедшие проверку, попадают в invalid: в строгом режиме вместо них возвращается
+    None, иначе - результат get_date, поэтому с форматом по умолчанию вывод совпадает с поштучным get_date.
+    Значения, которые не являются строками, попадают в invalid с None в любом режиме.
+
+    :param date_strs: Даты строками
+    :param output_format: Формат вывода с директивами %d, %m, %Y, %y и %%
+    :param strict: Возвращать None для некорректных строк вместо результата get_date
+    :return: DateBatch(dates, invalid) - даты и позиции некорректных строк
+    :raises ValueError: Если формат вывода содержит неподдерживаемые директивы
+    """
+    template = _date_template(output_format)
+    known: dict[str , str] = {}
+    dates: list[Optional[str]] = []
+    invalid = []
+    for index , date_str in enumerate(date_strs) :
+        if isinstance(date_str , str) and (len(date_str) == 10 or date_str[10 : 11] == "T") :
+            head = date_str[:10]
+            formatted = known.get(head)
+            if formatted is None and _is_iso_date(head) :
+                formatted = known[head] = template.format(
+                    day=head[8 :] , month=head[5 :7] , year=head[:4] , short_year=head[2 :4]
+                )
+            if formatted is not None :
+                dates.append(formatted)
+                continue
+        invalid.append(index)
+        dates.append(None if strict or not isinstance(date_str , str) else get_date(date_str))
+    return DateBatch(dates , invalid)
@@ -0,0 +1,103 @@
+from decimal import Decimal
+
+import pytest
+
+from src.aggregates import Summary, TransactionAggregates
+
+
+def make_transaction(amount, currency="RUB", state="EXECUTED", date="2023-01-15T12:00:00.000000"):
+    return {
+        "state": state,
+        "date": date,
+        "operationAmount": {"amount": amount, "currency": {"name": currency, "code": currency}},
+    }
+
+
+# Фикстура с транзакциями за несколько дней в разных валютах
+@pytest.fixture
+def transactions():
+    return [
+        make_transaction("100.10"),
+        make_transaction("0.20", date="2023-01-15T23:59:59.000000"),
+        make_transaction("50.00", "USD"),
+        make_transaction("7.05", state="CANCELED", date="2023-01-16T08:00:00.000000"),
+        make_transaction("1000", date="2023-01-17T08:00:00.000000"),
+        {"id": 6, "state": "EXECUTED"},  # без суммы
+        {},
+    ]
+
+
+@pytest.fixture
+def aggregates(transactions):
+    return TransactionAggregates(transactions)
+
+
+def test_summary_totals(aggregates):
+    assert aggregates.processed == 7
+    assert aggregates.skipped == 2
+    assert aggregates.summary(currency="RUB") == Summary(4, Decimal("1107.35"), Decimal("0.20"), Decimal("1000.00"))
+    assert aggregates.summary(currency="RUB", state="EXECUTED").total == Decimal("1100.30")
+    # Точная арифметика: 0.1 + 0.2 в float дало бы 0.30000000000000004
+    assert TransactionAggregates([make_transaction("0.1"), make_transaction("0.2")]).summary().total == Decimal("0.30")
+
+
+@pytest.mark.parametrize("start,end,expected_count", [
+    ("2023-01-15", "2023-01-16", 3),
+    ("2023-01-16", None, 2),
+    (None, "2023-01-17T00:00:00", 4),
+    ("2023-02-01", None, 0),
+])
+def test_summary_period(aggregates, start, end, expected_count):
+    assert aggregates.summary(start=start, end=end).count == expected_count
+
+
+def test_empty_summary(aggregates):
+    assert aggregates.summary(currency="EUR") == Summary(0, Decimal("0.00"), None, None)
+
+
+def test_group_by(aggregates):
+    by_currency = aggregates.group_by("currency")
+    assert list(by_currency) == [("RUB",), ("USD",)]
+    assert by_currency[("USD",)].total == Decimal("50.00")
+
+    by_day = aggregates.group_by("day", "state", currency="RUB")
+    assert {key: value.count for key, value in by_day.items()} == {
+        ("2023-01-15", "EXECUTED"): 2,
+        ("2023-01-16", "CANCELED"): 1,
+        ("2023-01-17", "EXECUTED"): 1,
+    }
+    with pytest.raises(ValueError):
+        aggregates.group_by("description")
+
+
+def test_incremental_add_matches_rebuild(transactions):
+    aggregates = TransactionAggregates()
+    for transaction in transactions:
+        aggregates.add(transaction)
+    assert aggregates.snapshot() == TransactionAggregates(transactions).snapshot()
+
+
+def test_invalid_amount():
+    aggregates = TransactionAggregates()
+    with pytest.raises(ValueError):
+        aggregates.add(make_transaction("1.005"))
+    assert aggregates.processed == 0
+
+
+def test_snapshot_restore(aggregates, transactions, tmp_path):
+    path = tmp_path / "aggregates.json"
+    aggregates.save(path)
+    restored = TransactionAggregates.load(path)
+    assert restored.group_by("currency", "state", "day") == aggregates.group_by("currency", "state", "day")
+    assert (restored.processed, restored.skipped) == (7, 2)
+
+    # После восстановления агрегаты продолжают обновляться
+    restored.add(make_transaction("1.00", "USD"))
+    assert restored.summary(currency="USD") == Summary(2, Decimal("51.00"), Decimal("1.00"), Decimal("50.00"))
+
+
+def test_restore_unknown_version(aggregates):
+    snapshot = aggregates.snapshot()
+    snapshot["version"] = 99
+    with pytest.raises(ValueError):
+        TransactionAggregates.restore(snapshot)
@@ -0,0 +1,40 @@
+import json
+
+import pytest
+
+from benchmarks import suite
+
+
+def make_results(seconds, peak_bytes):
+    return {"results": {"filter_by_state@100": {"seconds": seconds, "peak_bytes": peak_bytes}}}
+
+
+@pytest.mark.parametrize("seconds,peak_bytes,expected_count", [
+    (1.0, 1000, 0),
+    (1.2, 1200, 0),
+    (1.3, 1000, 1),
+    (1.0, 2000, 1),
+    (2.0, 2000, 2),
+])
+def test_compare(seconds, peak_bytes, expected_count):
+    baseline = make_results(1.0, 1000)
+    assert len(suite.compare(make_results(seconds, peak_bytes), baseline, tolerance=0.25)) == expected_count
+
+
+def test_compare_ignores_new_cases():
+    assert suite.compare(make_results(1.0, 1000), {"results": {}}) == []
+
+
+def test_main_fails_on_regression(tmp_path, capsys):
+    """Первый запуск сохраняет базу, запуск с заниженной базой завершается кодом 1"""
+    output = tmp_path / "baseline.json"
+    arguments = ["--sizes", "200", "--cases", "filter_by_state", "get_date", "--repeat", "1"]
+    assert suite.main(arguments + ["--output", str(output)]) == 0
+    results = json.loads(output.read_text(encoding="utf-8"))
+    assert set(results["results"]) == {"filter_by_state@200", "get_date@200"}
+
+    for result in results["results"].values():
+        result["seconds"] /= 1000
+    output.write_text(json.dumps(results), encoding="utf-8")
+    assert suite.main(arguments + ["--baseline", str(output)]) == 1
+    assert "REGRESSIONS" in capsys.readouterr().err
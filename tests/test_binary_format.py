@@ -0,0 +1,140 @@
+import json
+
+import pytest
+
+from src import engine
+from src.binary_format import MappedTransactionTable, convert_json, open_binary, write_binary
+from src.date_index import DateIndex
+from src.generators import filter_by_currency
+from src.processing import filter_by_state, sort_by_date
+from src.query import Query
+from src.table import TransactionTable
+
+
+# Фикстура с тестовыми транзакциями
+@pytest.fixture
+def transactions():
+    return [
+        {
+            "id": 939719570,
+            "state": "EXECUTED",
+            "date": "2018-06-30T02:08:58.425572",
+            "operationAmount": {"amount": "9824.07", "currency": {"name": "USD", "code": "USD"}},
+            "description": "Перевод организации",
+            "from": "Счет 75106830613657916952",
+            "to": "Счет 11776614605963066702",
+        },
+        {
+            "id": 142264268,
+            "state": "EXECUTED",
+            "date": "2019-04-04T23:20:05.206878",
+            "operationAmount": {"amount": "79114.93", "currency": {"name": "USD", "code": "USD"}},
+            "description": "Перевод со счета на счет",
+            "from": "Счет 19708645243227258542",
+            "to": "Счет 75651667383060284188",
+        },
+        {
+            "id": 873106923,
+            "state": "CANCELED",
+            "date": "2019-03-23T01:09:46.296404",
+            "operationAmount": {"amount": "43318.34", "currency": {"name": "руб.", "code": "RUB"}},
+            "description": "Перевод со счета на счет",
+            "from": "Счет 44812258784861134719",
+            "to": "Счет 74489636417521191160",
+        },
+        {
+            "id": 587085106,
+            "state": "EXECUTED",
+            "date": "2018-03-23T10:45:06.972075",
+            "operationAmount": {"amount": "48223.05", "currency": {"name": "руб.", "code": "RUB"}},
+            "description": "Открытие вклада",
+            "to": "Счет 41421565395219882431",
+        },
+    ]
+
+
+@pytest.fixture
+def mapped(transactions, tmp_path):
+    path = tmp_path / "operations.bin"
+    write_binary(transactions, path)
+    with open_binary(path) as table:
+        yield table
+
+
+def test_round_trip(mapped, transactions):
+    assert isinstance(mapped, TransactionTable)
+    assert len(mapped) == 4
+    assert list(mapped) == transactions
+    assert mapped[-1] == transactions[-1]
+
+
+def test_round_trip_missing_fields(tmp_path):
+    records = [{}, {"id": 1, "state": "PENDING"}, {"operationAmount": {"amount": "-0.50"}}]
+    path = tmp_path / "sparse.bin"
+    assert write_binary(TransactionTable.from_records(records), path) == 3
+    with open_binary(path) as table:
+        assert list(table) == [{}, {"id": 1, "state": "PENDING"}, {"operationAmount": {"amount": "-0.50"}}]
+
+
+def test_convert_json(transactions, tmp_path):
+    source = tmp_path / "operations.json"
+    source.write_text(json.dumps(transactions, ensure_ascii=False), encoding="utf-8")
+    target = tmp_path / "operations.bin"
+    assert convert_json(source, target) == 4
+    with open_binary(target) as table:
+        assert list(table) == transactions
+
+
+def test_filters_run_on_mapped_table(mapped, transactions):
+    assert list(filter_by_state(mapped, "EXECUTED")) == filter_by_state(transactions, "EXECUTED")
+    assert list(sort_by_date(mapped)) == sort_by_date(transactions)
+    assert list(filter_by_currency(mapped, "RUB")) == list(filter_by_currency(transactions, "RUB"))
+
+
+def test_state_index(mapped):
+    assert list(mapped.state_positions("EXECUTED")) == [0, 1, 3]
+    assert list(mapped.state_positions("UNKNOWN")) == []
+    assert mapped.positions_where("state", "CANCELED") == [2]
+
+
+@pytest.mark.parametrize("threshold", [0, 10**9])
+def test_query_uses_state_index(mapped, transactions, monkeypatch, threshold):
+    """Условие на статус берется из индекса в файле: колонка статусов не читается ни одним из движков."""
+    if threshold == 0:
+        pytest.importorskip("numpy")
+    monkeypatch.setattr(engine, "NUMPY_THRESHOLD", threshold)
+    assert list(Query(mapped).where(state="EXECUTED", currency="USD").positions()) == [0, 1]
+    monkeypatch.setitem(mapped.columns, "state", None)
+    assert list(Query(mapped).where(state="EXECUTED").positions()) == [0, 1, 3]
+    latest = sorted([0, 1, 3], key=lambda position: transactions[position]["date"], reverse=True)[:2]
+    assert list(Query(mapped).where(state="EXECUTED").order_by("date").limit(2).positions()) == latest
+    assert list(Query(mapped).where(state="UNKNOWN").positions()) == []
+
+
+def test_date_index(mapped, transactions):
+    index = mapped.date_index()
+    assert isinstance(index, DateIndex)
+    expected = DateIndex(transactions)
+    assert index.between("2018-01-01", "2019-04-01") == expected.between("2018-01-01", "2019-04-01")
+    assert index.latest(2) == expected.latest(2)
+
+
+def test_read_only(mapped):
+    with pytest.raises(TypeError):
+        mapped.append({"id": 1})
+
+
+def test_invalid_file(tmp_path):
+    path = tmp_path / "operations.json"
+    path.write_text("[]" * 10, encoding="utf-8")
+    with pytest.raises(ValueError):
+        MappedTransactionTable(path)
+
+
+def test_close(transactions, tmp_path):
+    path = tmp_path / "operations.bin"
+    write_binary(transactions, path)
+    table = open_binary(path)
+    table.close()
+    with pytest.raises(ValueError):
+        table.columns["id"][0]
@@ -0,0 +1,86 @@
+import datetime
+
+import pytest
+
+from src.date_index import DateIndex
+from src.processing import sort_by_date
+from src.table import TransactionTable
+
+
+# Фикстура с тестовыми транзакциями
+@pytest.fixture
+def transactions():
+    return [
+        {"id": 1, "date": "2019-07-03T18:35:29.512364"},
+        {"id": 2, "date": "2018-06-30T02:08:58.425572"},
+        {"id": 3, "date": "2019-07-03T09:00:00.000000"},
+        {"id": 4},
+        {"id": 5, "date": "2019-08-26T10:50:58.294041"},
+        {"id": 6, "date": "2019-07-03T18:35:29.512364"},
+    ]
+
+
+@pytest.fixture(params=["list", "table"])
+def index(request, transactions):
+    if request.param == "table":
+        return DateIndex(TransactionTable.from_records(transactions))
+    return DateIndex(transactions)
+
+
+def ids(rows):
+    return [row["id"] for row in rows]
+
+
+def test_len(index):
+    """Транзакции без даты в индекс не попадают"""
+    assert len(index) == 5
+
+
+def test_between(index):
+    assert ids(index.between("2019-01-01", "2019-08-01")) == [3, 1, 6]
+    assert ids(index.between(datetime.date(2019, 7, 4), datetime.datetime(2020, 1, 1))) == [5]
+    assert ids(index.between("2020-01-01", "2021-01-01")) == []
+
+
+@pytest.mark.parametrize("day,expected_ids", [
+    ("2019-07-03", [3, 1, 6]),
+    ("2019-07-03T12:00:00", [3, 1, 6]),
+    (datetime.date(2018, 6, 30), [2]),
+    (datetime.date(2018, 6, 29), []),
+])
+def test_on(index, day, expected_ids):
+    assert ids(index.on(day)) == expected_ids
+
+
+@pytest.mark.parametrize("count", [0, 1, 2, 3, 5, 10])
+def test_latest_matches_sort_by_date(index, transactions, count):
+    """latest совпадает с sort_by_date с ограничением, включая порядок одинаковых дат"""
+    dated = [item for item in transactions if "date" in item]
+    assert ids(index.latest(count)) == ids(sort_by_date(dated, limit=count))
+
+
+def test_append_in_order(index):
+    position = index.append({"id": 7, "date": "2020-01-01T00:00:00.000000"})
+    assert position == 6
+    assert ids(index.latest(1)) == [7]
+
+
+def test_append_out_of_order(index):
+    index.append({"id": 7, "date": "2019-07-03T18:35:29.512364"})
+    index.append({"id": 8, "date": "2018-01-01T00:00:00.000000"})
+    assert ids(index.on("2019-07-03")) == [3, 1, 6, 7]
+    assert ids(index.between("2000-01-01", "2019-01-01")) == [8, 2]
+
+
+def test_update_after_direct_extend(transactions):
+    """Строки, добавленные в коллекцию напрямую, индексируются вызовом update"""
+    rows = transactions[:3]
+    index = DateIndex(rows)
+    rows.extend(transactions[3:])
+    index.update()
+    assert ids(index.latest(10)) == [5, 1, 6, 3, 2]
+
+
+def test_invalid_date():
+    with pytest.raises(ValueError):
+        DateIndex([{"id": 1, "date": "invalid-date"}])
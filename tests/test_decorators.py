@@ -1,7 +1,13 @@
+import asyncio
+import inspect
 import os
+import re
+import threading
+import time
 import tempfile
 import pytest
-from src.decorators import log
+from src import decorators
+from src.decorators import MAX_REPR, BufferedLogSink, close_sinks, format_inputs, get_sink, log
 
 
 def test_log_to_console(capsys) :
@@ -150,3 +156,399 @@ def test_log_function_name(capsys) :
     # Проверяем вывод в консоль
     captured = capsys.readouterr()
     assert "some_function ok" in captured.out
+
+
+@pytest.fixture
+def log_file(tmp_path) :
+    """Путь к файлу логов; фоновые приемники закрываются после теста."""
+    yield str(tmp_path / "app.log")
+    close_sinks()
+
+
+def test_log_buffered_same_format(log_file) :
+    """Фоновая запись дает те же строки, что и синхронная."""
+
+    @log(filename=log_file, buffered=True)
+    def test_func(x, y) :
+        if y == 0 :
+            raise ZeroDivisionError
+        return x / y
+
+    assert test_func(4, 2) == 2
+    with pytest.raises(ZeroDivisionError) :
+        test_func(1, y=0)
+    get_sink(log_file).flush()
+
+    with open(log_file, "r", encoding="utf-8") as f :
+        lines = f.read().splitlines()
+    assert re.fullmatch(r"\d{4}-\d\d-\d\d \d\d:\d\d:\d\d test_func ok", lines[0])
+    assert lines[1].endswith(" test_func error: ZeroDivisionError. Inputs: (1,), {'y': 0}")
+
+
+def test_log_buffered_shares_sink(log_file) :
+    """Функции, пишущие в один файл, используют один фоновый поток; close записывает все сообщения."""
+
+    @log(filename=log_file, buffered=True, batch_size=3, flush_interval=60)
+    def first() :
+        return 1
+
+    @log(filename=log_file, buffered=True)
+    def second() :
+        return 2
+
+    sink = get_sink(log_file)
+    for _ in range(5) :
+        first()
+        second()
+    sink.close()
+
+    with open(log_file, "r", encoding="utf-8") as f :
+        content = f.read()
+    assert content.count("first ok") == 5
+    assert content.count("second ok") == 5
+    with pytest.raises(ValueError) :
+        sink.write("late\n")
+
+
+def test_log_buffered_after_close_sinks(log_file) :
+    """После close_sinks вызовы продолжают логироваться через новый приемник, а не падают."""
+
+    @log(filename=log_file, buffered=True)
+    def test_func(x) :
+        return x
+
+    assert test_func(1) == 1
+    close_sinks()
+    assert test_func(2) == 2
+    get_sink(log_file).flush()
+    with open(log_file, "r", encoding="utf-8") as f :
+        assert f.read().count("test_func ok") == 2
+
+
+def test_log_buffered_after_exit_close(log_file, monkeypatch) :
+    """После закрытия приемников при завершении процесса сообщения пишутся в файл напрямую."""
+    monkeypatch.setattr("src.decorators._shutting_down", False)
+
+    @log(filename=log_file, buffered=True)
+    def test_func(x) :
+        return x
+
+    sink = get_sink(log_file)
+    sink._close_at_exit()
+    assert test_func(1) == 1
+    with open(log_file, "r", encoding="utf-8") as f :
+        assert f.read().endswith(" test_func ok\n")
+
+
+def test_log_buffered_flush_interval(log_file) :
+    """Неполный пакет записывается по истечении интервала без явного flush."""
+    sink = get_sink(log_file, flush_interval=0.01)
+    sink.write("message\n")
+    for _ in range(200) :
+        if os.path.getsize(log_file) :
+            break
+        time.sleep(0.01)
+    with open(log_file, "r", encoding="utf-8") as f :
+        assert f.read() == "message\n"
+
+
+def test_sink_backpressure_drops(tmp_path) :
+    """При block=False сообщения сверх размера очереди отбрасываются и подсчитываются."""
+    started = threading.Event()
+
+    class StalledSink(BufferedLogSink) :
+        def _run(self) :
+            started.wait()
+            super()._run()
+
+    sink = StalledSink(str(tmp_path / "app.log"), max_queue=2, block=False)
+    for number in range(5) :
+        sink.write(f"{number}\n")
+    assert sink.dropped == 3
+    started.set()
+    sink.close()
+    with open(tmp_path / "app.log", "r", encoding="utf-8") as f :
+        assert f.read() == "0\n1\n"
+
+
+def test_sink_write_failure(tmp_path, capsys) :
+    """Ошибка записи не останавливает фоновый поток: вызывающие не зависают, сообщения учитываются в dropped."""
+    started = threading.Event()
+
+    class FailingFile :
+        def write(self, text) :
+            raise OSError(28, "No space left on device")
+
+        def flush(self) :
+            pass
+
+        def close(self) :
+            pass
+
+    class FailingSink(BufferedLogSink) :
+        def _run(self) :
+            started.wait()
+            self._file.close()
+            self._file = FailingFile()
+            super()._run()
+
+    sink = FailingSink(str(tmp_path / "app.log"), max_queue=2, batch_size=1)
+    started.set()
+    producer = threading.Thread(target=lambda : [sink.write(f"{number}\n") for number in range(10)])
+    producer.start()
+    producer.join(5)
+    assert not producer.is_alive()
+    sink.flush()
+    sink.close()
+    assert isinstance(sink.error, OSError)
+    assert sink.dropped == 10
+    assert "write failed" in capsys.readouterr().err
+
+
+def test_log_coroutine(capsys) :
+    """Корутина логируется после завершения, а не при создании объекта корутины."""
+
+    @log()
+    async def test_func(x, y) :
+        await asyncio.sleep(0)
+        return x + y
+
+    assert inspect.iscoroutinefunction(test_func)
+    coroutine = test_func(1, 2)
+    assert capsys.readouterr().out == ""
+    assert asyncio.run(coroutine) == 3
+    assert "test_func ok" in capsys.readouterr().out
+
+
+def test_log_coroutine_error(capsys) :
+    """Ошибка, возникшая при ожидании корутины, логируется и пробрасывается."""
+
+    @log()
+    async def test_func(x, y=0) :
+        await asyncio.sleep(0)
+        raise ValueError("Test error")
+
+    with pytest.raises(ValueError) :
+        asyncio.run(test_func(1, y=2))
+    assert "test_func error: ValueError. Inputs: (1,), {'y': 2}" in capsys.readouterr().out
+
+
+def test_log_async_generator(capsys) :
+    """Асинхронный генератор логируется после исчерпания; значения передаются без изменений."""
+
+    @log()
+    async def numbers(count) :
+        for number in range(count) :
+            yield number
+
+    async def collect() :
+        result = []
+        async for number in numbers(3) :
+            assert capsys.readouterr().out == ""
+            result.append(number)
+        return result
+
+    assert inspect.isasyncgenfunction(numbers)
+    assert asyncio.run(collect()) == [0, 1, 2]
+    assert "numbers ok" in capsys.readouterr().out
+
+
+def test_log_async_generator_error(capsys) :
+    """Ошибка внутри асинхронного генератора логируется с аргументами."""
+
+    @log()
+    async def numbers(count) :
+        yield 1
+        raise RuntimeError("Test error")
+
+    async def collect() :
+        return [number async for number in numbers(5)]
+
+    with pytest.raises(RuntimeError) :
+        asyncio.run(collect())
+    assert "numbers error: RuntimeError. Inputs: (5,), {}" in capsys.readouterr().out
+
+
+def test_log_async_generator_athrow(capsys) :
+    """Исключение athrow передается исходному генератору: он может обработать его и продолжить."""
+
+    async def numbers() :
+        try :
+            yield 1
+        except ValueError :
+            yield 2
+        yield 3
+
+    async def run(generator) :
+        first = await generator.asend(None)
+        second = await generator.athrow(ValueError("retry"))
+        rest = [number async for number in generator]
+        return [first, second, *rest]
+
+    assert asyncio.run(run(log()(numbers)())) == asyncio.run(run(numbers())) == [1, 2, 3]
+    assert "numbers ok" in capsys.readouterr().out
+
+
+def test_log_async_generator_athrow_unhandled(capsys) :
+    """Необработанное исключение athrow логируется и пробрасывается потребителю."""
+
+    @log()
+    async def numbers(count) :
+        yield 1
+
+    async def run() :
+        generator = numbers(1)
+        await generator.asend(None)
+        await generator.athrow(KeyError("stop"))
+
+    with pytest.raises(KeyError) :
+        asyncio.run(run())
+    assert "numbers error: KeyError. Inputs: (1,), {}" in capsys.readouterr().out
+
+
+def test_log_coroutine_after_exit_close_drops(log_file, monkeypatch) :
+    """После закрытия приемников при завершении процесса асинхронные функции не пишут в файл из цикла событий."""
+    monkeypatch.setattr("src.decorators._shutting_down", False)
+
+    @log(filename=log_file)
+    async def test_func(x) :
+        return x
+
+    sink = get_sink(log_file)
+    sink._close_at_exit()
+    assert asyncio.run(test_func(1)) == 1
+    assert sink.dropped == 1
+    with open(log_file, "r", encoding="utf-8") as f :
+        assert f.read() == ""
+
+
+def test_log_coroutine_to_file_uses_sink(log_file) :
+    """Асинхронные функции пишут в файл через фоновый приемник, не блокируя цикл событий."""
+
+    @log(filename=log_file)
+    async def test_func() :
+        return "result"
+
+    assert asyncio.run(test_func()) == "result"
+    get_sink(log_file).flush()
+    with open(log_file, "r", encoding="utf-8") as f :
+        assert f.read().endswith(" test_func ok\n")
+
+
+def test_log_coroutine_never_blocks_on_full_queue(log_file, monkeypatch) :
+    """Асинхронная функция не ждет места в очереди даже с block=True: лишние сообщения отбрасываются."""
+    started = threading.Event()
+
+    class StalledSink(BufferedLogSink) :
+        def _run(self) :
+            started.wait()
+            super()._run()
+
+    sink = StalledSink(log_file, max_queue=2, block=True)
+    monkeypatch.setitem(decorators._sinks, log_file, sink)
+
+    @log(filename=log_file, block=True)
+    async def test_func(x) :
+        return x
+
+    async def run() :
+        return [await test_func(number) for number in range(5)]
+
+    assert asyncio.run(run()) == [0, 1, 2, 3, 4]
+    assert sink.dropped == 3
+    started.set()
+    sink.close()
+
+
+def test_log_sampling(capsys) :
+    """Записывается одно из sample успешных завершений, ошибки - всегда."""
+
+    @log(sample=10)
+    def test_func(x) :
+        if x < 0 :
+            raise ValueError("negative")
+        return x
+
+    for number in range(25) :
+        test_func(number)
+    for _ in range(3) :
+        with pytest.raises(ValueError) :
+            test_func(-1)
+
+    out = capsys.readouterr().out
+    assert out.count("test_func ok") == 3
+    assert out.count("test_func error: ValueError. Inputs: (-1,), {}") == 3
+
+
+def test_log_level_error(capsys) :
+    """Уровень error пропускает успешные завершения."""
+
+    @log(level="error")
+    def test_func(x) :
+        return 1 / x
+
+    assert test_func(2) == 0.5
+    with pytest.raises(ZeroDivisionError) :
+        test_func(0)
+    out = capsys.readouterr().out
+    assert "ok" not in out
+    assert "test_func error: ZeroDivisionError. Inputs: (0,), {}" in out
+
+
+def test_log_level_off(capsys) :
+    """Уровень off возвращает исходную функцию."""
+
+    def test_func(x) :
+        return x
+
+    assert log(level="off")(test_func) is test_func
+    assert log(filename="unused.log", level="off")(test_func)(1) == 1
+    assert capsys.readouterr().out == ""
+    assert not os.path.exists("unused.log")
+
+
+@pytest.mark.parametrize("options" , [{"level" : "debug"} , {"sample" : 0}])
+def test_log_invalid_options(options) :
+    with pytest.raises(ValueError) :
+        log(**options)
+
+
+def test_log_error_inputs_truncated(capsys) :
+    """Большие аргументы не форматируются целиком."""
+
+    @log()
+    def test_func(rows, note="") :
+        raise ValueError("bad")
+
+    rows = [{"id" : number} for number in range(1_000_000)]
+    with pytest.raises(ValueError) :
+        test_func(rows, note="x" * 5000)
+    line = capsys.readouterr().out
+    assert "Inputs: ([{'id': 0}, {'id': 1}," in line
+    assert len(line) < 2 * MAX_REPR + 100
+
+
+def test_format_inputs() :
+    assert format_inputs((1, 2), {}) == "(1, 2), {}"
+    assert format_inputs(("a" * 50,), {"y" : 0}, max_repr=20) == "('" + "a" * 15 + "..., {'y': 0}"
+    assert format_inputs((list(range(100)),), {}, max_repr=None) == f"({list(range(100))},), {{}}"
+
+
+@pytest.mark.parametrize(
+    "args,kwargs",
+    [
+        (([{"id": 1, "operationAmount": {"amount": "10.5", "currency": {"name": "руб.", "code": "RUB"}}}],), {}),
+        (((1,), [], {2, 3}, frozenset({4}), b"bytes", None, 1.5), {"nested": {"deep": [[[[1]]]]}}),
+        (("x" * 250,), {}),
+    ],
+)
+def test_format_inputs_small_values_exact(args, kwargs):
+    """Аргументы короче max_repr записываются точно так же, как полным repr."""
+    assert format_inputs(args, kwargs) == f"{args}, {kwargs}"
+    assert format_inputs(args, kwargs, max_repr=10_000) == f"{args}, {kwargs}"
+
+
+def test_format_inputs_self_reference():
+    items = [1]
+    items.append(items)
+    assert format_inputs((items,), {}) == "([1, [...]],), {}"
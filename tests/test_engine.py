@@ -0,0 +1,92 @@
+import pytest
+
+from src import engine
+from src.processing import filter_by_state, sort_by_date
+from src.table import TransactionTable
+
+
+# Фикстура с таблицей, где есть одинаковые даты
+@pytest.fixture
+def table():
+    records = [
+        {"id": 1, "state": "EXECUTED", "date": "2023-01-15T12:00:00.000000"},
+        {"id": 2, "state": "CANCELED", "date": "2023-01-10T08:30:00.000000"},
+        {"id": 3, "state": "EXECUTED", "date": "2023-01-15T12:00:00.000000"},
+        {"id": 4, "state": "PENDING", "date": "2023-01-05T10:15:00.000000"},
+        {"id": 5, "state": "EXECUTED", "date": "2023-01-25T09:00:00.000000"},
+        {"id": 6, "state": "CANCELED", "date": "2023-01-15T12:00:00.000000"},
+    ]
+    return TransactionTable.from_records(records)
+
+
+@pytest.fixture
+def force_numpy(monkeypatch):
+    """Включает векторизованный движок для таблиц любого размера"""
+    pytest.importorskip("numpy")
+    monkeypatch.setattr(engine, "NUMPY_THRESHOLD", 0)
+
+
+@pytest.mark.parametrize("state,expected_ids", [
+    ("EXECUTED", [1, 3, 5]),
+    ("CANCELED", [2, 6]),
+    ("UNKNOWN", []),
+])
+def test_filter_by_state_numpy(table, force_numpy, state, expected_ids):
+    result = filter_by_state(table, state)
+    assert isinstance(result, TransactionTable)
+    assert [item["id"] for item in result] == expected_ids
+
+
+@pytest.mark.parametrize("reverse,expected_ids", [
+    (True, [5, 1, 3, 6, 2, 4]),
+    (False, [4, 2, 1, 3, 6, 5]),
+])
+def test_sort_by_date_numpy_is_stable(table, force_numpy, reverse, expected_ids):
+    """Одинаковые даты сохраняют исходный порядок в обоих направлениях, как у sorted"""
+    assert [item["id"] for item in sort_by_date(table, reverse)] == expected_ids
+    assert [item["id"] for item in sort_by_date(list(table), reverse)] == expected_ids
+
+
+def test_sort_by_date_numpy_missing_date(force_numpy):
+    table = TransactionTable.from_records([{"id": 1, "date": "2023-01-15T12:00:00"}, {"id": 2}])
+    with pytest.raises(KeyError):
+        sort_by_date(table)
+
+
+def test_take_keeps_categories(table, force_numpy):
+    canceled = engine.positions_matching(table, [("state", table.categories["state"].find("CANCELED"))])
+    subset = engine.take(table, canceled)
+    assert subset.categories is table.categories
+    assert list(subset) == [table[1], table[5]]
+
+
+def test_fallback_without_numpy(table, monkeypatch):
+    """Без NumPy функции обработки используют путь на чистом Python"""
+    monkeypatch.setattr(engine, "NUMPY_THRESHOLD", 0)
+    monkeypatch.setattr(engine, "_numpy", None)
+    monkeypatch.setattr(engine, "_numpy_checked", True)
+    assert not engine.use_numpy(len(table))
+    assert [item["id"] for item in filter_by_state(table)] == [1, 3, 5]
+    with pytest.raises(ImportError):
+        engine.require_numpy()
+
+
+def test_threshold(monkeypatch):
+    monkeypatch.setattr(engine, "NUMPY_THRESHOLD", 100)
+    assert not engine.use_numpy(99)
+
+
+@pytest.mark.parametrize("reverse", [True, False])
+@pytest.mark.parametrize("count", [0, 1, 2, 3, 4, 6, 10])
+def test_top_positions_matches_full_sort(table, force_numpy, reverse, count):
+    """Частичная сортировка совпадает с началом полной, в том числе на одинаковых датах"""
+    expected = list(engine.column_order(table, "date", reverse))[:count]
+    assert list(engine.top_positions(table, "date", count, reverse)) == expected
+    assert [item["id"] for item in sort_by_date(table, reverse, limit=count)] == [
+        table[position]["id"] for position in expected
+    ]
+
+
+def test_top_positions_candidates(table, force_numpy):
+    executed = engine.positions_matching(table, [("state", table.categories["state"].find("EXECUTED"))])
+    assert list(engine.top_positions(table, "date", 2, True, executed)) == [4, 0]
@@ -1,6 +1,11 @@
+import json
 import pytest
 from typing import List , Dict , Any
-from src.generators import filter_by_currency , transaction_descriptions , card_number_generator
+from itertools import count
+from src.generators import (Pipeline , card_number_batches , card_number_buffers , card_number_generator ,
+                            filter_by_currency , luhn_card_number_batches , luhn_card_number_generator ,
+                            transaction_descriptions , write_card_numbers)
+from src.luhn import is_luhn_valid
 
 
 # Фикстура с тестовыми данными транзакций
@@ -250,3 +255,154 @@ def test_transaction_descriptions_missing_description(sample_transactions: List[
     # Транзакция без description должна вернуть пустую строку
     gen = transaction_descriptions(modified_transactions)
     assert next(gen) == ""
+
+
+def reference_numbers(start: int , end: int) -> list[str] :
+    """Номера карт, отформатированные по одному"""
+    result = []
+    for num in range(start , end + 1) :
+        num_str = str(num).zfill(16)
+        result.append(f"{num_str[:4]} {num_str[4 :8]} {num_str[8 :12]} {num_str[12 :16]}")
+    return result
+
+
+# Диапазоны, пересекающие границы блоков по 10 000 номеров
+RANGES = [(0 , 0) , (5 , 17) , (9_990 , 30_010) , (9_999_999_999_999_990 , 9_999_999_999_999_999)]
+
+
+@pytest.mark.parametrize("start,end" , RANGES)
+def test_card_number_generator_matches_reference(start: int , end: int) :
+    assert list(card_number_generator(start , end)) == reference_numbers(start , end)
+
+
+@pytest.mark.parametrize("batch_size" , [1 , 7 , 10_000 , 50_000])
+def test_card_number_batches(batch_size: int) :
+    batches = list(card_number_batches(9_990 , 30_010 , batch_size))
+    assert all(len(batch) == batch_size for batch in batches[:-1])
+    assert 0 < len(batches[-1]) <= batch_size
+    assert [number for batch in batches for number in batch] == reference_numbers(9_990 , 30_010)
+
+
+@pytest.mark.parametrize("start,end" , RANGES)
+@pytest.mark.parametrize("separator" , [b"" , b"\n"])
+def test_card_number_buffers(start: int , end: int , separator: bytes) :
+    data = b"".join(card_number_buffers(start , end , separator))
+    expected = b"".join(number.encode() + separator for number in reference_numbers(start , end))
+    assert data == expected
+
+
+def test_write_card_numbers_to_file(tmp_path) :
+    path = tmp_path / "cards.txt"
+    with open(path , "wb") as f :
+        written = write_card_numbers(9_990 , 30_010 , f)
+    assert written == path.stat().st_size == 20_021 * 20
+    assert path.read_text().splitlines() == reference_numbers(9_990 , 30_010)
+
+
+def test_write_card_numbers_to_buffer() :
+    buffer = bytearray(3 * 19 + 1)
+    assert write_card_numbers(9_999 , 10_001 , memoryview(buffer) , separator=b"") == 57
+    assert buffer == b"0000 0000 0000 99990000 0000 0001 00000000 0000 0001 0001\x00"
+    with pytest.raises(ValueError , match="too small") :
+        write_card_numbers(0 , 3 , buffer)
+
+
+def test_card_number_buffers_numpy() :
+    numpy = pytest.importorskip("numpy")
+    block = next(card_number_buffers(1 , 3))
+    assert numpy.frombuffer(block , dtype="S19").tolist() == [number.encode() for number in reference_numbers(1 , 3)]
+
+
+@pytest.mark.parametrize("start,end" , [(5 , 1) , (-1 , 5) , (0 , 10**16)])
+def test_card_number_batch_invalid_range(start: int , end: int) :
+    with pytest.raises(ValueError) :
+        next(card_number_batches(start , end))
+    with pytest.raises(ValueError) :
+        next(card_number_buffers(start , end))
+    with pytest.raises(ValueError) :
+        write_card_numbers(start , end , bytearray(100))
+
+
+def reference_luhn_numbers(start: int , end: int , bins=None) -> list[str] :
+    return [
+        number for number in reference_numbers(start , end)
+        if is_luhn_valid(number) and (bins is None or any(number.replace(" " , "").startswith(b) for b in bins))
+    ]
+
+
+@pytest.mark.parametrize("start,end" , [(0 , 0) , (0 , 9) , (3 , 27) , (11 , 11) , (18 , 18) , (9_990 , 30_013)])
+def test_luhn_card_number_generator(start: int , end: int) :
+    assert list(luhn_card_number_generator(start , end)) == reference_luhn_numbers(start , end)
+
+
+def test_luhn_card_number_generator_bins() :
+    bins = ["00000000000002" , "000000000000004" , "0000000000000"]
+    expected = reference_luhn_numbers(0 , 50_000 , bins)
+    assert list(luhn_card_number_generator(0 , 50_000 , bins)) == expected
+    # На каждые 10 номеров ровно один корректный
+    numbers = luhn_card_number_generator(4_000_000_000_000_000 , 4_999_999_999_999_999 , ["4000000001"])
+    assert len(list(numbers)) == 10**5
+
+
+def test_luhn_card_number_batches() :
+    batches = list(luhn_card_number_batches(0 , 99_999 , batch_size=3_000))
+    assert [len(batch) for batch in batches] == [3_000] * 3 + [1_000]
+    assert all(is_luhn_valid(number) for batch in batches for number in batch)
+
+
+@pytest.mark.parametrize("bins" , [["4a"] , ["4" * 17]])
+def test_luhn_card_number_invalid_bins(bins) :
+    with pytest.raises(ValueError) :
+        next(luhn_card_number_batches(bins=bins))
+
+
+# Тесты для Pipeline
+def test_pipeline_filters_and_descriptions(sample_transactions) :
+    pipeline = Pipeline(sample_transactions).filter_state().filter_currency("USD").descriptions()
+    assert pipeline.to_list() == ["Перевод организации" , "Перевод со счета на счет" , "Перевод с карты на карту"]
+    assert Pipeline(sample_transactions).filter_state("CANCELED").map(lambda t : t["id"]).to_list() == [594226727]
+
+
+def test_pipeline_mask(sample_transactions) :
+    masked = Pipeline(sample_transactions).filter_currency("RUB").mask().to_list()
+    assert [(t["from"] , t["to"]) for t in masked] == [
+        ("Счет **4719" , "Счет **1160") ,
+        ("Visa Platinum 1246 37** **** 3588" , "Счет **1657") ,
+    ]
+    # Исходные словари не меняются
+    assert sample_transactions[2]["from"] == "Счет 44812258784861134719"
+    assert Pipeline(["Счет 73654108430135874305"]).mask().to_list() == ["Счет **4305"]
+
+
+def test_pipeline_batch_and_take(sample_transactions) :
+    ids = Pipeline(sample_transactions).map(lambda t : t["id"]).batch(2).to_list()
+    assert [len(batch) for batch in ids] == [2 , 2 , 1]
+    assert Pipeline(sample_transactions).take(0).to_list() == []
+    assert Pipeline(range(10)).batch(3).take(2).to_list() == [[0 , 1 , 2] , [3 , 4 , 5]]
+
+
+def test_pipeline_is_lazy_and_short_circuits() :
+    consumed = []
+
+    def source() :
+        for number in count() :
+            consumed.append(number)
+            yield {"id" : number , "state" : "EXECUTED" if number % 2 else "CANCELED" ,
+                   "description" : str(number)}
+
+    pipeline = Pipeline(source()).filter_state().descriptions().take(3)
+    assert consumed == []
+    assert list(pipeline) == ["1" , "3" , "5"]
+    assert consumed == [0 , 1 , 2 , 3 , 4 , 5]
+
+
+def test_pipeline_from_file(tmp_path , sample_transactions) :
+    path = tmp_path / "operations.jsonl"
+    path.write_text("\n".join(json.dumps(t , ensure_ascii=False) for t in sample_transactions) , encoding="utf-8")
+    assert Pipeline.from_file(path).filter_currency("RUB").map(lambda t : t["id"]).to_list() == [873106923 , 594226727]
+
+
+@pytest.mark.parametrize("method" , ["batch" , "take"])
+def test_pipeline_invalid_sizes(method: str) :
+    with pytest.raises(ValueError) :
+        getattr(Pipeline([]) , method)(-1 if method == "take" else 0)
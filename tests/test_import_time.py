@@ -0,0 +1,50 @@
+import subprocess
+import sys
+
+import pytest
+
+import src
+from benchmarks.bench_import import HEAVY_MODULES, IMPORT_BUDGET_MS, measure_import
+
+
+@pytest.mark.parametrize("module", sorted(IMPORT_BUDGET_MS))
+def test_import_budget(module):
+    result = measure_import(module, runs=3)
+    assert result["loaded"] == []
+    assert result["ms"] <= IMPORT_BUDGET_MS[module]
+
+
+def test_lazy_package_api():
+    code = (
+        "import sys, src\n"
+        "assert [name for name in sys.modules if name.startswith('src.')] == []\n"
+        "from src import filter_by_state, mask_account_card\n"
+        "assert 'src.processing' in sys.modules and 'src.service' not in sys.modules\n"
+        f"assert not [name for name in {HEAVY_MODULES!r} if name in sys.modules]\n"
+        "print(mask_account_card('Счет 73654108430135874305'))\n"
+    )
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+    assert output.strip() == "Счет **4305"
+
+
+def test_exports():
+    from src.processing import filter_by_state
+
+    assert src.filter_by_state is filter_by_state
+    assert set(src.__all__) <= set(dir(src))
+    for name in src.__all__:
+        assert getattr(src, name).__name__ == name
+    with pytest.raises(AttributeError):
+        src.missing_name
+    with pytest.raises(ImportError):
+        from src import missing_name  # noqa: F401
+
+
+def test_main_script():
+    output = subprocess.run([sys.executable, "-m", "src.main"], capture_output=True, text=True, check=True).stdout
+    assert output.splitlines() == [
+        "7000 79** **** 6361",
+        "**4305",
+        "Visa Platinum 7000 79** **** 6361",
+        "11.03.2024",
+    ]
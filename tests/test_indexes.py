@@ -0,0 +1,176 @@
+import pytest
+
+from src.generators import filter_by_currency
+from src.indexes import HashIndex, IndexedTransactions, account_number, state_keys
+from src.processing import filter_by_state, sort_by_date
+from src.query import Query
+
+
+# Фикстура с тестовыми транзакциями
+@pytest.fixture
+def transactions():
+    return [
+        {
+            "id": 1,
+            "state": "EXECUTED",
+            "date": "2019-08-26T10:50:58.294041",
+            "operationAmount": {"amount": "31957.58", "currency": {"name": "руб.", "code": "RUB"}},
+            "from": "Maestro 1596837868705199",
+            "to": "Счет 64686473678894779589",
+        },
+        {
+            "id": 2,
+            "state": "EXECUTED",
+            "date": "2019-07-03T18:35:29.512364",
+            "operationAmount": {"amount": "8221.37", "currency": {"name": "USD", "code": "USD"}},
+            "from": "MasterCard 7158300734726758",
+            "to": "Счет 35383033474447895560",
+        },
+        {
+            "id": 3,
+            "state": "CANCELED",
+            "date": "2018-06-30T02:08:58.425572",
+            "operationAmount": {"amount": "9824.07", "currency": {"name": "руб.", "code": "RUB"}},
+            "from": "Счет 35383033474447895560",
+            "to": "Счет 64686473678894779589",
+        },
+        {"id": 4, "state": "EXECUTED", "date": "2019-04-04T23:20:05.206878"},
+    ]
+
+
+@pytest.fixture
+def indexed(transactions):
+    return IndexedTransactions(transactions)
+
+
+def ids(rows):
+    return [row["id"] for row in rows]
+
+
+@pytest.mark.parametrize("account,expected", [
+    ("Счет 64686473678894779589", "64686473678894779589"),
+    ("Visa Platinum 7000792289606361", "7000792289606361"),
+    ("", None),
+    (None, None),
+])
+def test_account_number(account, expected):
+    assert account_number(account) == expected
+
+
+@pytest.mark.parametrize("field,value,expected_ids", [
+    ("state", "EXECUTED", [1, 2, 4]),
+    ("currency", "RUB", [1, 3]),
+    ("currency", None, [4]),
+    ("account", "64686473678894779589", [1, 3]),
+    ("account", "7158300734726758", [2]),
+    ("account", "0000", []),
+])
+def test_lookup(indexed, field, value, expected_ids):
+    assert ids(indexed.lookup(field, value)) == expected_ids
+
+
+def test_insert_and_delete(indexed):
+    position = indexed.insert({"id": 5, "state": "EXECUTED", "operationAmount": {"currency": {"code": "RUB"}}})
+    assert position == 4
+    assert ids(indexed.lookup("currency", "RUB")) == [1, 3, 5]
+
+    removed = indexed.delete(0)
+    assert removed["id"] == 1
+    assert len(indexed) == 4
+    assert ids(indexed.lookup("currency", "RUB")) == [3, 5]
+    assert ids(indexed.lookup("account", "64686473678894779589")) == [3]
+    assert ids(indexed) == [2, 3, 4, 5]
+    with pytest.raises(KeyError):
+        indexed.delete(0)
+    with pytest.raises(KeyError):
+        indexed[0]
+
+
+def test_compact(indexed):
+    indexed.delete(1)
+    indexed.compact()
+    assert ids(indexed) == [1, 3, 4]
+    assert list(indexed.positions("state", "EXECUTED")) == [0, 2]
+
+
+def test_unknown_index():
+    with pytest.raises(ValueError):
+        IndexedTransactions(fields=["description"])
+
+
+def test_filters_use_index(indexed):
+    """Функции фильтрации принимают коллекцию с индексами"""
+    assert ids(filter_by_state(indexed, "EXECUTED")) == [1, 2, 4]
+    assert ids(filter_by_currency(indexed, "USD")) == [2]
+    assert ids(sort_by_date(indexed, limit=2)) == [1, 2]
+
+
+def test_query_intersects_indexes(indexed):
+    indexed.delete(3)
+    query = Query(indexed).where(state="EXECUTED", currency="RUB")
+    assert ids(query) == [1]
+    assert list(query.positions()) == [0]
+    assert ids(Query(indexed).date_between("2019-01-01")) == [1, 2]
+
+
+def test_query_without_index(transactions):
+    """Условия на поля без индекса проверяются по строкам"""
+    indexed = IndexedTransactions(transactions, fields=["currency"])
+    assert ids(Query(indexed).where(state="EXECUTED", currency="RUB")) == [1]
+    assert list(Query(indexed).where(state="CANCELED").positions()) == [2]
+
+
+def test_index_is_used_instead_of_scan(indexed, monkeypatch):
+    """Условие на проиндексированное поле не проверяется на каждой строке"""
+    calls = []
+    monkeypatch.setattr(indexed, "live_positions", lambda: calls.append(1) or iter(()))
+    assert ids(Query(indexed).where(state="CANCELED")) == [3]
+    assert calls == []
+
+
+def test_query_intersection_is_sublinear(monkeypatch):
+    """Пересечение читает из длинного списка номеров только O(k log n) элементов, а не весь список"""
+
+    class CountingPostings:
+        def __init__(self, values):
+            self.values = values
+            self.reads = 0
+
+        def __len__(self):
+            return len(self.values)
+
+        def __getitem__(self, index):
+            self.reads += 1
+            return self.values[index]
+
+    # Все 100 000 строк исполнены, в долларах - каждая тысячная
+    currencies = ["USD" if number % 1000 == 0 else "RUB" for number in range(100_000)]
+    rows = [
+        {"id": number, "state": "EXECUTED", "operationAmount": {"currency": {"code": currency}}}
+        for number, currency in enumerate(currencies)
+    ]
+    indexed = IndexedTransactions(rows, fields=["state", "currency"])
+    postings = {}
+    positions = indexed.positions
+
+    def counting_positions(field, value):
+        postings[field] = CountingPostings(positions(field, value))
+        return postings[field]
+
+    monkeypatch.setattr(indexed, "positions", counting_positions)
+    assert ids(Query(indexed).where(state="EXECUTED", currency="USD")) == list(range(0, 100_000, 1000))
+    assert postings["state"].reads < 100 * 20
+
+
+def test_hash_index_remove():
+    index = HashIndex(state_keys)
+    for position in range(0, 10, 2):
+        index.add(position, {"state": "EXECUTED"})
+    index.remove(4, {"state": "EXECUTED"})
+    assert list(index.lookup("EXECUTED")) == [0, 2, 6, 8]
+    for missing in (3, 4, 100):
+        with pytest.raises(ValueError):
+            index.remove(missing, {"state": "EXECUTED"})
+    for position in (0, 2, 6, 8):
+        index.remove(position, {"state": "EXECUTED"})
+    assert len(index) == 0
@@ -0,0 +1,74 @@
+import random
+
+import pytest
+
+from src.luhn import check_digit, is_luhn_valid, luhn_sum, validate_card_numbers, validate_card_numbers_array
+
+
+def naive_is_valid(number):
+    """Проверка Луна по определению: удваивается каждая вторая цифра справа"""
+    total = 0
+    for index, digit in enumerate(reversed(number)):
+        value = int(digit) * (2 if index % 2 else 1)
+        total += value - 9 if value > 9 else value
+    return total % 10 == 0
+
+
+@pytest.fixture
+def card_numbers():
+    rng = random.Random(7)
+    numbers = [str(rng.randrange(10**15, 10**16)) for _ in range(500)]
+    # Половина номеров - с правильной контрольной цифрой
+    numbers += [number[:-1] + str(check_digit(number[:-1])) for number in numbers[:250]]
+    return numbers
+
+
+@pytest.mark.parametrize("number,expected", [
+    ("4111111111111111", True),
+    ("4111 1111 1111 1111", True),
+    ("4111111111111112", False),
+    ("79927398713", True),
+    ("0", False),
+    ("", False),
+    ("4111-1111-1111-1111", False),
+    ("٤١١١١١١١١١١١١١١١", False),
+])
+def test_is_luhn_valid(number, expected):
+    assert is_luhn_valid(number) == expected
+
+
+def test_luhn_sum_matches_definition():
+    for number in range(0, 200_000, 7):
+        assert (luhn_sum(str(number)) % 10 == 0) == naive_is_valid(str(number))
+
+
+@pytest.mark.parametrize("payload,expected", [("7992739871", 3), ("411111111111111", 1), ("0", 0)])
+def test_check_digit(payload, expected):
+    assert check_digit(payload) == expected
+    assert is_luhn_valid(payload + str(expected))
+
+
+def test_check_digit_invalid():
+    with pytest.raises(ValueError):
+        check_digit("12a4")
+
+
+def test_validate_card_numbers(card_numbers):
+    assert validate_card_numbers(card_numbers) == [naive_is_valid(number) for number in card_numbers]
+    # Длина должна быть от 12 до 19 цифр, значения других типов некорректны
+    assert validate_card_numbers(["79927398713", "4" + "0" * 18 + "4", "0" * 20, None, 4111111111111111]) == [
+        False, False, False, False, False
+    ]
+
+
+@pytest.mark.parametrize("extra", [
+    [],
+    ["4111 1111 1111 1111", "4111111111111", "41111111111a1111", "0" * 19, "0" * 20, ""],
+])
+def test_validate_card_numbers_array(card_numbers, extra):
+    numpy = pytest.importorskip("numpy")
+    numbers = card_numbers + extra
+    expected = validate_card_numbers(numbers)
+    assert validate_card_numbers_array(numbers).tolist() == expected
+    assert validate_card_numbers_array(numpy.array(numbers, dtype="S")).tolist() == expected
+    assert validate_card_numbers_array([]).tolist() == []
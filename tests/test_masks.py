@@ -1,5 +1,6 @@
 import pytest
-from src.masks import get_mask_card_number, get_mask_account
+from src.masks import (get_mask_account, get_mask_card_number, mask_accounts, mask_accounts_array,
+                       mask_card_numbers, mask_card_numbers_array)
 
 
 # Фикстура для тестовых данных карт
@@ -34,3 +35,63 @@ def test_get_mask_card_number(card_data):
 def test_get_mask_account(account_data):
     input_account, expected = account_data
     assert get_mask_account(input_account) == expected
+
+
+# Тесты пакетной маскировки
+MIXED_CARDS = ["7000792289606361", "7000 7922 8960 6361", "123", "70007922896063a1", "", "70007922896063611"]
+MIXED_ACCOUNTS = ["73654108430135874305", "1234", "12 34 5", "123", "12a45", "", "7365410843013587430/"]
+
+
+def scalar_masks(mask, numbers):
+    """Эталон: поштучная маскировка с None на месте ошибок"""
+    result = []
+    for number in numbers:
+        try:
+            result.append(mask(number))
+        except ValueError:
+            result.append(None)
+    return result
+
+
+def test_mask_card_numbers():
+    result = mask_card_numbers(MIXED_CARDS + [None])
+    assert result.masked == scalar_masks(get_mask_card_number, MIXED_CARDS) + [None]
+    assert result.invalid == [2, 3, 4, 5, 6]
+
+
+def test_mask_accounts():
+    result = mask_accounts(iter(MIXED_ACCOUNTS))
+    assert result.masked == scalar_masks(get_mask_account, MIXED_ACCOUNTS)
+    assert result.invalid == [3, 4, 5, 6]
+
+
+@pytest.mark.parametrize("as_bytes", [False, True])
+def test_mask_card_numbers_array(as_bytes):
+    numpy = pytest.importorskip("numpy")
+    numbers = [number.encode() for number in MIXED_CARDS] if as_bytes else MIXED_CARDS
+    masked, invalid = mask_card_numbers_array(numpy.array(numbers))
+    expected = [value.encode() if value else b"" for value in scalar_masks(get_mask_card_number, MIXED_CARDS)]
+    assert masked.tolist() == expected
+    assert invalid.tolist() == [2, 3, 4, 5]
+
+
+def test_mask_accounts_array():
+    pytest.importorskip("numpy")
+    masked, invalid = mask_accounts_array(MIXED_ACCOUNTS)
+    expected = [value.encode() if value else b"" for value in scalar_masks(get_mask_account, MIXED_ACCOUNTS)]
+    assert masked.tolist() == expected
+    assert invalid.tolist() == [3, 4, 5, 6]
+
+
+@pytest.mark.parametrize("values", [["123"], ["12", "45"], [b"1"]])
+def test_mask_accounts_array_short_column(values):
+    pytest.importorskip("numpy")
+    masked, invalid = mask_accounts_array(values)
+    assert masked.tolist() == [b""] * len(values)
+    assert invalid.tolist() == list(range(len(values)))
+
+
+def test_mask_arrays_empty():
+    pytest.importorskip("numpy")
+    assert mask_card_numbers_array([])[0].tolist() == []
+    assert mask_accounts_array([])[1].tolist() == []
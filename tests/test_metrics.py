@@ -0,0 +1,94 @@
+import asyncio
+
+import pytest
+
+from src.decorators import timed
+from src.metrics import BUCKETS, FunctionStats, MetricsRegistry, bucket_bounds, bucket_index
+
+
+@pytest.fixture
+def registry():
+    return MetricsRegistry()
+
+
+@pytest.mark.parametrize("duration", [0, 1, 7, 8, 15, 16, 17, 100, 1_000, 123_456, 10**9, 2**62 + 12345])
+def test_bucket_contains_duration(duration):
+    index = bucket_index(duration)
+    low, high = bucket_bounds(index)
+    assert 0 <= index < BUCKETS
+    assert low <= duration < high
+    # Ширина корзины не больше 1/8 от нижней границы
+    assert high - low <= max(1, low // 8)
+
+
+def test_buckets_are_contiguous():
+    for index in range(BUCKETS - 1):
+        assert bucket_bounds(index)[1] == bucket_bounds(index + 1)[0]
+
+
+def test_quantiles():
+    stats = FunctionStats()
+    for duration in range(1, 1001):
+        stats.record(duration * 1000)
+    snapshot = stats.snapshot()
+    assert snapshot.count == 1000
+    assert snapshot.min == pytest.approx(1e-6)
+    assert snapshot.max == pytest.approx(1e-3)
+    assert snapshot.total == pytest.approx(sum(range(1, 1001)) * 1e-6)
+    for value, expected in [(snapshot.p50, 500e-6), (snapshot.p95, 950e-6), (snapshot.p99, 990e-6)]:
+        assert value == pytest.approx(expected, rel=1 / 16)
+
+
+def test_empty_stats():
+    assert FunctionStats().snapshot() == (0, 0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0)
+
+
+def test_timed_counts_calls_and_errors(registry):
+    @timed(registry=registry)
+    def divide(x, y):
+        return x / y
+
+    assert divide(4, 2) == 2
+    with pytest.raises(ZeroDivisionError):
+        divide(1, 0)
+
+    assert divide.__name__ == "divide"
+    name = f"{__name__}.test_timed_counts_calls_and_errors.<locals>.divide"
+    snapshot = registry.snapshot()[name]
+    assert (snapshot.count, snapshot.errors) == (2, 1)
+    assert 0 < snapshot.min <= snapshot.p50 <= snapshot.max
+
+
+def test_timed_coroutine(registry):
+    @timed("sleeper", registry=registry)
+    async def sleeper():
+        await asyncio.sleep(0.01)
+        return "done"
+
+    assert asyncio.run(sleeper()) == "done"
+    # Таймер цикла событий может сработать раньше на один шаг разрешения часов
+    assert registry.snapshot()["sleeper"].min >= 0.009
+
+
+def test_timed_rejects_async_generator(registry):
+    async def numbers():
+        yield 1
+
+    with pytest.raises(TypeError):
+        timed(registry=registry)(numbers)
+
+
+def test_prometheus_and_reset(registry):
+    @timed('quoted"name', registry=registry)
+    def func():
+        return None
+
+    func()
+    text = registry.to_prometheus()
+    assert "# TYPE function_duration_seconds summary" in text
+    assert 'function_duration_seconds{function="quoted\\"name",quantile="0.99"} ' in text
+    assert 'function_duration_seconds_count{function="quoted\\"name"} 1\n' in text
+    assert 'function_duration_seconds_errors_total{function="quoted\\"name"} 0\n' in text
+
+    registry.reset()
+    assert registry.snapshot()['quoted"name'].count == 0
@@ -0,0 +1,68 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from benchmarks.bench_parallel import prepare_transaction
+from src.parallel import chunked, process_parallel
+from src.processing import filter_by_state, sort_by_date
+
+ACCOUNTS = ["Счет 73654108430135874305", "Visa Platinum 7000792289606361", "Maestro 1596837868705199"]
+STATES = ["EXECUTED", "CANCELED", "EXECUTED", "PENDING"]
+
+
+# Фикстура с транзакциями, где много одинаковых дат
+@pytest.fixture
+def transactions():
+    return [
+        {
+            "id": number,
+            "state": STATES[number % len(STATES)],
+            "date": f"2023-01-{number % 7 + 1:02d}T10:00:00.000000",
+            "from": ACCOUNTS[number % 3],
+            "to": ACCOUNTS[(number + 1) % 3],
+        }
+        for number in range(50)
+    ]
+
+
+def expected_result(transactions, state="EXECUTED", sort=False, reverse=True):
+    if state is not None:
+        transactions = filter_by_state(transactions, state)
+    if sort:
+        transactions = sort_by_date(transactions, reverse)
+    return [prepare_transaction(transaction) for transaction in transactions]
+
+
+def test_chunked():
+    assert list(chunked(range(5), 2)) == [[0, 1], [2, 3], [4]]
+    assert list(chunked([], 2)) == []
+    with pytest.raises(ValueError):
+        list(chunked([1], 0))
+
+
+def test_prepare_transaction():
+    transaction = {"id": 1, "date": "2019-08-26T10:50:58.294041", "to": ACCOUNTS[0]}
+    assert prepare_transaction(transaction) == {"id": 1, "date": "26.08.2019", "to": "Счет **4305"}
+    # Исходная транзакция не меняется
+    assert transaction["date"] == "2019-08-26T10:50:58.294041"
+
+
+@pytest.mark.parametrize("state", ["EXECUTED", None])
+@pytest.mark.parametrize("sort,reverse", [(False, True), (True, True), (True, False)])
+def test_process_parallel_matches_sequential(transactions, state, sort, reverse):
+    expected = expected_result(transactions, state, sort, reverse)
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        result = process_parallel(transactions, state, sort, reverse, chunk_size=7, workers=3, executor=executor)
+    assert result == expected
+    assert process_parallel(iter(transactions), state, sort, reverse, chunk_size=7, workers=1) == expected
+
+
+def test_process_parallel_process_pool(transactions):
+    expected = expected_result(transactions, sort=True)
+    assert process_parallel(transactions, sort=True, chunk_size=10, workers=2) == expected
+
+
+def test_process_parallel_error(transactions):
+    transactions[3]["from"] = "Счет 123"
+    with pytest.raises(ValueError):
+        process_parallel(transactions, state=None, chunk_size=10, workers=1)
@@ -1,6 +1,9 @@
+from datetime import datetime
+from decimal import Decimal
+
 import pytest
 
-from src.processing import filter_by_state, sort_by_date
+from src.processing import external_sort_by_date, filter_by_state, sort_by_date
 
 
 # Фикстура для тестовых данных
@@ -64,3 +67,64 @@ def test_sort_by_date_invalid_formats():
     result = sort_by_date(data)
     # Ожидаем что функция не упадет и вернет данные в исходном порядке
     assert [item["id"] for item in result] == [2, 1, 3]
+
+
+# Тесты для режима top-K
+@pytest.mark.parametrize("reverse,limit,expected_ids", [
+    (True, 2, [5, 3]),
+    (False, 3, [4, 2, 1]),
+    (True, 0, []),
+    (True, 10, [5, 3, 1, 2, 4]),
+])
+def test_sort_by_date_limit(sample_data, reverse, limit, expected_ids):
+    result = sort_by_date(sample_data, reverse, limit=limit)
+    assert [item["id"] for item in result] == expected_ids
+
+
+def test_sort_by_date_limit_streaming(sample_data):
+    """Режим top-K работает с потоковым источником"""
+    result = sort_by_date(iter(sample_data), limit=1)
+    assert [item["id"] for item in result] == [5]
+
+
+def test_sort_by_date_limit_same_dates():
+    """Ограничение не нарушает устойчивость сортировки"""
+    data = [{"id": i, "date": "2023-01-15T12:00:00.000000" if i % 2 else "2023-01-16T12:00:00.000000"}
+            for i in range(10)]
+    for reverse in (True, False):
+        expected = sorted(data, key=lambda x: x["date"], reverse=reverse)[:4]
+        assert sort_by_date(data, reverse, limit=4) == expected
+
+
+# Тесты для внешней сортировки
+@pytest.mark.parametrize("run_size", [1, 2, 3, 100])
+@pytest.mark.parametrize("reverse", [True, False])
+def test_external_sort_by_date(sample_data, tmp_path, run_size, reverse):
+    result = list(external_sort_by_date(iter(sample_data), reverse, run_size=run_size, temp_dir=str(tmp_path)))
+    assert result == sort_by_date(sample_data, reverse)
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_external_sort_by_date_stable():
+    data = [{"id": i, "date": f"2023-01-{i % 3 + 10}T00:00:00"} for i in range(20)]
+    for reverse in (True, False):
+        assert list(external_sort_by_date(data, reverse, run_size=4)) == sort_by_date(data, reverse)
+
+
+def test_external_sort_by_date_keeps_values(tmp_path):
+    """Записи из временных файлов совпадают с исходными: значения не проходят через JSON"""
+    data = [
+        {"id": (i, "a"), "date": f"2023-01-{i % 3 + 10}T00:00:00", 1: Decimal("1.10"), "at": datetime(2023, 1, i + 1)}
+        for i in range(10)
+    ]
+    result = list(external_sort_by_date(data, run_size=3, temp_dir=str(tmp_path)))
+    assert result == sort_by_date(data)
+    assert isinstance(result[0]["id"], tuple)
+
+
+def test_external_sort_by_date_errors():
+    with pytest.raises(KeyError):
+        list(external_sort_by_date([{"id": 1, "date": "2023-01-15"}, {"id": 2}], run_size=1))
+    with pytest.raises(ValueError):
+        list(external_sort_by_date([], run_size=0))
+    assert list(external_sort_by_date([])) == []
@@ -0,0 +1,130 @@
+import datetime
+
+import pytest
+
+from src import engine
+from src.query import Query
+from src.table import TransactionTable
+
+
+def make_transaction(transaction_id, state, date, code):
+    return {
+        "id": transaction_id,
+        "state": state,
+        "date": date,
+        "operationAmount": {"amount": "100.00", "currency": {"name": code, "code": code}},
+        "description": "Перевод организации",
+    }
+
+
+# Фикстура с тестовыми транзакциями
+@pytest.fixture
+def transactions():
+    return [
+        make_transaction(1, "EXECUTED", "2019-01-15T12:00:00.000000", "USD"),
+        make_transaction(2, "CANCELED", "2019-02-10T08:30:00.000000", "USD"),
+        make_transaction(3, "EXECUTED", "2019-03-20T18:45:00.000000", "RUB"),
+        make_transaction(4, "EXECUTED", "2018-12-05T10:15:00.000000", "USD"),
+        make_transaction(5, "EXECUTED", "2019-02-25T09:00:00.000000", "USD"),
+        {"id": 6, "state": "EXECUTED"},
+    ]
+
+
+# Источники: список, поток, таблица на чистом Python и таблица на NumPy
+@pytest.fixture(params=["list", "iterator", "table", "table-numpy"])
+def make_source(request, transactions, monkeypatch):
+    if request.param == "table-numpy":
+        pytest.importorskip("numpy")
+        monkeypatch.setattr(engine, "NUMPY_THRESHOLD", 0)
+    else:
+        monkeypatch.setattr(engine, "NUMPY_THRESHOLD", 10**9)
+
+    def make(rows=None):
+        rows = transactions if rows is None else rows
+        if request.param == "list":
+            return rows
+        if request.param == "iterator":
+            return iter(rows)
+        return TransactionTable.from_records(rows)
+
+    return make
+
+
+def ids(rows):
+    return [row["id"] for row in rows]
+
+
+@pytest.mark.parametrize("conditions,expected_ids", [
+    ({"state": "EXECUTED"}, [1, 3, 4, 5, 6]),
+    ({"state": "EXECUTED", "currency": "USD"}, [1, 4, 5]),
+    ({"currency": "RUB", "state": "CANCELED"}, []),
+    ({"currency": "EUR"}, []),
+    ({}, [1, 2, 3, 4, 5, 6]),
+])
+def test_where(make_source, conditions, expected_ids):
+    assert ids(Query(make_source()).where(**conditions)) == expected_ids
+
+
+def test_date_between(make_source):
+    query = Query(make_source()).where(state="EXECUTED").date_between("2019-01-01", "2019-03-01")
+    assert ids(query) == [1, 5]
+
+
+def test_date_between_open_bounds(make_source):
+    assert ids(Query(make_source()).date_between(end=datetime.date(2019, 1, 1))) == [4]
+    assert ids(Query(make_source()).date_between(start="2019-03-01")) == [3]
+
+
+def test_order_by_and_limit(make_source, transactions):
+    rows = transactions[:5]
+    query = Query(make_source(rows)).where(currency="USD").order_by("date").limit(2)
+    assert ids(query) == [5, 2]
+    assert ids(Query(make_source(rows)).order_by("date", reverse=False).limit(3)) == [4, 1, 2]
+    assert ids(Query(make_source(rows)).order_by("id").limit(0)) == []
+
+
+def test_order_by_missing_date(make_source):
+    with pytest.raises(KeyError):
+        Query(make_source()).order_by("date").to_list()
+
+
+def test_limit_without_order_short_circuits():
+    """Без сортировки запрос не читает источник дальше нужного"""
+    consumed = []
+
+    def source():
+        for i in range(1000):
+            consumed.append(i)
+            yield {"id": i, "state": "EXECUTED"}
+
+    assert ids(Query(source()).where(state="EXECUTED").limit(3)) == [0, 1, 2]
+    assert len(consumed) == 3
+
+
+def test_positions(transactions):
+    query = Query(transactions).where(state="EXECUTED").order_by("id", reverse=True).limit(2)
+    assert list(query.positions()) == [5, 4]
+    with pytest.raises(TypeError):
+        Query(iter(transactions)).positions()
+
+
+def test_to_table(transactions):
+    table = Query(transactions).where(currency="USD").to_table()
+    assert isinstance(table, TransactionTable)
+    assert ids(table) == [1, 2, 4, 5]
+
+
+def test_selective_condition_checked_first():
+    """Условие с меньшей долей подходящих строк проверяется первым"""
+    rows = [make_transaction(i, "EXECUTED", "2019-01-01T00:00:00", "RUB" if i % 10 else "USD") for i in range(100)]
+    conditions = Query(rows).where(state="EXECUTED", currency="USD")._ordered_conditions()
+    assert [condition.column for condition in conditions] == ["currency_code", "state"]
+
+
+def test_invalid_arguments(transactions):
+    with pytest.raises(ValueError):
+        Query(transactions).where(amount="100")
+    with pytest.raises(ValueError):
+        Query(transactions).order_by("state")
+    with pytest.raises(ValueError):
+        Query(transactions).limit(-1)
@@ -0,0 +1,123 @@
+import json
+
+import pytest
+
+from src.generators import filter_by_currency, transaction_descriptions
+from src.processing import filter_by_state, iter_by_state
+from src.readers import read_json_array, read_json_lines, read_transactions
+
+
+# Фикстура с тестовыми транзакциями
+@pytest.fixture
+def transactions():
+    return [
+        {
+            "id": 441945886,
+            "state": "EXECUTED",
+            "date": "2019-08-26T10:50:58.294041",
+            "operationAmount": {"amount": "31957.58", "currency": {"name": "руб.", "code": "RUB"}},
+            "description": "Перевод организации",
+            "from": "Maestro 1596837868705199",
+            "to": "Счет 64686473678894779589",
+        },
+        {
+            "id": 41428829,
+            "state": "EXECUTED",
+            "date": "2019-07-03T18:35:29.512364",
+            "operationAmount": {"amount": "8221.37", "currency": {"name": "USD", "code": "USD"}},
+            "description": "Перевод организации",
+            "from": "MasterCard 7158300734726758",
+            "to": "Счет 35383033474447895560",
+        },
+        {},
+        {
+            "id": 587085106,
+            "state": "CANCELED",
+            "date": "2018-03-23T10:45:06.972075",
+            "operationAmount": {"amount": "48223.05", "currency": {"name": "руб.", "code": "RUB"}},
+            "description": "Открытие вклада",
+            "to": "Счет 41421565395219882431",
+        },
+    ]
+
+
+@pytest.fixture
+def array_file(tmp_path, transactions):
+    path = tmp_path / "operations.json"
+    path.write_text(json.dumps(transactions, ensure_ascii=False, indent=4), encoding="utf-8")
+    return path
+
+
+@pytest.fixture
+def lines_file(tmp_path, transactions):
+    path = tmp_path / "operations.jsonl"
+    lines = [json.dumps(item, ensure_ascii=False) for item in transactions]
+    path.write_text("\n".join(lines) + "\n\n", encoding="utf-8")
+    return path
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 64, 65536])
+def test_read_json_array(array_file, transactions, chunk_size):
+    """Проверяем, что результат не зависит от размера порции чтения"""
+    assert list(read_json_array(array_file, chunk_size=chunk_size)) == transactions
+
+
+@pytest.mark.parametrize("content,expected", [
+    ("[]", []),
+    ("  [ ]  ", []),
+    ("[1, 22, 333]", [1, 22, 333]),
+])
+def test_read_json_array_scalars(tmp_path, content, expected):
+    """Проверяем пустые массивы и числа, оборванные на границе порции"""
+    path = tmp_path / "data.json"
+    path.write_text(content, encoding="utf-8")
+    assert list(read_json_array(path, chunk_size=2)) == expected
+
+
+@pytest.mark.parametrize("content", ["[1.5, 2]", "[1E+10]", "[-0.25e-3, 7]", "[1] \n"])
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 4, 5])
+def test_read_json_array_split_floats(tmp_path, content, chunk_size):
+    """Проверяем дробные числа, оборванные после ".", "e" или "E+", на любой границе порции"""
+    path = tmp_path / "data.json"
+    path.write_text(content, encoding="utf-8")
+    assert list(read_json_array(path, chunk_size=chunk_size)) == json.loads(content)
+
+
+@pytest.mark.parametrize("content", ["{}", "[1, 2", "[1 2]", "[{\"id\": }]", "", "[1] garbage", "[] x"])
+def test_read_json_array_invalid(tmp_path, content):
+    """Проверяем, что некорректный файл приводит к ValueError"""
+    path = tmp_path / "data.json"
+    path.write_text(content, encoding="utf-8")
+    with pytest.raises(ValueError):
+        list(read_json_array(path, chunk_size=3))
+
+
+def test_read_json_array_is_lazy(array_file):
+    """Проверяем, что элементы отдаются по одному, без разбора всего файла"""
+    reader = read_json_array(array_file, chunk_size=16)
+    assert next(reader)["id"] == 441945886
+
+
+def test_read_json_lines(lines_file, transactions):
+    assert list(read_json_lines(lines_file)) == transactions
+
+
+def test_read_json_lines_invalid(tmp_path):
+    path = tmp_path / "data.jsonl"
+    path.write_text('{"id": 1}\n{"id": \n', encoding="utf-8")
+    with pytest.raises(ValueError, match="line 2"):
+        list(read_json_lines(path))
+
+
+def test_read_transactions_dispatch(array_file, lines_file, transactions):
+    """Проверяем выбор формата по расширению файла"""
+    assert list(read_transactions(array_file)) == transactions
+    assert list(read_transactions(lines_file)) == transactions
+
+
+def test_streaming_pipeline(array_file):
+    """Проверяем, что фильтры работают поверх потокового источника"""
+    executed = iter_by_state(read_transactions(array_file), "EXECUTED")
+    descriptions = list(transaction_descriptions(filter_by_currency(executed, "RUB")))
+    assert descriptions == ["Перевод организации"]
+    assert [item["id"] for item in filter_by_state(read_transactions(array_file), "CANCELED")] == [587085106]
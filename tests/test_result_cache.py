@@ -0,0 +1,150 @@
+import os
+
+import pytest
+
+from benchmarks.synthetic import generate_transactions
+from src.binary_format import open_binary, write_binary
+from src.processing import filter_by_state, sort_by_date
+from src.result_cache import ResultCache, fingerprint
+from src.table import TransactionTable
+
+
+@pytest.fixture
+def transactions():
+    return list(generate_transactions(500))
+
+
+@pytest.fixture
+def cache():
+    return ResultCache()
+
+
+def test_results_match_processing(cache, transactions):
+    for _ in range(2):
+        assert cache.filter_by_state(transactions, "CANCELED", "v1") == filter_by_state(transactions, "CANCELED")
+        assert cache.sort_by_date(transactions, False, version="v1") == sort_by_date(transactions, reverse=False)
+        assert cache.sort_by_date(transactions, limit=10, version="v1") == sort_by_date(transactions, limit=10)
+    stats = cache.stats()
+    assert (stats.hits, stats.misses, stats.entries) == (3, 3, 3)
+    assert stats.hit_rate == 0.5
+    assert stats.saved_seconds >= 0
+
+
+def test_table_results(cache, transactions):
+    table = TransactionTable.from_records(transactions)
+    for _ in range(2):
+        result = cache.filter_by_state(table)
+        assert isinstance(result, TransactionTable)
+        assert list(result) == list(filter_by_state(table))
+        assert list(cache.sort_by_date(table)) == list(sort_by_date(table))
+    assert cache.stats().hits == 2
+
+
+def test_fingerprint(transactions):
+    table = TransactionTable.from_records(transactions)
+    assert fingerprint(transactions) == fingerprint(list(transactions))
+    assert fingerprint(table) == fingerprint(TransactionTable.from_records(transactions))
+    assert fingerprint(transactions, version="2024-05-01") == fingerprint(table, version="2024-05-01")
+    before = fingerprint(table)
+    table.append(transactions[0])
+    assert fingerprint(table) != before
+    changed = [dict(transactions[0], state="CANCELED"), *transactions[1:]]
+    assert fingerprint(changed) != fingerprint(transactions)
+    with pytest.raises(TypeError):
+        fingerprint(iter(transactions))
+
+
+def test_list_requires_version(cache, transactions):
+    with pytest.raises(TypeError):
+        cache.filter_by_state(transactions)
+    with pytest.raises(TypeError):
+        cache.invalidate(transactions)
+    assert cache.stats().misses == 0
+
+
+def test_saved_seconds_include_fingerprint(cache, transactions, monkeypatch):
+    cache.filter_by_state(transactions, version="v1")
+    clock = [0.0]
+
+    def slow_fingerprint(data, version=None):
+        clock[0] += 10.0
+        return original(data, version)
+
+    original = fingerprint
+    monkeypatch.setattr("src.result_cache.time.perf_counter", lambda: clock[0])
+    monkeypatch.setattr("src.result_cache.fingerprint", slow_fingerprint)
+    cache.filter_by_state(transactions, version="v1")
+    assert cache.stats().hits == 1
+    assert cache.stats().saved_seconds == 0.0
+
+
+def test_version_skips_hashing(cache, transactions, monkeypatch):
+    expected = filter_by_state(transactions)
+    cache.filter_by_state(transactions, version="day-1")
+    monkeypatch.setattr("src.result_cache.pickle.dumps", None)
+    assert cache.filter_by_state(transactions, version="day-1") == expected
+    assert cache.filter_by_state(transactions, version="day-2") == expected
+    assert (cache.stats().hits, cache.stats().misses) == (1, 2)
+
+
+def test_mapped_table_uses_file_version(cache, transactions, tmp_path):
+    path = tmp_path / "operations.bin"
+    write_binary(transactions, path)
+    with open_binary(path) as table:
+        expected = list(filter_by_state(table))
+        assert list(cache.filter_by_state(table)) == expected
+        key = fingerprint(table)
+    with open_binary(path) as table:
+        assert fingerprint(table) == key
+        assert list(cache.filter_by_state(table)) == expected
+    assert cache.stats().hits == 1
+
+
+def test_eviction(transactions):
+    cache = ResultCache(max_bytes=3000)
+    cache.sort_by_date(transactions, version="v1")  # 500 номеров по 4 байта
+    cache.sort_by_date(transactions, reverse=False, version="v1")
+    stats = cache.stats()
+    assert (stats.entries, stats.evictions, stats.bytes) == (1, 1, 2000)
+    cache.sort_by_date(transactions, reverse=False, version="v1")
+    assert cache.stats().hits == 1
+
+
+def test_disk_shared_between_caches(transactions, tmp_path):
+    first = ResultCache(directory=tmp_path)
+    expected = first.sort_by_date(transactions, version="v1")
+    second = ResultCache(directory=tmp_path)
+    assert second.sort_by_date(transactions, version="v1") == expected
+    assert second.stats().disk_hits == 1
+    assert second.sort_by_date(transactions, version="v1") == expected
+    assert second.stats().hits == 1
+
+
+def test_disk_limit(transactions, tmp_path):
+    cache = ResultCache(directory=tmp_path, max_disk_bytes=2100)
+    cache.sort_by_date(transactions, version="v1")
+    cache.sort_by_date(transactions, reverse=False, version="v1")
+    assert len(os.listdir(tmp_path)) == 1
+
+
+def test_invalidate(transactions, tmp_path):
+    cache = ResultCache(directory=tmp_path)
+    other = transactions[:100]
+    cache.filter_by_state(transactions, version="v1")
+    cache.sort_by_date(transactions, version="v1")
+    cache.sort_by_date(other, version="v2")
+    assert cache.invalidate(transactions, version="v1") == 2
+    assert cache.stats().entries == 1
+    assert len(os.listdir(tmp_path)) == 1
+    cache.filter_by_state(transactions, version="v1")
+    assert cache.stats().misses == 4
+    assert cache.invalidate() == 2
+    assert os.listdir(tmp_path) == []
+
+
+def test_errors_not_cached(cache):
+    rows = [{"state": "EXECUTED"}]
+    for _ in range(2):
+        with pytest.raises(KeyError):
+            cache.sort_by_date(rows, version="v1")
+    assert cache.stats().entries == 0
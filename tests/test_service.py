@@ -0,0 +1,255 @@
+import asyncio
+import json
+import threading
+import time
+
+import pytest
+
+from benchmarks.synthetic import generate_transactions
+from src.processing import filter_by_state, sort_by_date
+from src.service import RequestError, TransactionService, start
+
+
+@pytest.fixture
+def service():
+    service = TransactionService(list(generate_transactions(300)), max_concurrency=2)
+    yield service
+    service.close()
+
+
+async def request(port, method, path, body=None):
+    """Отправляет один запрос HTTP/1.1 и возвращает статус и разобранное тело."""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    data = b"" if body is None else json.dumps(body).encode("utf-8")
+    head = f"{method} {path} HTTP/1.1\r\nHost: test\r\nContent-Length: {len(data)}\r\nConnection: close\r\n\r\n"
+    writer.write(head.encode("ascii") + data)
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, _, payload = response.partition(b"\r\n\r\n")
+    return int(head.split()[1]), json.loads(payload)
+
+
+def serve(service, scenario):
+    """Запускает сервер на свободном порту и выполняет scenario(port)."""
+
+    async def main():
+        server = await start(service, port=0)
+        async with server:
+            return await scenario(server.sockets[0].getsockname()[1])
+
+    return asyncio.run(main())
+
+
+def test_operations(service):
+    transactions = service.transactions
+
+    async def scenario(port):
+        return [
+            await request(port, "POST", "/filter", {"state": "CANCELED", "limit": 5}),
+            await request(port, "POST", "/sort", {"reverse": False, "offset": 2, "limit": 3}),
+            await request(port, "POST", "/mask", {"values": ["Счет 73654108430135874305", "Visa 123", None]}),
+            await request(port, "POST", "/dates", {"values": ["2024-03-11T02:26:18.671407", "bad"], "strict": True}),
+            await request(port, "GET", "/health"),
+        ]
+
+    filtered, ordered, masked, dates, health = serve(service, scenario)
+    expected = filter_by_state(transactions, "CANCELED")
+    assert filtered == (200, {"count": len(expected), "items": expected[:5]})
+    assert ordered == (200, {"count": 300, "items": sort_by_date(transactions, reverse=False)[2:5]})
+    assert masked == (200, {"masked": ["Счет **4305", None, None], "status": [0, 3, 4], "invalid": [1, 2]})
+    assert dates == (200, {"dates": ["11.03.2024", None], "invalid": [1]})
+    assert health[0] == 200
+    assert health[1]["rows"] == 300 and health[1]["requests"] == 4
+
+
+@pytest.mark.parametrize(
+    "method,path,body,status",
+    [
+        ("POST", "/unknown", {}, 404),
+        ("GET", "/filter", None, 405),
+        ("POST", "/filter", {"limit": -1}, 400),
+        ("POST", "/mask", {"values": "not a list"}, 400),
+        ("POST", "/filter", [1, 2], 400),
+    ],
+)
+def test_errors(service, method, path, body, status):
+    code, payload = serve(service, lambda port: request(port, method, path, body))
+    assert code == status
+    assert "error" in payload
+
+
+@pytest.mark.parametrize("length", [b"abc", b"-5"])
+def test_invalid_content_length(service, length):
+    async def scenario(port):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(b"POST /filter HTTP/1.1\r\nContent-Length: " + length + b"\r\nConnection: close\r\n\r\n")
+        await writer.drain()
+        response = await reader.read()
+        writer.close()
+        return response
+
+    assert serve(service, scenario).startswith(b"HTTP/1.1 400 Bad Request")
+
+
+def test_handler_failure_is_500(service):
+    def broken(params):
+        raise AttributeError("boom")
+
+    service.operations["broken"] = broken
+    code, payload = serve(service, lambda port: request(port, "POST", "/broken", {}))
+    assert code == 500
+    assert payload == {"error": "Internal error: AttributeError"}
+
+
+def test_dates_non_string_values(service):
+    code, payload = serve(service, lambda port: request(port, "POST", "/dates", {"values": [1]}))
+    assert (code, payload) == (200, {"dates": [None], "invalid": [0]})
+
+
+def test_keep_alive(service):
+    async def scenario(port):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        statuses = []
+        for _ in range(3):
+            writer.write(b"POST /filter HTTP/1.1\r\nContent-Length: 12\r\n\r\n{\"limit\": 0}")
+            await writer.drain()
+            statuses.append(await reader.readline())
+            length = 0
+            while (line := await reader.readline()) != b"\r\n":
+                if line.lower().startswith(b"content-length"):
+                    length = int(line.split(b":")[1])
+            await reader.readexactly(length)
+        writer.close()
+        return statuses
+
+    assert serve(service, scenario) == [b"HTTP/1.1 200 OK\r\n"] * 3
+
+
+def test_coalescing(service):
+    calls = []
+
+    def slow(params):
+        calls.append(params)
+        time.sleep(0.05)
+        return {"value": params["x"]}
+
+    service.operations["slow"] = slow
+
+    async def scenario():
+        same = [service.call("slow", {"x": 1}) for _ in range(5)]
+        return await asyncio.gather(*same, service.call("slow", {"x": 2}))
+
+    results = asyncio.run(scenario())
+    assert [json.loads(result) for result in results] == [{"value": 1}] * 5 + [{"value": 2}]
+    assert len(calls) == 2
+    assert service.coalesced == 4
+
+
+def test_pages_are_coalesced(service, monkeypatch):
+    calls = []
+    filter_by_state_cached = service.cache.filter_by_state
+
+    def slow(*args):
+        calls.append(args[1])
+        time.sleep(0.05)
+        return filter_by_state_cached(*args)
+
+    monkeypatch.setattr(service.cache, "filter_by_state", slow)
+
+    async def scenario():
+        pages = [service.call("filter", {"state": "CANCELED", "offset": offset, "limit": 3}) for offset in (0, 3, 6)]
+        return await asyncio.gather(*pages)
+
+    results = [json.loads(result) for result in asyncio.run(scenario())]
+    expected = filter_by_state(service.transactions, "CANCELED")
+    assert [result["items"] for result in results] == [expected[0:3], expected[3:6], expected[6:9]]
+    assert all(result["count"] == len(expected) for result in results)
+    assert calls == ["CANCELED"]
+    assert service.coalesced == 2
+
+
+def test_coalesced_errors(service):
+    def failing(params):
+        time.sleep(0.02)
+        raise ValueError("bad")
+
+    service.operations["failing"] = failing
+
+    async def scenario():
+        return await asyncio.gather(*[service.call("failing", {}) for _ in range(3)], return_exceptions=True)
+
+    errors = asyncio.run(scenario())
+    assert all(isinstance(error, RequestError) and error.status == 400 for error in errors)
+    assert service.coalesced == 2
+
+
+def test_cancelled_leader_does_not_cancel_followers(service):
+    def slow(params):
+        time.sleep(0.05)
+        return {"value": 1}
+
+    service.operations["slow"] = slow
+
+    async def scenario():
+        leader = asyncio.ensure_future(service.call("slow", {}))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(service.call("slow", {}))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        return await follower, leader.cancelled()
+
+    body, cancelled = asyncio.run(scenario())
+    assert json.loads(body) == {"value": 1}
+    assert cancelled
+    assert service.coalesced == 1
+    assert service._pending == {}
+
+
+def test_concurrency_limit(service):
+    active = []
+    peak = []
+    lock = threading.Lock()
+
+    def tracked(params):
+        with lock:
+            active.append(1)
+            peak.append(len(active))
+        time.sleep(0.02)
+        with lock:
+            active.pop()
+        return {}
+
+    service.operations["tracked"] = tracked
+
+    async def scenario():
+        await asyncio.gather(*[service.call("tracked", {"n": number}) for number in range(8)])
+
+    asyncio.run(scenario())
+    assert len(peak) == 8
+    assert max(peak) <= 2
+
+
+def test_unix_socket(service, tmp_path):
+    path = str(tmp_path / "service.sock")
+
+    async def main():
+        server = await start(service, unix=path)
+        async with server:
+            reader, writer = await asyncio.open_unix_connection(path)
+            writer.write(b"GET /health HTTP/1.1\r\nConnection: close\r\n\r\n")
+            await writer.drain()
+            response = await reader.read()
+            writer.close()
+            return response
+
+    response = asyncio.run(main())
+    assert response.startswith(b"HTTP/1.1 200 OK")
+    assert json.loads(response.partition(b"\r\n\r\n")[2])["rows"] == 300
+
+
+def test_load_script(capsys):
+    from benchmarks import load_service
+
+    assert load_service.main(["--rows", "200", "--clients", "4", "--requests", "40"]) == 0
+    assert "rps:" in capsys.readouterr().out
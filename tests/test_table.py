@@ -0,0 +1,163 @@
+import json
+import tracemalloc
+
+import pytest
+
+from src.generators import filter_by_currency, transaction_descriptions
+from src.processing import filter_by_state, sort_by_date
+from src.table import (NULL, Categories, TransactionTable, format_amount, format_date, parse_amount,
+                       parse_date)
+
+
+# Фикстура с тестовыми транзакциями
+@pytest.fixture
+def transactions():
+    return [
+        {
+            "id": 939719570,
+            "state": "EXECUTED",
+            "date": "2018-06-30T02:08:58.425572",
+            "operationAmount": {"amount": "9824.07", "currency": {"name": "USD", "code": "USD"}},
+            "description": "Перевод организации",
+            "from": "Счет 75106830613657916952",
+            "to": "Счет 11776614605963066702",
+        },
+        {
+            "id": 873106923,
+            "state": "CANCELED",
+            "date": "2019-03-23T01:09:46.296404",
+            "operationAmount": {"amount": "43318.34", "currency": {"name": "руб.", "code": "RUB"}},
+            "description": "Перевод со счета на счет",
+            "from": "Счет 44812258784861134719",
+            "to": "Счет 74489636417521191160",
+        },
+        {
+            "id": 587085106,
+            "state": "EXECUTED",
+            "date": "2018-03-23T10:45:06.972075",
+            "operationAmount": {"amount": "48223.05", "currency": {"name": "руб.", "code": "RUB"}},
+            "description": "Открытие вклада",
+            "to": "Счет 41421565395219882431",
+        },
+        {},
+    ]
+
+
+@pytest.fixture
+def table(transactions):
+    return TransactionTable.from_records(transactions)
+
+
+def test_round_trip(table, transactions):
+    """Проверяем, что словари восстанавливаются из колонок без потерь"""
+    assert len(table) == 4
+    assert list(table) == transactions
+    assert table[-1] == {}
+    assert table.columns["id"][3] == NULL
+
+
+def test_index_out_of_range(table):
+    with pytest.raises(IndexError):
+        table[4]
+
+
+def test_from_file(tmp_path, transactions):
+    path = tmp_path / "operations.json"
+    path.write_text(json.dumps(transactions, ensure_ascii=False), encoding="utf-8")
+    assert list(TransactionTable.from_file(path)) == transactions
+
+
+def test_categories_are_interned(table):
+    """Проверяем, что повторяющиеся строки хранятся один раз"""
+    assert table.categories["state"].values == ["EXECUTED", "CANCELED", None]
+    assert list(table.values("currency_code")) == ["USD", "RUB", "RUB", None]
+
+
+def test_categories_find():
+    categories = Categories(["USD", "RUB", "USD"])
+    assert len(categories) == 2
+    assert categories.find("RUB") == 1
+    assert categories.find("EUR") == -1
+
+
+@pytest.mark.parametrize("amount,expected", [("9824.07", 982407), ("67314.70", 6731470), (100, 10000), ("-1.5", -150)])
+def test_parse_amount(amount, expected):
+    assert parse_amount(amount) == expected
+
+
+@pytest.mark.parametrize("amount", ["1.005", "abc", "nan"])
+def test_parse_amount_invalid(amount):
+    with pytest.raises(ValueError):
+        parse_amount(amount)
+
+
+def test_format_amount():
+    assert format_amount(6731470) == "67314.70"
+    assert format_amount(-150) == "-1.50"
+
+
+def test_dates_are_sortable_integers():
+    earlier = parse_date("2018-06-30T02:08:58.425572")
+    later = parse_date("2019-03-23T01:09:46.296404")
+    assert earlier < later
+    assert format_date(earlier) == "2018-06-30T02:08:58.425572"
+    assert parse_date("1970-01-01T00:00:00+00:00") == 0
+
+
+def test_invalid_date_is_rejected():
+    with pytest.raises(ValueError):
+        TransactionTable.from_records([{"id": 1, "date": "invalid-date"}])
+
+
+def test_filter_by_state_on_table(table):
+    result = filter_by_state(table, "EXECUTED")
+    assert isinstance(result, TransactionTable)
+    assert [item["id"] for item in result] == [939719570, 587085106]
+    assert len(filter_by_state(table, "UNKNOWN")) == 0
+
+
+def test_sort_by_date_on_table(transactions):
+    table = TransactionTable.from_records(transactions[:3])
+    assert [item["id"] for item in sort_by_date(table)] == [873106923, 939719570, 587085106]
+    assert [item["id"] for item in sort_by_date(table, False)] == [587085106, 939719570, 873106923]
+
+
+def test_sort_by_date_on_table_missing_date(table):
+    """Как и для списка словарей, запись без даты приводит к KeyError"""
+    with pytest.raises(KeyError):
+        sort_by_date(table)
+
+
+def test_generators_on_table(table, transactions):
+    assert list(filter_by_currency(table, "RUB")) == transactions[1:3]
+    assert list(filter_by_currency(table, "EUR")) == []
+    assert list(transaction_descriptions(table)) == [
+        "Перевод организации",
+        "Перевод со счета на счет",
+        "Открытие вклада",
+        "",
+    ]
+
+
+def test_memory_footprint(transactions):
+    """Проверяем, что таблица занимает как минимум в 5 раз меньше памяти, чем разобранный JSON"""
+    rows = []
+    for i in range(3000):
+        row = dict(transactions[i % 3])
+        row["id"] = i
+        row["date"] = f"2019-0{i % 9 + 1}-1{i % 10}T10:50:58.{i:06d}"
+        rows.append(row)
+    text = json.dumps(rows, ensure_ascii=False)
+
+    tracemalloc.start()
+    parsed = json.loads(text)
+    dicts_size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    tracemalloc.start()
+    table = TransactionTable.from_records(parsed)
+    table_size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    assert dicts_size >= 5 * table_size
+    assert len(table) == len(parsed)
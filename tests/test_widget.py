@@ -1,5 +1,7 @@
 import pytest
-from src.widget import mask_account_card, get_date
+from src.widget import (MASK_INVALID_ACCOUNT, MASK_INVALID_CARD, MASK_NO_NUMBER, MASK_NOT_STRING, MASK_OK, CacheStats,
+                        DateBatch, MaskBatch, MaskCache, disable_mask_cache, enable_mask_cache, get_date, get_dates,
+                        mask_account_card, mask_account_cards)
 
 
 # Фикстура для тестовых данных виджета
@@ -35,3 +37,139 @@ def test_mask_account_card(widget_data):
 def test_get_date(date_data):
     input_date, expected = date_data
     assert get_date(input_date) == expected
+
+
+# Тесты кэша масок
+@pytest.fixture
+def mask_cache():
+    cache = enable_mask_cache(maxsize=2)
+    yield cache
+    disable_mask_cache()
+
+
+def test_mask_cache_hits_and_misses(mask_cache):
+    assert mask_account_card("Счет 73654108430135874305") == "Счет **4305"
+    assert mask_account_card("Счет 73654108430135874305") == "Счет **4305"
+    assert mask_account_card("МИР 1111222233334444") == "МИР 1111 22** **** 4444"
+    assert mask_cache.stats() == CacheStats(hits=1, misses=2, evictions=0, size=2, maxsize=2)
+
+
+def test_mask_cache_lru_eviction(mask_cache):
+    mask_account_card("Счет 11111111111111111111")
+    mask_account_card("Счет 22222222222222222222")
+    mask_account_card("Счет 11111111111111111111")  # становится самой свежей записью
+    mask_account_card("Счет 33333333333333333333")  # вытесняет 2222
+    assert mask_cache.stats().evictions == 1
+    assert mask_account_card("Счет 11111111111111111111") == "Счет **1111"
+    assert mask_account_card("Счет 22222222222222222222") == "Счет **2222"
+    assert mask_cache.stats().hits == 2
+
+
+def test_mask_cache_does_not_mix_inputs(mask_cache):
+    """Близкие строки кэшируются отдельно и получают собственные маски"""
+    assert mask_account_card("Visa 7000792289606361") == "Visa 7000 79** **** 6361"
+    assert mask_account_card("Visa  7000792289606361") == "Visa 7000 79** **** 6361"
+    assert mask_account_card("Visa 7000792289606362") == "Visa 7000 79** **** 6362"
+    assert mask_cache.stats().hits == 0
+
+
+def test_mask_cache_errors_not_cached(mask_cache):
+    for _ in range(2):
+        with pytest.raises(ValueError):
+            mask_account_card("Visa 123")
+    assert mask_cache.stats() == CacheStats(hits=0, misses=0, evictions=0, size=0, maxsize=2)
+
+
+def test_mask_cache_clear_and_disable(mask_cache):
+    mask_account_card("Счет 73654108430135874305")
+    mask_cache.clear()
+    assert mask_cache.stats().size == 0
+    disable_mask_cache()
+    mask_account_card("Счет 73654108430135874305")
+    assert mask_cache.stats().misses == 0
+
+
+def test_mask_cache_invalid_size():
+    with pytest.raises(ValueError):
+        MaskCache(maxsize=0)
+
+
+# Тесты пакетного преобразования дат
+DATES = [
+    "2019-07-03T18:35:29.512364",
+    "2018-06-30T02:08:58.425572",
+    "2019-07-03T01:00:00",
+    "2020-02-29",
+    "2019-02-29T10:00:00",  # 29 февраля невисокосного года
+    "2019-13-01",
+    "abc",
+    "a-b-c",
+    "2019-07-03 10:00:00",
+    "",
+]
+
+
+def test_get_dates_matches_get_date():
+    result = get_dates(DATES)
+    assert result.dates == [get_date(date_str) for date_str in DATES]
+    assert result.invalid == [4, 5, 6, 7, 8, 9]
+
+
+def test_get_dates_strict():
+    result = get_dates(DATES, strict=True)
+    assert result.dates == ["03.07.2019", "30.06.2018", "03.07.2019", "29.02.2020"] + [None] * 6
+    assert result.invalid == [4, 5, 6, 7, 8, 9]
+    assert get_dates([None], strict=True) == DateBatch([None], [0])
+
+
+def test_get_dates_non_strings():
+    assert get_dates([None, 1, "2019-07-03"]) == DateBatch([None, None, "03.07.2019"], [0, 1])
+
+
+@pytest.mark.parametrize("output_format,expected", [
+    ("%d.%m.%Y", "03.07.2019"),
+    ("%Y-%m-%d", "2019-07-03"),
+    ("%d/%m/%y", "03/07/19"),
+    ("{%d} 100%%", "{03} 100%"),
+])
+def test_get_dates_output_format(output_format, expected):
+    assert get_dates(["2019-07-03T18:35:29.512364"], output_format).dates == [expected]
+
+
+@pytest.mark.parametrize("output_format", ["%H:%M", "%d.%m.%Y %"])
+def test_get_dates_unsupported_format(output_format):
+    with pytest.raises(ValueError):
+        get_dates([], output_format)
+
+
+@pytest.mark.parametrize(
+    "value,masked,status",
+    [
+        ("Счет 73654108430135874305", "Счет **4305", MASK_OK),
+        ("Visa Platinum 7000792289606361", "Visa Platinum 7000 79** **** 6361", MASK_OK),
+        ("Maestro  1596837868705199", "Maestro 1596 83** **** 5199", MASK_OK),
+        ("Visa\tClassic 6831982476737658", "Visa Classic 6831 98** **** 7658", MASK_OK),
+        ("МИР 1111222233334444 ", "МИР 1111 22** **** 4444", MASK_OK),
+        ("7000792289606361", "7000792289606361", MASK_NO_NUMBER),
+        (" 7000792289606361", " 7000792289606361", MASK_NO_NUMBER),
+        ("", "", MASK_NO_NUMBER),
+        ("Счет 123", None, MASK_INVALID_ACCOUNT),
+        ("Счет 12a4", None, MASK_INVALID_ACCOUNT),
+        ("Visa 123", None, MASK_INVALID_CARD),
+        ("Visa 70007922896063612", None, MASK_INVALID_CARD),
+        (None, None, MASK_NOT_STRING),
+        (7000792289606361, None, MASK_NOT_STRING),
+    ],
+)
+def test_mask_account_cards(value, masked, status):
+    # Дважды: второй проход идет через запомненные названия
+    for _ in range(2):
+        assert mask_account_cards([value]) == MaskBatch([masked], [status])
+
+
+def test_mask_account_cards_matches_mask_account_card(widget_data):
+    input_str, expected = widget_data
+    batch = mask_account_cards([input_str, "Счет 1", input_str, "Visa 1"])
+    assert batch.masked == [expected, None, expected, None]
+    assert batch.masked[0] == mask_account_card(input_str)
+    assert batch.invalid == [1, 3]